@@ -9,6 +9,10 @@ __maintainer__ = "Birkbeck University of London"
 
 from django.contrib import admin
 from django.contrib.admin import ModelAdmin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
 from plugins.oas import models
 
 
@@ -24,23 +28,243 @@ class SwitchboardMessageAdmin(ModelAdmin):
         "message_type",
         "message_date_time",
         "article",
-        "_journal",
-        "message",
-        "response",
+        "journal",
+        "failure_class",
+        "latency_ms",
+    )
+    list_select_related = (
+        "article",
+        "journal",
     )
     list_filter = (
         "success",
         "authorized",
         "broadcast",
         "message_type",
+        "failure_class",
+    )
+    readonly_fields = (
+        "_message",
+        "_response",
+        "_profile",
+    )
+
+    def get_queryset(self, request):
+        # the compressed bodies are only loaded when a message is opened.
+        # the changelist and messages stay on the primary, so that a message
+        # just sent is listed and opens; only the dashboard and exports
+        # read from the reporting database.
+        return (
+            super()
+            .get_queryset(request)
+            .defer("message_body", "response_body")
+        )
+
+    def _message(self, obj):
+        return format_html("<pre>{}</pre>", obj.message)
+
+    def _response(self, obj):
+        return format_html("<pre>{}</pre>", obj.response)
+
+    def _profile(self, obj):
+        profile = models.SwitchboardProfile.objects.filter(
+            message=obj,
+        ).first()
+        if profile is None:
+            return "-"
+        return format_html(
+            '<a href="{}">{} ms, {} queries</a>',
+            reverse("admin:oas_switchboardprofile_change", args=[profile.pk]),
+            profile.duration_ms,
+            profile.query_count,
+        )
+
+
+class SwitchboardQueueItemAdmin(ModelAdmin):
+    """
+    The admin interface for articles queued for sending
+    """
+
+    list_display = (
+        "status",
+        "article",
+        "journal",
+        "job",
+        "created",
+        "started",
+        "finished",
+    )
+    list_filter = (
+        "status",
+        "journal",
+    )
+    raw_id_fields = (
+        "article",
+        "job",
+        "message",
+    )
+
+
+class SwitchboardRateBucketAdmin(ModelAdmin):
+    """
+    The admin interface for the shared rate limit buckets
+    """
+
+    list_display = (
+        "name",
+        "acquisitions",
+        "waits",
+        "wait_seconds",
+        "average_wait",
+    )
+    readonly_fields = (
+        "tokens",
+        "updated",
+        "acquisitions",
+        "waits",
+        "wait_seconds",
+    )
+
+
+class SwitchboardDailySummaryAdmin(ModelAdmin):
+    """
+    The admin interface for the daily counts kept for archived messages
+    """
+
+    list_display = (
+        "date",
+        "journal",
+        "sent",
+        "failed",
+        "unauthorized",
+    )
+    list_filter = ("journal",)
+    date_hierarchy = "date"
+
+
+class SwitchboardInboundMessageAdmin(ModelAdmin):
+    """
+    The admin interface for messages fetched from the switchboard
+    """
+
+    list_display = (
+        "switchboard_id",
+        "message_type",
+        "sender",
+        "doi",
+        "article",
+        "journal",
+        "received",
     )
+    list_filter = ("journal", "message_type")
+    search_fields = ("doi", "sender")
+    raw_id_fields = ("article",)
+    readonly_fields = ("_message",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("message_body")
+
+    def _message(self, obj):
+        return format_html("<pre>{}</pre>", obj.message)
+
+
+class SwitchboardInboxCursorAdmin(ModelAdmin):
+    """
+    The admin interface for how far each journal's inbox has been fetched
+    """
+
+    list_display = ("journal", "last_message_id", "polled")
+
+
+class SwitchboardProfileAdmin(ModelAdmin):
+    """
+    The admin interface for profiles of individual sends
+    """
 
-    def _journal(self, obj):
-        return obj.article.journal
+    list_display = (
+        "message",
+        "created",
+        "duration_ms",
+        "query_count",
+        "query_time_ms",
+    )
+    raw_id_fields = ("message",)
+    readonly_fields = (
+        "_download",
+        "_stats",
+        "_queries",
+    )
+
+    def get_queryset(self, request):
+        return (
+            super().get_queryset(request).defer("stats_body", "queries_body")
+        )
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:profile_id>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="oas_switchboardprofile_download",
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, profile_id):
+        profile = get_object_or_404(models.SwitchboardProfile, pk=profile_id)
+        response = HttpResponse(
+            profile.stats,
+            content_type="application/octet-stream",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="oas-send-{profile.message_id}.prof"'
+        )
+        return response
+
+    def _download(self, obj):
+        return format_html(
+            '<a href="{}">Download for pstats or snakeviz</a>',
+            reverse("admin:oas_switchboardprofile_download", args=[obj.pk]),
+        )
+
+    def _stats(self, obj):
+        from plugins.oas import profiling
+
+        return format_html("<pre>{}</pre>", profiling.summarise_stats(obj))
+
+    def _queries(self, obj):
+        return format_html(
+            "<pre>{}</pre>",
+            "\n\n".join(
+                f"{query['time'] * 1000:.1f} ms: {query['sql']}"
+                for query in obj.queries
+            ),
+        )
+
+
+class SwitchboardEndpointHealthAdmin(ModelAdmin):
+    """
+    The admin interface for the latest health probe of each endpoint
+    """
+
+    list_display = (
+        "url",
+        "healthy",
+        "latency_ms",
+        "status_code",
+        "consecutive_failures",
+        "checked",
+    )
 
 
 admin_list = [
     (models.SwitchboardMessage, SwitchboardMessageAdmin),
+    (models.SwitchboardQueueItem, SwitchboardQueueItemAdmin),
+    (models.SwitchboardRateBucket, SwitchboardRateBucketAdmin),
+    (models.SwitchboardDailySummary, SwitchboardDailySummaryAdmin),
+    (models.SwitchboardInboundMessage, SwitchboardInboundMessageAdmin),
+    (models.SwitchboardInboxCursor, SwitchboardInboxCursorAdmin),
+    (models.SwitchboardProfile, SwitchboardProfileAdmin),
+    (models.SwitchboardEndpointHealth, SwitchboardEndpointHealthAdmin),
 ]
 
 [admin.site.register(*t) for t in admin_list]
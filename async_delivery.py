@@ -0,0 +1,415 @@
+"""
+An asyncio delivery engine for draining large OA Switchboard queues.
+
+Sends are made with httpx over a shared pool of keep-alive connections, with
+a bounded number in flight, so that one worker process can keep hundreds of
+sends waiting on a slow remote side. The synchronous functions in logic.py
+remain the transport for sends made inline from a request.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections
+from plugins.oas import health, logic, ratelimit
+from plugins.oas.models import SwitchboardMessage, SwitchboardQueueItem
+from utils.logger import get_logger
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = get_logger(__name__)
+
+DEFAULT_CONCURRENCY = 50
+
+# seconds a token is reused before authorizing again, well inside the
+# lifetime of an OA Switchboard token
+TOKEN_LIFETIME = 1800
+
+
+class TokenRejected(Exception):
+    """
+    Raised when the OA Switchboard refuses a bearer token, so that the
+    sender can authorize again
+    """
+
+
+async def authorize_async(
+    client,
+    oas_email,
+    oas_password,
+    url_to_use,
+    bulk=False,
+):
+    """
+    Obtain a bearer token from the OA Switchboard without blocking
+    :param client: the httpx.AsyncClient to send with
+    :param oas_email: the email to use
+    :param oas_password: the password to use
+    :param url_to_use: the base URL to use
+    :param bulk: whether this is bulk traffic that may yield to publications
+    :return: the token and whether authorization succeeded
+    """
+    auth_url = f"{url_to_use}authorize"
+    authorization_json = logic.build_authorization_json(
+        oas_email, oas_password
+    )
+
+    await ratelimit.acquire_async("authorize", auth_url, bulk=bulk)
+
+    r = await client.post(auth_url, content=json.dumps(authorization_json))
+
+    return logic.read_authorization_response(r, auth_url)
+
+
+async def send_payload_async(client, payload, token, url_to_use, bulk=False):
+    """
+    Send the payload to the OA Switchboard without blocking
+    :param client: the httpx.AsyncClient to send with
+    :param payload: the payload to send
+    :param token: the bearer token to use
+    :param url_to_use: the base URL to use
+    :param bulk: whether this is bulk traffic that may yield to publications
+    :return: the parsed JSON and whether the message was accepted
+    :raises TokenRejected: if the token has expired or been revoked
+    """
+    message_url = f"{url_to_use}message"
+    body = json.dumps(payload).encode("utf-8")
+
+    while True:
+        content, headers = logic.encode_request_body(
+            "message", message_url, body
+        )
+        headers["Authorization"] = "Bearer " + token
+
+        await ratelimit.acquire_async("message", message_url, bulk=bulk)
+
+        async with client.stream(
+            "POST",
+            message_url,
+            headers=headers,
+            content=content,
+        ) as r:
+            if r.status_code == 401:
+                raise TokenRejected(f"{message_url} refused the token")
+
+            if logic.refuses_compression(r, message_url, headers):
+                continue
+
+            content = await _read_capped_content(r.aiter_bytes())
+
+        return logic.read_message_response(content)
+
+
+async def _read_capped_content(chunks):
+    max_bytes = logic.get_max_response_bytes()
+    content = bytearray()
+
+    async for chunk in chunks:
+        content.extend(chunk)
+        if len(content) >= max_bytes:
+            break
+
+    return bytes(content[:max_bytes])
+
+
+def drain_queue(
+    concurrency=DEFAULT_CONCURRENCY,
+    job_id=None,
+    limit=None,
+    transport=None,
+):
+    """
+    Send queued articles with the async engine until the queue is empty
+    :param concurrency: the maximum number of sends in flight
+    :param job_id: only send the items of this job
+    :param limit: the maximum number of items to send
+    :param transport: the httpx transport to send with, if not the network
+    :return: the number of items processed
+    """
+    if httpx is None:
+        raise ImproperlyConfigured(
+            "The async delivery engine requires httpx to be installed."
+        )
+
+    return asyncio.run(
+        _drain_queue(
+            concurrency,
+            job_id=job_id,
+            limit=limit,
+            transport=transport,
+        ),
+    )
+
+
+async def _drain_queue(concurrency, job_id=None, limit=None, transport=None):
+    state = {
+        "claimed": 0,
+        "limit": limit,
+        "bulk_interval": logic.get_bulk_share_interval(),
+        # the workers take turns between journals through one scheduler
+        "scheduler": await sync_to_async(logic.FairScheduler)(job_id=job_id),
+        # granted tokens, shared by every worker, by set of credentials
+        "tokens": {},
+        # items whose endpoint is down are left for a later run
+        "deferred": set(),
+    }
+
+    limits = httpx.Limits(
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency,
+    )
+
+    try:
+        async with httpx.AsyncClient(
+            timeout=logic.REQUEST_TIMEOUT,
+            limits=limits,
+            transport=transport,
+        ) as client:
+            processed = await asyncio.gather(
+                *[_worker(client, state) for _ in range(concurrency)]
+            )
+    finally:
+        await sync_to_async(close_old_connections)()
+
+    return sum(processed)
+
+
+async def _worker(client, state):
+    processed = 0
+
+    while state["limit"] is None or state["claimed"] < state["limit"]:
+        state["claimed"] += 1
+        prefer_bulk = bool(state["bulk_interval"]) and (
+            state["claimed"] % state["bulk_interval"] == 0
+        )
+
+        item = await sync_to_async(state["scheduler"].claim)(
+            prefer_bulk=prefer_bulk,
+            exclude=set(state["deferred"]),
+        )
+
+        if item is None:
+            break
+
+        if await _deliver_item(client, state, item) is False:
+            state["claimed"] -= 1
+            continue
+
+        processed += 1
+
+    return processed
+
+
+async def _deliver_item(client, state, item):
+    bulk = item.priority == SwitchboardQueueItem.BULK
+
+    try:
+        credentials = await sync_to_async(_get_item_credentials)(item)
+    except Exception:
+        logger.exception(
+            f"Failed to read the OA Switchboard settings for queued article "
+            f"{item.article_id}"
+        )
+        await sync_to_async(logic.complete_queue_item)(item, None)
+        return
+
+    # the health state is read from the cache, which may be a network
+    # round trip
+    if not await sync_to_async(health.is_healthy)(credentials[2]):
+        state["deferred"].add(item.pk)
+        await sync_to_async(logic.defer_queue_item)(item)
+        return False
+
+    try:
+        switchboard_message, created = await sync_to_async(_begin_item_send)(
+            item,
+        )
+    except Exception:
+        logger.exception(
+            f"Failed to start sending queued article {item.article_id} "
+            "to OA Switchboard"
+        )
+        await sync_to_async(logic.complete_queue_item)(item, None)
+        return
+
+    if not created:
+        # another process is sending this article; record its outcome
+        finished = await _wait_for_send(switchboard_message)
+        await sync_to_async(logic.complete_queue_item)(item, finished)
+        return
+
+    authorized = False
+    payload = None
+
+    try:
+        token, authorized = await _get_token(client, state, credentials, bulk)
+
+        if not authorized:
+            await sync_to_async(_record)(
+                item,
+                authorized=False,
+                switchboard_message=switchboard_message,
+            )
+            return
+
+        payload = await sync_to_async(_build_item_payload)(item)
+        started = time.monotonic()
+        try:
+            json_output, success = await send_payload_async(
+                client, payload, token, credentials[2], bulk=bulk
+            )
+        except TokenRejected:
+            # authorize again, once, and resend
+            _forget_token(state, credentials, token)
+            token, authorized = await _get_token(
+                client, state, credentials, bulk
+            )
+            if not authorized:
+                await sync_to_async(_record)(
+                    item,
+                    authorized=False,
+                    payload=payload,
+                    switchboard_message=switchboard_message,
+                )
+                return
+
+            started = time.monotonic()
+            json_output, success = await send_payload_async(
+                client, payload, token, credentials[2], bulk=bulk
+            )
+    except Exception as error:
+        logger.exception(
+            f"Failed to send queued article {item.article_id} "
+            "to OA Switchboard"
+        )
+        await sync_to_async(_record)(
+            item,
+            authorized=authorized,
+            payload=payload,
+            failure_class=classify_send_error(error),
+            switchboard_message=switchboard_message,
+        )
+        return
+
+    await sync_to_async(_record)(
+        item,
+        authorized=True,
+        payload=payload,
+        json_output=json_output,
+        success=success,
+        latency_ms=int((time.monotonic() - started) * 1000),
+        switchboard_message=switchboard_message,
+    )
+
+
+def classify_send_error(error):
+    """
+    Name the failure class of an exception raised while sending, including
+    httpx's timeouts
+    :param error: the exception
+    :return: SwitchboardMessage.TIMEOUT or SwitchboardMessage.ERROR
+    """
+    if httpx is not None and isinstance(error, httpx.TimeoutException):
+        return SwitchboardMessage.TIMEOUT
+    return logic.classify_send_error(error)
+
+
+async def _wait_for_send(switchboard_message):
+    """
+    Wait without blocking the event loop for another process's send
+    """
+    deadline = time.monotonic() + logic.get_send_wait()
+
+    while time.monotonic() < deadline:
+        current = await sync_to_async(logic.poll_send)(switchboard_message)
+
+        if current is None or not current.pending:
+            return current
+
+        await asyncio.sleep(logic.SEND_POLL_INTERVAL)
+
+    return None
+
+
+async def _get_token(client, state, credentials, bulk):
+    """
+    Authorize once per set of credentials, sharing the pending result with
+    every worker that needs the same token. Only a token that was granted is
+    kept, and only for TOKEN_LIFETIME seconds.
+    """
+    cached = state["tokens"].get(credentials)
+
+    if cached is None or cached[1] <= time.monotonic():
+        cached = state["tokens"][credentials] = (
+            asyncio.ensure_future(
+                authorize_async(client, *credentials, bulk=bulk)
+            ),
+            time.monotonic() + TOKEN_LIFETIME,
+        )
+
+    future = cached[0]
+
+    try:
+        token, authorized = await future
+    except Exception:
+        # let the next item retry rather than failing the whole run
+        if state["tokens"].get(credentials) is cached:
+            del state["tokens"][credentials]
+        raise
+
+    if not authorized and state["tokens"].get(credentials) is cached:
+        # a refusal may be a passing error, so the next item asks again
+        del state["tokens"][credentials]
+
+    return token, authorized
+
+
+def _forget_token(state, credentials, token):
+    """
+    Drop a token the OA Switchboard refused, unless another worker has
+    already replaced it
+    """
+    cached = state["tokens"].get(credentials)
+
+    if (
+        cached is not None
+        and cached[0].done()
+        and not cached[0].cancelled()
+        and cached[0].exception() is None
+        and cached[0].result()[0] == token
+    ):
+        del state["tokens"][credentials]
+
+
+# the article is read from the database, so it must only be touched in the
+# helpers that run synchronously, never on the event loop
+
+
+def _begin_item_send(item):
+    return logic.begin_send(item.article)
+
+
+def _build_item_payload(item):
+    return logic.build_payload(item.article)
+
+
+def _get_item_credentials(item):
+    return logic.get_credentials(
+        logic.get_journal_plugin_settings(item.journal),
+    )
+
+
+def _record(item, **kwargs):
+    switchboard_message = logic.record_message(item.article, **kwargs)
+    logic.complete_queue_item(item, switchboard_message)
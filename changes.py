@@ -0,0 +1,153 @@
+"""
+Tracking of the articles whose payloads may have changed, so that oas_sync
+only rebuilds those.
+
+Saving an article, one of its authors or their CRediT records, a funder or
+a licence marks the articles built from it as changed. Journal edits and
+ROR or funder index rebuilds change every article in a journal, so
+oas_sync checks all of them when it sees one.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.utils import timezone
+from plugins.oas.models import SwitchboardArticleChange
+from submission import models as submission_models
+
+
+def mark_changed(article_ids):
+    """
+    Record that the payloads of some articles may have changed
+    :param article_ids: the primary keys of the articles
+    """
+    article_ids = {article_id for article_id in article_ids if article_id}
+    if not article_ids:
+        return
+
+    now = timezone.now()
+    marked = set(
+        SwitchboardArticleChange.objects.filter(
+            article_id__in=article_ids,
+        ).values_list("article_id", flat=True)
+    )
+
+    SwitchboardArticleChange.objects.filter(article_id__in=marked).update(
+        changed=now,
+    )
+    SwitchboardArticleChange.objects.bulk_create(
+        [
+            SwitchboardArticleChange(article_id=article_id, changed=now)
+            for article_id in article_ids - marked
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def changed_since(since):
+    """
+    Get the articles marked as changed since a time
+    :param since: the datetime
+    :return: a QuerySet of article IDs
+    """
+    return SwitchboardArticleChange.objects.filter(
+        changed__gte=since,
+    ).values("article_id")
+
+
+def _article_changed(sender, instance, **kwargs):
+    mark_changed([instance.pk])
+
+
+def _author_changed(sender, instance, **kwargs):
+    mark_changed([instance.article_id])
+
+
+def _credit_changed(sender, instance, **kwargs):
+    mark_changed(
+        submission_models.FrozenAuthor.objects.filter(
+            pk=instance.frozen_author_id,
+        ).values_list("article_id", flat=True)
+    )
+
+
+def _funder_changed(sender, instance, **kwargs):
+    mark_changed(
+        submission_models.Article.objects.filter(
+            funders=instance,
+        ).values_list("pk", flat=True)
+    )
+
+
+def _licence_changed(sender, instance, **kwargs):
+    mark_changed(
+        submission_models.Article.objects.filter(
+            license=instance,
+        ).values_list("pk", flat=True)
+    )
+
+
+def _funders_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        mark_changed([instance.pk])
+    elif pk_set is not None:
+        mark_changed(pk_set)
+    else:
+        # a funder's articles are cleared; mark them before they go
+        _funder_changed(sender, instance)
+
+
+def connect_signals():
+    """
+    Mark articles as changed whenever the records their payloads are built
+    from are saved or deleted
+    """
+    for signal in (post_save, post_delete):
+        signal.connect(
+            _author_changed,
+            sender="submission.FrozenAuthor",
+            dispatch_uid=f"oas_author_changed_{signal}",
+        )
+        if hasattr(submission_models, "CreditRecord"):
+            signal.connect(
+                _credit_changed,
+                sender="submission.CreditRecord",
+                dispatch_uid=f"oas_credit_changed_{signal}",
+            )
+
+    post_save.connect(
+        _article_changed,
+        sender="submission.Article",
+        dispatch_uid="oas_article_changed",
+    )
+
+    # the articles a funder or licence belonged to are only known before it
+    # is deleted
+    for signal in (post_save, pre_delete):
+        signal.connect(
+            _funder_changed,
+            sender="submission.Funder",
+            dispatch_uid=f"oas_funder_changed_{signal}",
+        )
+        signal.connect(
+            _licence_changed,
+            sender="submission.Licence",
+            dispatch_uid=f"oas_licence_article_changed_{signal}",
+        )
+
+    m2m_changed.connect(
+        _funders_changed,
+        sender=submission_models.Article.funders.through,
+        dispatch_uid="oas_funders_changed",
+    )
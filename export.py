@@ -0,0 +1,155 @@
+"""
+Streaming exports of the OA Switchboard message log.
+
+Rows are read with a database cursor and written out one at a time, so an
+export of any size runs in constant memory and starts sending at once.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import csv
+import json
+
+from plugins.oas import logic
+from plugins.oas.models import SwitchboardMessage, decompress_body
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = {
+    CSV: "text/csv",
+    NDJSON: "application/x-ndjson",
+}
+
+FIELDS = (
+    "id",
+    "message_date_time",
+    "journal",
+    "article",
+    "authorized",
+    "success",
+    "failure_class",
+    "latency_ms",
+    "fingerprint",
+)
+BODY_FIELDS = ("message", "response")
+
+# rows fetched from the database cursor at a time
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    A file-like object that returns what is written to it, so that the csv
+    module can produce a line at a time
+    """
+
+    def write(self, value):
+        return value
+
+
+def filter_messages(
+    journal=None,
+    start=None,
+    end=None,
+    status=None,
+):
+    """
+    Select the messages to export
+    :param journal: only export the messages of this journal
+    :param start: only export messages sent on or after this date
+    :param end: only export messages sent on or before this date
+    :param status: one of logic.MESSAGE_STATUSES
+    :return: a QuerySet of SwitchboardMessages
+    """
+    messages = logic.reporting_queryset(SwitchboardMessage).filter(
+        pending=False,
+    )
+
+    if journal:
+        messages = messages.filter(journal=journal)
+    if start:
+        messages = messages.filter(message_date_time__date__gte=start)
+    if end:
+        messages = messages.filter(message_date_time__date__lte=end)
+    if status:
+        messages = messages.filter(logic.MESSAGE_STATUSES[status])
+
+    return messages.order_by("pk")
+
+
+def iter_rows(messages, bodies=False):
+    """
+    Read the messages one at a time
+    :param messages: a QuerySet of SwitchboardMessages
+    :param bodies: whether to include the message and response bodies
+    :return: a generator of dicts
+    """
+    columns = [
+        "pk",
+        "message_date_time",
+        "journal__code",
+        "article_id",
+        "authorized",
+        "success",
+        "failure_class",
+        "latency_ms",
+        "fingerprint",
+    ]
+    if bodies:
+        columns += ["message_body", "response_body"]
+
+    for values in messages.values_list(*columns).iterator(
+        chunk_size=CHUNK_SIZE,
+    ):
+        row = dict(zip(FIELDS, values))
+        row["message_date_time"] = row["message_date_time"].isoformat()
+
+        if bodies:
+            row["message"] = decompress_body(values[-2])
+            row["response"] = decompress_body(values[-1])
+
+        yield row
+
+
+def csv_lines(rows, bodies=False):
+    """
+    Write rows as CSV
+    :param rows: an iterable of dicts from iter_rows
+    :param bodies: whether the rows include the message bodies
+    :return: a generator of CSV lines
+    """
+    fields = FIELDS + BODY_FIELDS if bodies else FIELDS
+    writer = csv.DictWriter(Echo(), fieldnames=fields)
+
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows):
+    """
+    Write rows as newline-delimited JSON
+    :param rows: an iterable of dicts from iter_rows
+    :return: a generator of JSON lines
+    """
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def export_lines(messages, export_format=CSV, bodies=False):
+    """
+    Export messages in the requested format
+    :param messages: a QuerySet of SwitchboardMessages
+    :param export_format: CSV or NDJSON
+    :param bodies: whether to include the message and response bodies
+    :return: a generator of lines
+    """
+    rows = iter_rows(messages, bodies=bodies)
+
+    if export_format == NDJSON:
+        return ndjson_lines(rows)
+
+    return csv_lines(rows, bodies=bodies)
@@ -8,6 +8,8 @@ __license__ = "AGPL v3"
 __maintainer__ = "Birkbeck University of London"
 
 from django import forms
+from journal import models as journal_models
+from plugins.oas import export, logic
 
 
 class OASManagerForm(forms.Form):
@@ -31,3 +33,30 @@ class OASManagerForm(forms.Form):
     sandbox_url = forms.CharField(
         help_text="The URL for the sandbox site.", label="Sandbox URL"
     )
+
+
+class ExportForm(forms.Form):
+    """
+    The filters for an export of the message log.
+    """
+
+    journal = forms.ModelChoiceField(
+        queryset=journal_models.Journal.objects.all(),
+        required=False,
+        to_field_name="code",
+    )
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    status = forms.ChoiceField(
+        choices=[("", "Any")]
+        + [(status, status.title()) for status in logic.MESSAGE_STATUSES],
+        required=False,
+    )
+    format = forms.ChoiceField(
+        choices=[(name, name.upper()) for name in export.FORMATS],
+        required=False,
+    )
+    bodies = forms.BooleanField(
+        required=False,
+        help_text="Include the message and response bodies.",
+    )
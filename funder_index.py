@@ -0,0 +1,303 @@
+"""
+An optional offline crosswalk between Funder Registry IDs, RORs and funder
+names, used to fill in identifiers that a funder record is missing.
+
+The crosswalk is a sorted text file built with the oas_funder_index command.
+It is memory-mapped read-only on first use, so every worker process on a
+host shares a single copy in the page cache. Set OAS_FUNDER_INDEX_PATH in
+the Django settings to enable it.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import collections
+import mmap
+import os
+import random
+import re
+import threading
+import time
+from xml.etree import ElementTree
+
+from django.conf import settings
+from plugins.oas import ror_index
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FUNDREF_PREFIX = "10.13039/"
+FUNDREF_URI = f"https://doi.org/{FUNDREF_PREFIX}"
+ROR_URI = "https://ror.org/"
+
+# key prefixes for the three lookups held in the one sorted file
+BY_FUNDREF = "f:"
+BY_ROR = "r:"
+BY_NAME = "n:"
+
+RDF_ABOUT = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about"
+SKOS_CONCEPT = "{http://www.w3.org/2004/02/skos/core#}Concept"
+SKOSXL_LITERAL_FORM = "{http://www.w3.org/2008/05/skos-xl#}literalForm"
+
+Funder = collections.namedtuple("Funder", ["fundref", "ror", "name"])
+
+_lock = threading.Lock()
+_mapped = {}
+
+
+def get_index_path():
+    """
+    Get the configured location of the funder crosswalk
+    :return: the path, or None if the crosswalk is disabled
+    """
+    return getattr(settings, "OAS_FUNDER_INDEX_PATH", None)
+
+
+def get_signature():
+    """
+    Identify the funder crosswalk currently in use
+    :return: a string, or "" if the crosswalk is disabled or missing
+    """
+    return ror_index.file_signature(get_index_path())
+
+
+def normalise_fundref(fundref):
+    """
+    Reduce a Funder Registry ID, DOI or URI to its numeric part
+    :param fundref: e.g. "http://dx.doi.org/10.13039/501100000780"
+    :return: e.g. "501100000780", or "" if none is present
+    """
+    match = re.search(r"(?:10\.13039/)?(\d{6,})/?$", fundref or "")
+    return match.group(1) if match else ""
+
+
+def normalise_ror(ror):
+    """
+    Reduce a ROR URI to its identifier
+    :param ror: e.g. "https://ror.org/02mb95055"
+    :return: e.g. "02mb95055", or "" if none is present
+    """
+    ror = (ror or "").strip().rstrip("/")
+    return ror.rsplit("/", 1)[-1].lower() if ror else ""
+
+
+def _get_map(path):
+    """
+    Map the crosswalk into memory, mapping it afresh if oas_funder_index has
+    replaced the file since
+    :param path: the crosswalk file
+    :return: the mmap, or None if the file is missing or empty
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    if not stat.st_size:
+        return None
+
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    with _lock:
+        cached = _mapped.get(path)
+        if cached is None or cached[0] != signature:
+            # the old map is left for the garbage collector, in case another
+            # thread is still searching it
+            with open(path, "rb") as handle:
+                cached = _mapped[path] = (
+                    signature,
+                    mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ),
+                )
+        return cached[1]
+
+
+def _search(mapped, key):
+    """
+    Binary search the sorted lines of the crosswalk for a key
+    :return: the rest of the matching line, or None
+    """
+    needle = key.encode("utf-8") + b"\t"
+    low, high = 0, len(mapped)
+
+    while low < high:
+        middle = (low + high) // 2
+        start = mapped.rfind(b"\n", 0, middle) + 1
+        end = mapped.find(b"\n", start)
+        if end == -1:
+            end = len(mapped)
+        line = mapped[start:end]
+
+        if line.startswith(needle):
+            return line[len(needle) :].decode("utf-8")
+
+        if line < needle:
+            low = end + 1
+        else:
+            high = start
+
+    return None
+
+
+def lookup(fundref="", ror="", name=""):
+    """
+    Find a funder in the crosswalk by Funder Registry ID, ROR or name, in
+    that order of preference
+    :param fundref: the Funder Registry ID, DOI or URI, if known
+    :param ror: the ROR URI, if known
+    :param name: the funder name, if known
+    :return: a Funder with full fundref and ROR URIs, or None
+    """
+    path = get_index_path()
+    mapped = _get_map(path) if path else None
+
+    if mapped is None:
+        return None
+
+    keys = (
+        (BY_FUNDREF, normalise_fundref(fundref)),
+        (BY_ROR, normalise_ror(ror)),
+        (BY_NAME, ror_index.normalise(name or "")),
+    )
+
+    for prefix, value in keys:
+        if not value:
+            continue
+
+        found = _search(mapped, prefix + value)
+        if found:
+            found_fundref, found_ror, found_name = found.split("\t")
+            return Funder(
+                f"{FUNDREF_URI}{found_fundref}" if found_fundref else "",
+                f"{ROR_URI}{found_ror}" if found_ror else "",
+                found_name,
+            )
+
+    return None
+
+
+def read_ror_dump(dump_path):
+    """
+    Read the ROR to Funder Registry links from a ROR data dump
+    :param dump_path: the ROR data dump
+    :return: a generator of (fundref, ror, name, other names) tuples
+    """
+    for record in ror_index.read_dump(dump_path):
+        if record.get("status", "active") != "active":
+            continue
+
+        external_ids = record.get("external_ids", [])
+        if isinstance(external_ids, dict):
+            fundrefs = external_ids.get("FundRef", {}).get("all", [])
+        else:
+            fundrefs = [
+                fundref
+                for external_id in external_ids
+                if external_id.get("type") == "fundref"
+                for fundref in external_id.get("all", [])
+            ]
+
+        display, names = ror_index.record_names(record)
+        for fundref in fundrefs:
+            yield fundref, record["id"], display, names
+
+
+def read_registry(registry_path):
+    """
+    Read the funders from the Crossref Funder Registry RDF dump
+    :param registry_path: the registry.rdf file
+    :return: a generator of (fundref, ror, name, other names) tuples
+    """
+    for _, element in ElementTree.iterparse(registry_path):
+        if element.tag != SKOS_CONCEPT:
+            continue
+
+        labels = [
+            literal.text
+            for literal in element.iter(SKOSXL_LITERAL_FORM)
+            if literal.text
+        ]
+        if labels:
+            yield element.get(RDF_ABOUT, ""), "", labels[0], set(labels)
+
+        element.clear()
+
+
+def build_index(sources, index_path):
+    """
+    Build the crosswalk, replacing any existing file atomically
+    :param sources: iterables of (fundref, ror, name, other names) tuples
+    :param index_path: where to write the crosswalk
+    :return: the number of funders in the crosswalk
+    """
+    funders = {}
+
+    for source in sources:
+        for fundref, ror, name, other_names in source:
+            fundref = normalise_fundref(fundref)
+            if not fundref:
+                continue
+
+            existing = funders.get(fundref, ("", "", set()))
+            funders[fundref] = (
+                existing[0] or normalise_ror(ror),
+                existing[1] or name,
+                existing[2] | set(other_names) | {name},
+            )
+
+    lines = {}
+    ambiguous = set()
+
+    def add(key, value):
+        if key in lines and lines[key] != value:
+            ambiguous.add(key)
+        lines[key] = value
+
+    for fundref, (ror, name, names) in funders.items():
+        value = "\t".join([fundref, ror, " ".join(name.split())])
+        add(BY_FUNDREF + fundref, value)
+        if ror:
+            add(BY_ROR + ror, value)
+        for other_name in names:
+            normalised = ror_index.normalise(other_name)
+            if normalised:
+                add(BY_NAME + normalised, value)
+
+    temporary_path = f"{index_path}.tmp"
+    with open(temporary_path, "wb") as handle:
+        for key in sorted(
+            (key for key in lines if key not in ambiguous),
+            key=lambda key: key.encode("utf-8"),
+        ):
+            line = f"{key}\t{lines[key]}"
+            handle.write(line.encode("utf-8") + b"\n")
+
+    # workers notice the new file and map it on their next lookup
+    os.replace(temporary_path, index_path)
+
+    return len(funders)
+
+
+def benchmark(index_path, lookups):
+    """
+    Time lookups of random keys from the crosswalk
+    :param index_path: the crosswalk to benchmark
+    :param lookups: the number of lookups to time
+    :return: the sorted lookup times in microseconds
+    """
+    with open(index_path, encoding="utf-8") as handle:
+        keys = [line.split("\t", 1)[0] for line in handle]
+
+    if not keys:
+        return []
+
+    mapped = _get_map(index_path)
+    timings = []
+
+    for key in random.choices(keys, k=lookups):
+        start = time.perf_counter()
+        _search(mapped, key)
+        timings.append((time.perf_counter() - start) * 1e6)
+
+    return sorted(timings)
@@ -0,0 +1,123 @@
+"""
+Health of the OA Switchboard endpoints, so that sends can be deferred while
+an endpoint is down instead of each one waiting for a timeout.
+
+The oas_health command probes each configured endpoint and records the
+result in the database and the shared cache. Senders only read the cache.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import json
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from plugins.oas import ratelimit
+from plugins.oas.models import SwitchboardEndpointHealth
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# seconds for which a probe result is trusted
+DEFAULT_HEALTH_TTL = 300
+
+# seconds a probe waits for the endpoint to answer
+DEFAULT_PROBE_TIMEOUT = 5
+
+# failed probes in a row before an endpoint is treated as down
+DEFAULT_FAILURE_THRESHOLD = 2
+
+
+def _cache_key(url):
+    return f"oas:endpoint-health:{url}"
+
+
+def is_healthy(url):
+    """
+    Whether sends to an endpoint should go ahead. An endpoint that has not
+    been probed recently is assumed to be up.
+    :param url: the base URL of the endpoint
+    :return: False only if recent probes found the endpoint down
+    """
+    state = cache.get(_cache_key(url))
+
+    return state is None or state["healthy"]
+
+
+def probe(url, authorization_json):
+    """
+    Time an authorization against an endpoint
+    :param url: the base URL of the endpoint
+    :param authorization_json: the credentials to authorize with
+    :return: the latency in ms, the HTTP status code and any error
+    """
+    auth_url = f"{url}authorize"
+    timeout = getattr(settings, "OAS_PROBE_TIMEOUT", DEFAULT_PROBE_TIMEOUT)
+
+    # probes are background traffic, so they leave room for publications
+    ratelimit.acquire("authorize", auth_url, bulk=True)
+
+    started = time.monotonic()
+    try:
+        r = requests.post(
+            auth_url,
+            data=json.dumps(authorization_json),
+            timeout=timeout,
+        )
+    except requests.RequestException as error:
+        return None, None, str(error)
+
+    latency_ms = int((time.monotonic() - started) * 1000)
+
+    # any answer short of a server error means the endpoint is up, even if
+    # the credentials are wrong
+    if r.status_code >= 500:
+        return latency_ms, r.status_code, f"HTTP {r.status_code}"
+
+    return latency_ms, r.status_code, ""
+
+
+def record(url, latency_ms, status_code, error):
+    """
+    Save a probe result and share it with every sender through the cache
+    :param url: the base URL of the endpoint
+    :param latency_ms: the round-trip time, if the endpoint answered
+    :param status_code: the HTTP status code, if the endpoint answered
+    :param error: a description of the failure, or ""
+    :return: the SwitchboardEndpointHealth
+    """
+    health, _ = SwitchboardEndpointHealth.objects.get_or_create(
+        url=url,
+        defaults={"checked": timezone.now()},
+    )
+
+    health.consecutive_failures = (
+        health.consecutive_failures + 1 if error else 0
+    )
+    health.healthy = health.consecutive_failures < getattr(
+        settings,
+        "OAS_HEALTH_FAILURES",
+        DEFAULT_FAILURE_THRESHOLD,
+    )
+    health.latency_ms = latency_ms
+    health.status_code = status_code
+    health.error = error
+    health.checked = timezone.now()
+    health.save()
+
+    cache.set(
+        _cache_key(url),
+        {"healthy": health.healthy, "latency_ms": latency_ms},
+        getattr(settings, "OAS_HEALTH_TTL", DEFAULT_HEALTH_TTL),
+    )
+
+    if not health.healthy:
+        logger.warning(f"OA Switchboard endpoint {url} is down: {error}")
+
+    return health
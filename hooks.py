@@ -1,9 +1,38 @@
+from django.conf import settings
 from django.template.loader import render_to_string
+from django.urls import get_script_prefix
+from django.utils import translation
+from plugins.oas.plugin_settings import VERSION
 
+# rendered fragments, by template, language, URL prefix and plugin version.
+# The cache lives in the process, so a deploy starts it afresh.
+_fragments = {}
 
-def menu_hook(context):
-    template = render_to_string(
-        "oas/elements/menu_nav.html",
+
+def render_fragment(template_name):
+    """
+    Render a template that takes no context, once per language and URL
+    prefix (journals served under a path have their own)
+    :param template_name: the template to render
+    :return: the rendered template
+    """
+    if settings.DEBUG:
+        # show template edits without a restart
+        return render_to_string(template_name)
+
+    key = (
+        template_name,
+        translation.get_language(),
+        get_script_prefix(),
+        VERSION,
     )
 
-    return template
+    try:
+        return _fragments[key]
+    except KeyError:
+        fragment = _fragments[key] = render_to_string(template_name)
+        return fragment
+
+
+def menu_hook(context):
+    return render_fragment("oas/elements/menu_nav.html")
@@ -0,0 +1,204 @@
+"""
+Fetch the messages that the OA Switchboard holds for a journal, such as
+replies from institutions, so that staff need not check the portal.
+
+Each journal keeps a cursor of the last message fetched, and messages are
+requested in pages after it, so a poll that finds nothing new costs one
+authorization and one small request.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+from django.db.models.functions import Lower
+from django.utils import timezone
+from identifiers import models as identifier_models
+from plugins.oas import logic, ratelimit
+from plugins.oas.models import (
+    SwitchboardInboundMessage,
+    SwitchboardInboxCursor,
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def poll_inbox(journal, plugin_settings=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Fetch and store the messages received since the journal's cursor
+    :param journal: the journal whose inbox to poll
+    :param plugin_settings: the tuple returned by get_plugin_settings;
+    defaults to the journal's settings
+    :param page_size: the number of messages to request at a time
+    :return: the number of new messages stored
+    """
+    if plugin_settings is None:
+        plugin_settings = logic.get_journal_plugin_settings(journal)
+
+    oas_email, oas_password, url_to_use = logic.get_credentials(
+        plugin_settings
+    )
+    # polling is background traffic, so it leaves room for publications
+    token, success = logic.authorize(
+        oas_email,
+        oas_password,
+        url_to_use,
+        bulk=True,
+    )
+
+    if not success:
+        return 0
+
+    cursor, _ = SwitchboardInboxCursor.objects.get_or_create(journal=journal)
+    stored = 0
+
+    for page in fetch_pages(
+        url_to_use, token, cursor.last_message_id, page_size
+    ):
+        stored += store_messages(journal, page)
+
+        # advance after each page so an interrupted poll resumes from here
+        cursor.last_message_id = max(
+            cursor.last_message_id,
+            *(int(message["id"]) for message in page),
+        )
+        cursor.save()
+
+    cursor.polled = timezone.now()
+    cursor.save()
+
+    return stored
+
+
+def fetch_pages(url_to_use, token, after_id, page_size):
+    """
+    Request the messages after an ID, a page at a time, over the pooled
+    connection
+    :param url_to_use: the base URL to use
+    :param token: the bearer token to use
+    :param after_id: fetch messages with a higher ID than this
+    :param page_size: the number of messages to request at a time
+    :return: a generator of lists of messages
+    """
+    messages_url = f"{url_to_use}messages"
+    headers = {"Authorization": "Bearer " + token}
+
+    while True:
+        ratelimit.acquire("inbox", messages_url, bulk=True)
+
+        r = logic.get_session().get(
+            messages_url,
+            headers=headers,
+            params={
+                "afterId": after_id,
+                "pageSize": page_size,
+                "sortOrder": "asc",
+            },
+            timeout=logic.REQUEST_TIMEOUT,
+        )
+
+        if not r.ok:
+            logger.error(
+                f"Failed to fetch messages from OA Switchboard "
+                f"{messages_url}: {r.status_code}"
+            )
+            return
+
+        page = read_page(r.json())
+
+        if page:
+            yield page
+            after_id = max(int(message["id"]) for message in page)
+
+        if len(page) < page_size:
+            return
+
+
+def read_page(json_output):
+    """
+    Get the messages from a page of results
+    :param json_output: the parsed response
+    :return: a list of messages
+    """
+    if isinstance(json_output, dict):
+        json_output = json_output.get("data", [])
+
+    return [
+        message
+        for message in json_output or []
+        if isinstance(message, dict) and "id" in message
+    ]
+
+
+def message_doi(message):
+    """
+    Find the DOI of the article that a message is about
+    :param message: the message as received
+    :return: the DOI in lower case, or ""
+    """
+    article = (message.get("data") or {}).get("article") or {}
+    doi = article.get("doi") or ""
+
+    # DOIs may be sent as URLs and are not case-sensitive
+    for prefix in ("https://doi.org/", "http://doi.org/", "doi:"):
+        if doi.lower().startswith(prefix):
+            doi = doi[len(prefix) :]
+
+    return doi.strip().lower()
+
+
+def store_messages(journal, messages):
+    """
+    Save a page of messages, linking each to its article by DOI
+    :param journal: the journal the messages were fetched for
+    :param messages: a list of messages as received
+    :return: the number of new messages stored
+    """
+    dois = {message_doi(message) for message in messages} - {""}
+    articles = dict(
+        identifier_models.Identifier.objects.annotate(doi=Lower("identifier"))
+        .filter(
+            id_type="doi",
+            doi__in=dois,
+            article__journal=journal,
+        )
+        .values_list("doi", "article_id")
+    )
+
+    existing = set(
+        SwitchboardInboundMessage.objects.filter(
+            journal=journal,
+            switchboard_id__in=[message["id"] for message in messages],
+        ).values_list("switchboard_id", flat=True)
+    )
+
+    inbound_messages = []
+    for message in messages:
+        if int(message["id"]) in existing:
+            continue
+
+        header = message.get("header") or {}
+        sender = header.get("from") or {}
+        doi = message_doi(message)
+
+        inbound_message = SwitchboardInboundMessage(
+            journal=journal,
+            switchboard_id=int(message["id"]),
+            message_type=str(header.get("type", ""))[:255],
+            sender=str(sender.get("name") or sender.get("address", ""))[:255],
+            doi=doi[:255],
+            article_id=articles.get(doi),
+        )
+        inbound_message.message = message
+        inbound_messages.append(inbound_message)
+
+    SwitchboardInboundMessage.objects.bulk_create(
+        inbound_messages,
+        ignore_conflicts=True,
+    )
+
+    return len(inbound_messages)
@@ -7,16 +7,149 @@ __author__ = "Martin Paul Eve"
 __license__ = "AGPL v3"
 __maintainer__ = "Birkbeck University of London"
 
+import collections
+import copy
+import datetime
+import functools
+import gzip
+import hashlib
+import itertools
 import json
+import threading
+import time
 
 import requests
+from django.conf import settings
 from django.contrib import messages
-from plugins.oas.models import SwitchboardMessage
+from django.core.cache import cache
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    IntegrityError,
+    connection,
+    connections,
+    transaction,
+)
+from django.db.models import (
+    Aggregate,
+    Count,
+    FloatField,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+)
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from journal import models as journal_models
+from plugins.oas import (
+    changes,
+    funder_index,
+    health,
+    payload_cache,
+    ratelimit,
+    ror_index,
+    streaming,
+)
+from plugins.oas.models import (
+    SwitchboardDailySummary,
+    SwitchboardJob,
+    SwitchboardMessage,
+    SwitchboardQueueItem,
+    SwitchboardSyncState,
+)
+from submission import models as submission_models
 from utils import setting_handler
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+HEADER = {
+    "type": "p1",
+    "version": "v2",
+    "to": {
+        "address": "https://ror.org/broadcast",
+    },
+    "persistent": True,
+    "pio": True,
+}
+
+ALLOWED_LICENSES = (
+    "CC BY",
+    "CC BY-ND",
+    "CC BY-NC",
+    "CC BY-NC-SA",
+    "CC BY-NC-ND",
+    "CC BY-IGO",
+    "CC BY-not specified",
+    "CC BY-other",
+    "CC0",
+    "non-CC",
+    "not specified",
+)
+
+# licence short names with a known category, so that most articles skip the
+# prefix scan in license_category
+LICENSE_CATEGORIES = {
+    **{license_string: license_string for license_string in ALLOWED_LICENSES},
+    "Copyright": "non-CC",
+}
+
+# the largest response body read and stored. Override with
+# OAS_MAX_RESPONSE_BYTES in the Django settings.
+DEFAULT_MAX_RESPONSE_BYTES = 64 * 1024
+
+# the parts of a message response that are kept
+RESPONSE_FIELDS = ("error", "errorMessage", "id")
+
+# request bodies smaller than this are not worth compressing
+MIN_COMPRESSED_BYTES = 1024
+
+# seconds a second request for the same article waits for the first send
+DEFAULT_SEND_WAIT = 30
+SEND_POLL_INTERVAL = 0.5
+
+# times to try claiming an article whose previous send finishes as the
+# claim is made
+BEGIN_SEND_ATTEMPTS = 3
+
+# seconds the OA Switchboard is given to answer each request
+REQUEST_TIMEOUT = 30
+
+# seconds allowed for building and encoding a payload, on top of the time
+# a send's requests may take, before a send is assumed to have died
+STALE_SEND_MARGIN = 60
+
+# papers with more authors than this are encoded as they are sent
+DEFAULT_STREAM_AUTHORS = 500
+
+# authors, and their CRediT records, read from the database at a time
+AUTHOR_CHUNK_SIZE = 200
+
+# each thread keeps its own pooled HTTP session
+_http = threading.local()
+
+# URLs that have refused a compressed request body
+_uncompressed_urls = set()
+
+# the outcomes a message can have, as filters on SwitchboardMessage
+MESSAGE_STATUSES = {
+    "sent": Q(success=True),
+    "failed": Q(authorized=True, success=False),
+    "unauthorized": Q(authorized=False),
+}
+
+# seconds for which the delivery dashboard is cached
+DEFAULT_DASHBOARD_TTL = 60
+
+# the fraction of queue claims reserved for bulk work. Override with
+# OAS_BULK_SHARE in the Django settings.
+DEFAULT_BULK_SHARE = 0.1
+
+# a journal's share of queue claims relative to other journals with pending
+# items. Override per journal code with OAS_JOURNAL_WEIGHTS.
+DEFAULT_JOURNAL_WEIGHT = 1
+
 
 def publication_event_handler(**kwargs):
     """
@@ -42,11 +175,682 @@ def publication_event_handler(**kwargs):
 
     logger.info(f"Received article published notification on {article.title}")
 
-    switchboard_message = SwitchboardMessage()
+    # get the per-journal settings for the plugin
+    plugin_settings = get_plugin_settings(request)
+
+    # publications and manual sends go in the interactive lane, ahead of
+    # bulk work, so that a worker sends them first if this request cannot
+    queue_articles(
+        article.journal,
+        [article],
+        priority=SwitchboardQueueItem.INTERACTIVE,
+    )
+
+    # while the endpoint is known to be down, leave the message for the
+    # drain worker rather than waiting for a timeout
+    if not health.is_healthy(get_credentials(plugin_settings)[2]):
+        messages.add_message(
+            request,
+            messages.WARNING,
+            "OA Switchboard is unavailable. The p1-pio message will be sent "
+            "when it recovers.",
+        )
+        return
+
+    item = claim_queue_item(article_id=article.pk)
+
+    if item is None:
+        # a worker has claimed the article already
+        messages.add_message(
+            request,
+            messages.INFO,
+            "This article is already being sent to OA Switchboard.",
+        )
+        return
+
+    try:
+        switchboard_message, json_output = deliver_article(
+            article, plugin_settings
+        )
+    except Exception:
+        complete_queue_item(item, None)
+        raise
+
+    complete_queue_item(item, switchboard_message)
+
+    if switchboard_message.pending:
+        messages.add_message(
+            request,
+            messages.INFO,
+            "This article is already being sent to OA Switchboard.",
+        )
+        return
+
+    if switchboard_message.failure_class in (
+        SwitchboardMessage.TIMEOUT,
+        SwitchboardMessage.ERROR,
+    ):
+        messages.add_message(
+            request,
+            messages.ERROR,
+            "Could not reach OA Switchboard. The p1-pio message was not sent.",
+        )
+        return
+
+    if not switchboard_message.authorized:
+        messages.add_message(
+            request,
+            messages.ERROR,
+            "Failed to authorize with OA Switchboard.",
+        )
+        return
+
+    if switchboard_message.success:
+        messages.add_message(
+            request,
+            messages.SUCCESS,
+            "p1-pio message sent to OA Switchboard.",
+        )
+        return
+
+    messages.add_message(
+        request,
+        messages.ERROR,
+        f"Failed to send p1-pio message to OA Switchboard: \
+        {[item for item in (json_output or {}).get('errorMessage', [])]}",
+    )
+
+
+def deliver_article(article, plugin_settings, bulk=False):
+    """
+    Authorize, build and send the p1-pio message for an article
+    :param article: the article to send
+    :param plugin_settings: the tuple returned by get_plugin_settings
+    :param bulk: whether this is bulk traffic that may yield to publications
+    :return: the saved SwitchboardMessage and the parsed response (or None)
+    """
+    switchboard_message, created = begin_send(article)
+
+    if not created:
+        # another request is already sending this article, so wait for it
+        # rather than sending a duplicate
+        logger.info(f"Article {article.pk} is already being sent")
+        finished = wait_for_send(switchboard_message)
+        if finished is None:
+            return switchboard_message, None
+        return finished, read_stored_response(finished)
+
+    authorized = False
+    payload = None
+
+    try:
+        oas_email, oas_password, url_to_use = get_credentials(plugin_settings)
+
+        # try authorization
+        token, authorized = authorize(
+            oas_email, oas_password, url_to_use, bulk=bulk
+        )
+        if not authorized:
+            switchboard_message = record_message(
+                article,
+                authorized=False,
+                switchboard_message=switchboard_message,
+            )
+            return switchboard_message, None
+
+        # build the payload message
+        payload = build_payload_for_sending(article)
+
+        # send the payload
+        started = time.monotonic()
+        json_output, success = send_payload(
+            payload, token, url_to_use, bulk=bulk
+        )
+    except Exception as error:
+        switchboard_message = record_message(
+            article,
+            authorized=authorized,
+            payload=payload,
+            failure_class=classify_send_error(error),
+            switchboard_message=switchboard_message,
+        )
+        # the rate limiter raises TimeoutError when it gives up waiting
+        if not isinstance(error, (requests.RequestException, TimeoutError)):
+            raise
+        logger.warning(
+            f"Failed to send article {article.pk} to OA Switchboard: {error}"
+        )
+        return switchboard_message, None
+
+    switchboard_message = record_message(
+        article,
+        authorized=True,
+        payload=payload,
+        json_output=json_output,
+        success=success,
+        latency_ms=int((time.monotonic() - started) * 1000),
+        switchboard_message=switchboard_message,
+    )
+
+    return switchboard_message, json_output
+
+
+def classify_send_error(error):
+    """
+    Name the failure class of an exception raised while sending
+    :param error: the exception
+    :return: SwitchboardMessage.TIMEOUT or SwitchboardMessage.ERROR
+    """
+    if isinstance(error, (requests.Timeout, TimeoutError)):
+        return SwitchboardMessage.TIMEOUT
+    return SwitchboardMessage.ERROR
+
+
+def begin_send(article):
+    """
+    Record that an article is being sent, unless another request, in any
+    process, is sending it already
+    :param article: the article to send
+    :return: the pending SwitchboardMessage, and True if this caller created
+    it and so must send it
+    :raises IntegrityError: if the message cannot be created for any other
+    reason
+    """
+    clear_stale_sends(article)
+
+    for attempt in range(BEGIN_SEND_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                switchboard_message = SwitchboardMessage.objects.create(
+                    article=article,
+                    journal_id=article.journal_id,
+                    pending=True,
+                    in_flight_key=article.pk,
+                )
+            return switchboard_message, True
+        except IntegrityError:
+            in_flight = SwitchboardMessage.objects.filter(
+                article=article,
+                pending=True,
+            ).first()
+
+            if in_flight is not None:
+                return in_flight, False
+
+            # the other send may finish between the insert and the read, but
+            # an error that is not about a send in flight would repeat
+            # forever
+            if attempt == BEGIN_SEND_ATTEMPTS - 1:
+                raise
+
+
+def poll_send(switchboard_message):
+    """
+    Reload a message that is being sent
+    :param switchboard_message: the pending SwitchboardMessage
+    :return: the current SwitchboardMessage, or None if the send was
+    abandoned
+    """
+    return SwitchboardMessage.objects.filter(pk=switchboard_message.pk).first()
+
+
+def wait_for_send(switchboard_message, timeout=None):
+    """
+    Wait for another request's send to finish
+    :param switchboard_message: the pending SwitchboardMessage
+    :param timeout: the longest to wait in seconds; defaults to OAS_SEND_WAIT
+    :return: the finished SwitchboardMessage, or None
+    """
+    if timeout is None:
+        timeout = get_send_wait()
+    deadline = time.monotonic() + timeout
+
+    while True:
+        current = poll_send(switchboard_message)
+
+        if current is None or not current.pending:
+            return current
+
+        if time.monotonic() >= deadline:
+            return None
+
+        time.sleep(SEND_POLL_INTERVAL)
+
+
+def get_send_wait():
+    """
+    Get how long a request waits for another request's send of the same
+    article
+    :return: the time in seconds
+    """
+    return getattr(settings, "OAS_SEND_WAIT", DEFAULT_SEND_WAIT)
+
+
+def get_stale_send_age():
+    """
+    Get how old a pending send must be before it is assumed to have died. A
+    live send makes two requests, the authorization and the message, and
+    each may wait as long as the rate limiter allows and then time out.
+    :return: the time in seconds
+    """
+    return 2 * (ratelimit.get_max_wait() + REQUEST_TIMEOUT) + STALE_SEND_MARGIN
+
+
+def clear_stale_sends(article=None):
+    """
+    Remove pending messages left behind by a process that stopped in the
+    middle of a send
+    :param article: only clear the sends of this article
+    :return: the number of sends cleared
+    """
+    cutoff = timezone.now() - datetime.timedelta(
+        seconds=get_stale_send_age(),
+    )
+    stale = SwitchboardMessage.objects.filter(
+        pending=True,
+        message_date_time__lt=cutoff,
+    )
+    if article is not None:
+        stale = stale.filter(article=article)
+
+    cleared, _ = stale.delete()
+
+    if cleared:
+        logger.warning(f"Cleared {cleared} interrupted OA Switchboard sends")
+
+    return cleared
+
+
+def read_stored_response(switchboard_message):
+    """
+    Parse the stored response of a message
+    :param switchboard_message: the SwitchboardMessage
+    :return: the parsed JSON, or None
+    """
+    try:
+        return json.loads(switchboard_message.response)
+    except ValueError:
+        return None
+
+
+def record_message(
+    article,
+    authorized,
+    payload=None,
+    json_output=None,
+    success=False,
+    latency_ms=None,
+    switchboard_message=None,
+    failure_class="",
+):
+    """
+    Save the log entry for a message sent to the OA Switchboard
+    :param article: the article the message was about
+    :param authorized: whether authorization succeeded
+    :param payload: the payload that was sent, if any
+    :param json_output: the parsed response, if any
+    :param success: whether the message was accepted
+    :param latency_ms: how long the send took, in milliseconds
+    :param switchboard_message: the pending message to complete, if any
+    :param failure_class: why the send failed, if it raised an exception
+    :return: the saved SwitchboardMessage
+    """
+    if switchboard_message is None:
+        switchboard_message = SwitchboardMessage()
+
+    switchboard_message.pending = False
+    switchboard_message.in_flight_key = None
     switchboard_message.broadcast = True
     switchboard_message.article = article
+    switchboard_message.journal_id = article.journal_id
+    switchboard_message.authorized = authorized
+    switchboard_message.latency_ms = latency_ms
+
+    if failure_class:
+        switchboard_message.failure_class = failure_class
+    elif not authorized:
+        switchboard_message.failure_class = SwitchboardMessage.UNAUTHORIZED
+    elif not success:
+        switchboard_message.failure_class = SwitchboardMessage.REJECTED
+
+    if isinstance(payload, streaming.StreamedPayload):
+        # the message was compressed and hashed as it was sent
+        payload.finish()
+        switchboard_message.message_body = payload.message_body
+        switchboard_message.response = json_output
+        switchboard_message.fingerprint = payload.fingerprint
+    elif payload is not None:
+        switchboard_message.message = payload
+        switchboard_message.response = json_output
+        switchboard_message.fingerprint = fingerprint_payload(payload)
+
+    switchboard_message.success = success
+    switchboard_message.save()
 
-    # get the per-journal settings for the plugin
+    return switchboard_message
+
+
+def fingerprint_payload(payload):
+    """
+    Hash a payload so that metadata changes can be detected cheaply
+    :param payload: the payload dictionary
+    :return: a hex SHA-256 digest of the canonical JSON encoding
+    """
+    canonical = json.dumps(
+        payload,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def index_signature():
+    """
+    Identify the ROR index and funder crosswalk currently in use, which
+    change payloads without any edit when they are rebuilt
+    :return: a string
+    """
+    return f"{ror_index.get_signature()}|{funder_index.get_signature()}"
+
+
+def find_changed_articles(journal, since=None):
+    """
+    Find sent articles whose payload no longer matches the last one sent.
+    Articles last sent before fingerprints were recorded are skipped, as
+    there is nothing to compare them with.
+    :param journal: the journal to check
+    :param since: only rebuild articles modified, or marked as changed by
+    the changes module, after this time. None rebuilds every sent article.
+    :return: a list of articles whose metadata has changed
+    """
+    last_fingerprint = (
+        SwitchboardMessage.objects.filter(
+            article=OuterRef("pk"),
+            success=True,
+        )
+        .order_by("-message_date_time", "-pk")
+        .values("fingerprint")[:1]
+    )
+
+    candidates = submission_models.Article.objects.filter(
+        journal=journal,
+        stage=submission_models.STAGE_PUBLISHED,
+    )
+    if since is not None:
+        candidates = candidates.filter(
+            Q(last_modified__gte=since)
+            | Q(pk__in=changes.changed_since(since))
+        )
+
+    candidates = (
+        candidates.annotate(last_fingerprint=Subquery(last_fingerprint))
+        .exclude(last_fingerprint=None)
+        .exclude(last_fingerprint="")
+    )
+
+    changed = []
+    for article in candidates.iterator(chunk_size=200):
+        fingerprint = fingerprint_payload(build_payload(article))
+        if fingerprint != article.last_fingerprint:
+            changed.append(article)
+
+    return changed
+
+
+def sync_journal(journal, full=False):
+    """
+    Queue resends for a journal's articles whose metadata has changed since
+    the last sync. Every sent article is checked on the first run, and
+    whenever the journal's own details or the ROR or funder indexes have
+    changed since, as those change payloads without marking any article.
+    :param journal: the journal to sync
+    :param full: check every sent article regardless
+    :return: the SwitchboardJob of resends
+    """
+    started = timezone.now()
+    signature = index_signature()
+    journal_version = payload_cache.get_versions(
+        [(payload_cache.JOURNAL, journal.pk)],
+    )[(payload_cache.JOURNAL, journal.pk)]
+
+    state = SwitchboardSyncState.objects.filter(journal=journal).first()
+    since = None
+    if (
+        not full
+        and state is not None
+        and state.index_signature == signature
+        and state.journal_version == journal_version
+    ):
+        since = state.synced
+
+    changed = find_changed_articles(journal, since=since)
+    job = queue_articles(journal, changed)
+
+    # the next run starts from when this one began, so edits made while it
+    # ran are checked again
+    SwitchboardSyncState.objects.update_or_create(
+        journal=journal,
+        defaults={
+            "synced": started,
+            "index_signature": signature,
+            "journal_version": journal_version,
+        },
+    )
+
+    return job
+
+
+def message_status_counts():
+    """
+    Aggregates that count messages by outcome
+    :return: keyword arguments for QuerySet.aggregate or annotate
+    """
+    return {
+        status: Count("pk", filter=condition)
+        for status, condition in MESSAGE_STATUSES.items()
+    }
+
+
+def summarise_messages(before):
+    """
+    Record daily per-journal counts for the messages sent before a date.
+    Each run starts after the last day already summarised, so a day is
+    summarised once, while all of its messages are still present.
+    :param before: summarise the days before this date
+    :return: the number of summaries created
+    """
+    messages_to_summarise = SwitchboardMessage.objects.filter(
+        message_date_time__date__lt=before,
+        pending=False,
+    )
+
+    last_summarised = SwitchboardDailySummary.objects.aggregate(
+        last=Max("date"),
+    )["last"]
+    if last_summarised:
+        messages_to_summarise = messages_to_summarise.filter(
+            message_date_time__date__gt=last_summarised,
+        )
+
+    rows = (
+        messages_to_summarise.annotate(date=TruncDate("message_date_time"))
+        .values("journal_id", "date")
+        .annotate(**message_status_counts())
+        .order_by()
+    )
+
+    summaries = [
+        SwitchboardDailySummary(
+            journal_id=row["journal_id"],
+            date=row["date"],
+            sent=row["sent"],
+            failed=row["failed"],
+            unauthorized=row["unauthorized"],
+        )
+        for row in rows.iterator()
+    ]
+
+    SwitchboardDailySummary.objects.bulk_create(
+        summaries,
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+    return len(summaries)
+
+
+class Percentile(Aggregate):
+    """
+    PostgreSQL's continuous percentile of an expression
+    """
+
+    function = "PERCENTILE_CONT"
+    template = (
+        "%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    )
+    output_field = FloatField()
+
+
+def latency_percentiles(queryset, fractions=(0.5, 0.95)):
+    """
+    Calculate send latency percentiles in the database
+    :param queryset: the SwitchboardMessages to measure
+    :param fractions: the percentiles wanted, as fractions
+    :return: a dict of fraction to latency in milliseconds, or None
+    """
+    queryset = queryset.filter(latency_ms__isnull=False)
+
+    if connections[queryset.db].vendor == "postgresql":
+        results = queryset.aggregate(
+            **{
+                str(fraction): Percentile("latency_ms", fraction=fraction)
+                for fraction in fractions
+            }
+        )
+        return {fraction: results[str(fraction)] for fraction in fractions}
+
+    # other databases have no percentile aggregate, so read the single
+    # value at each rank instead
+    total = queryset.count()
+    ordered = queryset.order_by("latency_ms").values_list(
+        "latency_ms",
+        flat=True,
+    )
+    return {
+        fraction: (
+            ordered[min(int(fraction * total), total - 1)] if total else None
+        )
+        for fraction in fractions
+    }
+
+
+def get_reporting_database():
+    """
+    Get the database that reporting queries are read from. Set
+    OAS_REPORTING_DB to the alias of a read replica to keep them off the
+    primary; writes and the publishing path always use the primary.
+    :return: a database alias
+    """
+    return getattr(settings, "OAS_REPORTING_DB", None) or DEFAULT_DB_ALIAS
+
+
+def reporting_queryset(model):
+    """
+    Get a QuerySet for a read-only report
+    :param model: the model to report on
+    :return: a QuerySet on the reporting database
+    """
+    return model.objects.using(get_reporting_database())
+
+
+def get_dashboard_ttl():
+    """
+    Get how long dashboard statistics are cached for
+    :return: the time in seconds
+    """
+    return getattr(settings, "OAS_DASHBOARD_TTL", DEFAULT_DASHBOARD_TTL)
+
+
+def delivery_stats(journal=None, days=30):
+    """
+    Get the delivery statistics shown on the dashboard, cached briefly so
+    that repeated page loads do not repeat the aggregates
+    :param journal: the journal to report on, or None for the whole press
+    :param days: the number of days to report on
+    :return: a dict of statistics
+    """
+    key = f"oas:dashboard:{journal.pk if journal else 'press'}:{days}"
+    stats = cache.get(key)
+
+    if stats is None:
+        stats = calculate_delivery_stats(journal=journal, days=days)
+        cache.set(key, stats, get_dashboard_ttl())
+
+    return stats
+
+
+def calculate_delivery_stats(journal=None, days=30):
+    """
+    Aggregate the messages of the last few days in the database
+    :param journal: the journal to report on, or None for the whole press
+    :param days: the number of days to report on
+    :return: a dict of statistics
+    """
+    since = timezone.now() - datetime.timedelta(days=days)
+    recent = reporting_queryset(SwitchboardMessage).filter(
+        message_date_time__gte=since,
+        pending=False,
+    )
+
+    if journal:
+        recent = recent.filter(journal=journal)
+
+    by_journal = list(
+        recent.values("journal_id")
+        .annotate(**message_status_counts())
+        .order_by("journal_id")
+    )
+    by_day = list(
+        recent.annotate(date=TruncDate("message_date_time"))
+        .values("date")
+        .annotate(**message_status_counts())
+        .order_by("date")
+    )
+    failure_classes = list(
+        recent.exclude(failure_class="")
+        .values("failure_class")
+        .annotate(count=Count("pk"))
+        .order_by("-count")
+    )
+
+    totals = {
+        status: sum(row[status] for row in by_journal)
+        for status in message_status_counts()
+    }
+    attempts = sum(totals.values())
+    percentiles = latency_percentiles(recent)
+
+    return {
+        "days": days,
+        "totals": totals,
+        "success_rate": (
+            round(100 * totals["sent"] / attempts, 1) if attempts else None
+        ),
+        "by_journal": by_journal,
+        "by_day": by_day,
+        "failure_classes": failure_classes,
+        "latency_p50": percentiles[0.5],
+        "latency_p95": percentiles[0.95],
+    }
+
+
+def get_credentials(plugin_settings):
+    """
+    Pick the credentials and the live or sandbox URL to send with
+    :param plugin_settings: the tuple returned by get_plugin_settings
+    :return: the email, password and base URL (with a trailing slash)
+    """
     (
         oas_enabled,
         oas_email,
@@ -54,7 +858,7 @@ def publication_event_handler(**kwargs):
         oas_password,
         oas_url,
         oas_sandbox_url,
-    ) = get_plugin_settings(request)
+    ) = plugin_settings
 
     # setup switchboard option
     switchboard = oas_sandbox and oas_enabled
@@ -62,68 +866,641 @@ def publication_event_handler(**kwargs):
     if not url_to_use.endswith("/"):
         url_to_use += "/"
 
-    # try authorization
-    token, success = authorize(oas_email, oas_password, url_to_use)
-    if not success:
-        switchboard_message.authorized = False
-        switchboard_message.save()
-        messages.add_message(
-            request,
-            messages.ERROR,
-            "Failed to authorize with OA Switchboard.",
+    return oas_email, oas_password, url_to_use
+
+
+def queue_articles(
+    journal,
+    articles,
+    owner=None,
+    priority=SwitchboardQueueItem.BULK,
+):
+    """
+    Queue articles to be sent to the OA Switchboard in the background
+    :param journal: the journal whose settings will be used to send
+    :param articles: an iterable of articles to queue
+    :param owner: the user who requested the send
+    :param priority: the lane to queue in, interactive or bulk
+    :return: the SwitchboardJob grouping the queued articles
+    """
+    job = SwitchboardJob.objects.create(journal=journal, owner=owner)
+
+    # an article already waiting in the queue does not need a second send
+    already_queued = set(
+        SwitchboardQueueItem.objects.filter(
+            journal=journal,
+            status__in=[
+                SwitchboardQueueItem.PENDING,
+                SwitchboardQueueItem.SENDING,
+            ],
+        ).values_list("article_id", flat=True)
+    )
+
+    items = []
+    promoted = []
+    for article in articles:
+        if article.pk in already_queued:
+            promoted.append(article.pk)
+        else:
+            items.append(
+                SwitchboardQueueItem(
+                    job=job,
+                    journal=journal,
+                    article=article,
+                    priority=priority,
+                )
+            )
+
+    SwitchboardQueueItem.objects.bulk_create(items, batch_size=500)
+
+    if priority == SwitchboardQueueItem.INTERACTIVE and promoted:
+        # a publication overtakes a bulk send of the same article
+        SwitchboardQueueItem.objects.filter(
+            article_id__in=promoted,
+            status=SwitchboardQueueItem.PENDING,
+        ).update(priority=SwitchboardQueueItem.INTERACTIVE)
+
+    if not job.items.exists():
+        job.completed = timezone.now()
+        job.save()
+
+    return job
+
+
+def start_job(job):
+    """
+    Start processing a job's queue items in a background thread of this
+    process. The thread dies with the web worker, so oas_drain must also be
+    scheduled to send whatever it leaves behind.
+    :param job: the SwitchboardJob to process
+    """
+    thread = threading.Thread(
+        target=_process_job_in_thread,
+        args=(job.pk,),
+        daemon=True,
+    )
+    thread.start()
+
+
+def _process_job_in_thread(job_id):
+    try:
+        drain_queue(job_id=job_id)
+    except Exception:
+        logger.exception(f"OA Switchboard job {job_id} failed")
+    finally:
+        connection.close()
+
+
+def claim_queue_item(
+    job_id=None,
+    prefer_bulk=False,
+    exclude=None,
+    journal_id=None,
+    article_id=None,
+):
+    """
+    Claim the oldest pending queue item so that no other worker sends it.
+    Interactive items are claimed before bulk items unless prefer_bulk is set.
+    :param job_id: restrict the claim to the items of one job
+    :param prefer_bulk: claim from the bulk lane first
+    :param exclude: the IDs of items not to claim
+    :param journal_id: restrict the claim to the items of one journal
+    :param article_id: restrict the claim to the items of one article
+    :return: the claimed SwitchboardQueueItem, or None if nothing is pending
+    """
+    with transaction.atomic():
+        queryset = SwitchboardQueueItem.objects.select_for_update(
+            skip_locked=True
+        ).filter(status=SwitchboardQueueItem.PENDING)
+
+        if job_id is not None:
+            queryset = queryset.filter(job_id=job_id)
+        if journal_id is not None:
+            queryset = queryset.filter(journal_id=journal_id)
+        if article_id is not None:
+            queryset = queryset.filter(article_id=article_id)
+        if exclude:
+            queryset = queryset.exclude(pk__in=exclude)
+
+        item = queryset.order_by(
+            "-priority" if prefer_bulk else "priority",
+            "created",
+            "pk",
+        ).first()
+
+        if item is None:
+            return None
+
+        item.status = SwitchboardQueueItem.SENDING
+        item.started = timezone.now()
+        item.save()
+
+    return item
+
+
+def process_queue_item(item):
+    """
+    Send a claimed queue item and record the outcome
+    :param item: the SwitchboardQueueItem to send
+    :return: False if the item was deferred because its endpoint is down
+    """
+    plugin_settings = get_journal_plugin_settings(item.journal)
+
+    if not health.is_healthy(get_credentials(plugin_settings)[2]):
+        defer_queue_item(item)
+        return False
+
+    try:
+        switchboard_message, _ = deliver_article(
+            item.article,
+            plugin_settings,
+            bulk=item.priority == SwitchboardQueueItem.BULK,
         )
-        return
+    except Exception:
+        logger.exception(
+            f"Failed to send queued article {item.article_id} "
+            "to OA Switchboard"
+        )
+        switchboard_message = None
 
-    switchboard_message.authorized = True
+    complete_queue_item(item, switchboard_message)
 
-    # build the payload message
-    payload = build_payload(article)
+    return True
 
-    # send the payload
-    json_output, success = send_payload(payload, token, url_to_use)
 
-    switchboard_message.message = payload
-    switchboard_message.response = json_output
+def defer_queue_item(item):
+    """
+    Return a claimed item to the queue unsent
+    :param item: the SwitchboardQueueItem to defer
+    """
+    item.status = SwitchboardQueueItem.PENDING
+    item.started = None
+    item.save()
 
-    if success:
-        switchboard_message.success = True
-        switchboard_message.save()
-        messages.add_message(
-            request,
-            messages.SUCCESS,
-            "p1-pio message sent to OA Switchboard.",
+
+def get_configured_endpoints(journals):
+    """
+    Find the live and sandbox endpoints of the journals that send to the OA
+    Switchboard, with credentials to probe each one
+    :param journals: the journals to look at
+    :return: a dict of base URL to authorization JSON
+    """
+    endpoints = {}
+
+    for journal in journals:
+        (
+            oas_enabled,
+            oas_email,
+            _,
+            oas_password,
+            oas_url,
+            oas_sandbox_url,
+        ) = get_journal_plugin_settings(journal)
+
+        if not oas_enabled:
+            continue
+
+        for url in (oas_url, oas_sandbox_url):
+            if not url:
+                continue
+            if not url.endswith("/"):
+                url += "/"
+            endpoints.setdefault(
+                url,
+                build_authorization_json(oas_email, oas_password),
+            )
+
+    return endpoints
+
+
+def complete_queue_item(item, switchboard_message):
+    """
+    Record the outcome of sending a queue item
+    :param item: the SwitchboardQueueItem that was sent
+    :param switchboard_message: the resulting SwitchboardMessage, if any
+    """
+    item.message = switchboard_message
+    item.status = (
+        SwitchboardQueueItem.SENT
+        if switchboard_message and switchboard_message.success
+        else SwitchboardQueueItem.FAILED
+    )
+    item.finished = timezone.now()
+    item.save()
+
+    if item.job_id is not None:
+        finish_job_if_complete(item.job_id)
+
+
+def finish_job_if_complete(job_id):
+    """
+    Mark a job as completed once none of its items are outstanding
+    :param job_id: the ID of the SwitchboardJob
+    """
+    outstanding = SwitchboardQueueItem.objects.filter(
+        job_id=job_id,
+        status__in=[
+            SwitchboardQueueItem.PENDING,
+            SwitchboardQueueItem.SENDING,
+        ],
+    ).exists()
+
+    if not outstanding:
+        SwitchboardJob.objects.filter(pk=job_id, completed=None).update(
+            completed=timezone.now()
         )
-        return
 
-    switchboard_message.success = False
-    switchboard_message.save()
 
-    messages.add_message(
-        request,
-        messages.ERROR,
-        f"Failed to send p1-pio message to OA Switchboard: \
-        {[item for item in json_output.get('errorMessage', [])]}",
+def release_stale_queue_items(older_than):
+    """
+    Return items whose worker died mid-send to the pending state
+    :param older_than: a timedelta after which a send is considered stale
+    :return: the number of items released
+    """
+    return SwitchboardQueueItem.objects.filter(
+        status=SwitchboardQueueItem.SENDING,
+        started__lt=timezone.now() - older_than,
+    ).update(status=SwitchboardQueueItem.PENDING, started=None)
+
+
+def get_bulk_share_interval():
+    """
+    Get how often a worker serves the bulk lane ahead of the interactive lane
+    :return: serve bulk on every Nth claim, or 0 to never prefer bulk
+    """
+    share = getattr(settings, "OAS_BULK_SHARE", DEFAULT_BULK_SHARE)
+    if not share:
+        return 0
+    return max(1, round(1 / share))
+
+
+def get_journal_weights():
+    """
+    Get the configured share of queue claims for each journal
+    :return: a dict of journal ID to weight
+    """
+    weights = getattr(settings, "OAS_JOURNAL_WEIGHTS", {})
+    codes = {code: weight for code, weight in weights.items() if weight > 0}
+
+    return {
+        journal_id: codes[code]
+        for code, journal_id in journal_models.Journal.objects.filter(
+            code__in=codes,
+        ).values_list("code", "pk")
+    }
+
+
+class FairScheduler:
+    """
+    Deficit round-robin over the journals with pending queue items, so that
+    one journal's backlog cannot hold up delivery for the others. On each
+    turn a journal's deficit grows by its weight and each claim from it
+    costs one, so between two claims for any journal the others can claim
+    at most their weight (rounded up) each.
+    """
+
+    def __init__(self, job_id=None):
+        """
+        :param job_id: only claim the items of this job
+        """
+        self.job_id = job_id
+        self.weights = get_journal_weights()
+        self.deficits = {}
+        self.rotation = collections.deque()
+        # journals whose deficit has been topped up on their current turn
+        self.topped_up = set()
+
+    def weight(self, journal_id):
+        return self.weights.get(journal_id, DEFAULT_JOURNAL_WEIGHT)
+
+    def pending_journals(self, exclude=None):
+        queryset = SwitchboardQueueItem.objects.filter(
+            status=SwitchboardQueueItem.PENDING,
+        )
+
+        if self.job_id is not None:
+            queryset = queryset.filter(job_id=self.job_id)
+        if exclude:
+            queryset = queryset.exclude(pk__in=exclude)
+
+        return set(
+            queryset.order_by().values_list("journal_id", flat=True).distinct()
+        )
+
+    def next_journal(self, exclude=None):
+        """
+        Pick the journal to claim from next
+        :param exclude: the IDs of items not to claim
+        :return: a journal ID, or None if nothing is pending
+        """
+        active = self.pending_journals(exclude)
+
+        # a journal with nothing left to send gives up its deficit
+        for journal_id in list(self.rotation):
+            if journal_id not in active:
+                self.drop(journal_id)
+
+        for journal_id in sorted(active - set(self.rotation)):
+            self.rotation.append(journal_id)
+            self.deficits[journal_id] = 0
+
+        while self.rotation:
+            journal_id = self.rotation[0]
+
+            if self.deficits[journal_id] >= 1:
+                return journal_id
+
+            if journal_id in self.topped_up:
+                # this journal's turn is over
+                self.topped_up.discard(journal_id)
+                self.rotation.rotate(-1)
+            else:
+                self.deficits[journal_id] += self.weight(journal_id)
+                self.topped_up.add(journal_id)
+
+        return None
+
+    def drop(self, journal_id):
+        self.rotation.remove(journal_id)
+        self.deficits.pop(journal_id, None)
+        self.topped_up.discard(journal_id)
+
+    def claim(self, prefer_bulk=False, exclude=None):
+        """
+        Claim the next queue item in fair order
+        :param prefer_bulk: claim from the journal's bulk lane first
+        :param exclude: the IDs of items not to claim
+        :return: the claimed SwitchboardQueueItem, or None if nothing is
+        pending
+        """
+        while True:
+            journal_id = self.next_journal(exclude)
+
+            if journal_id is None:
+                return None
+
+            item = claim_queue_item(
+                job_id=self.job_id,
+                prefer_bulk=prefer_bulk,
+                exclude=exclude,
+                journal_id=journal_id,
+            )
+
+            if item is not None:
+                self.deficits[journal_id] -= 1
+                return item
+
+            # another worker claimed this journal's last item
+            self.drop(journal_id)
+
+
+def queue_depths(journal=None):
+    """
+    Count the pending and sending queue items of each journal
+    :param journal: only count the items of this journal
+    :return: a list of dicts with journal_id, interactive, bulk, sending,
+    oldest and weight
+    """
+    queryset = SwitchboardQueueItem.objects.filter(
+        status__in=[
+            SwitchboardQueueItem.PENDING,
+            SwitchboardQueueItem.SENDING,
+        ],
     )
+    if journal is not None:
+        queryset = queryset.filter(journal=journal)
+
+    pending = Q(status=SwitchboardQueueItem.PENDING)
+    weights = get_journal_weights()
+
+    rows = (
+        queryset.values("journal_id")
+        .annotate(
+            interactive=Count(
+                "pk",
+                filter=pending & Q(priority=SwitchboardQueueItem.INTERACTIVE),
+            ),
+            bulk=Count(
+                "pk",
+                filter=pending & Q(priority=SwitchboardQueueItem.BULK),
+            ),
+            sending=Count(
+                "pk",
+                filter=Q(status=SwitchboardQueueItem.SENDING),
+            ),
+            oldest=Min("created", filter=pending),
+        )
+        .order_by("journal_id")
+    )
+
+    return [
+        dict(
+            row,
+            weight=weights.get(row["journal_id"], DEFAULT_JOURNAL_WEIGHT),
+        )
+        for row in rows
+    ]
+
+
+def drain_queue(job_id=None, limit=None):
+    """
+    Send queued articles until the queue is empty. Journals take turns in
+    proportion to their weights. Within a journal, interactive items are
+    always sent first, except that a share of claims go to the bulk lane
+    so that a steady stream of publications cannot starve a backfill.
+    :param job_id: only send the items of this job
+    :param limit: the maximum number of items to send
+    :return: the number of items processed
+    """
+    processed = 0
+    bulk_interval = get_bulk_share_interval()
+    scheduler = FairScheduler(job_id=job_id)
+    # items whose endpoint is down are left for a later run
+    deferred = set()
+
+    while limit is None or processed < limit:
+        prefer_bulk = bool(bulk_interval) and (
+            (processed + 1) % bulk_interval == 0
+        )
+        item = scheduler.claim(prefer_bulk=prefer_bulk, exclude=deferred)
+
+        if item is None:
+            break
+
+        if process_queue_item(item) is False:
+            deferred.add(item.pk)
+            continue
+
+        processed += 1
+
+    return processed
 
 
-def send_payload(payload, token, url_to_use):
+def send_payload(payload, token, url_to_use, bulk=False):
     """
     Send the payload to the OA Switchboard
     :param payload: the payload to send
     :param token: the bearer token to use
     :param url_to_use: the base URL to use
+    :param bulk: whether this is bulk traffic that may yield to publications
     """
-    headers = {"Authorization": "Bearer " + token}
     message_url = f"{url_to_use}message"
 
-    r = requests.post(
-        message_url, headers=headers, data=json.dumps(payload), timeout=30
+    while True:
+        content, headers = encode_request_body(
+            "message", message_url, encode_payload(payload)
+        )
+        headers["Authorization"] = "Bearer " + token
+
+        ratelimit.acquire("message", message_url, bulk=bulk)
+
+        r = get_session().post(
+            message_url,
+            headers=headers,
+            data=content,
+            timeout=REQUEST_TIMEOUT,
+            stream=True,
+        )
+
+        with r:
+            if refuses_compression(r, message_url, headers):
+                continue
+
+            content = read_capped_content(r.iter_content(chunk_size=8192))
+
+        return read_message_response(content)
+
+
+def get_session():
+    """
+    Get this thread's HTTP session, which keeps connections to the OA
+    Switchboard open between sends
+    :return: a requests.Session
+    """
+    if not hasattr(_http, "session"):
+        _http.session = requests.Session()
+
+    return _http.session
+
+
+def compresses_requests(endpoint, url):
+    """
+    Whether request bodies sent to an endpoint should be gzipped. This is
+    configured per endpoint in OAS_COMPRESS_REQUESTS, and turned off for a
+    URL that has refused a compressed body.
+    :param endpoint: the endpoint name, e.g. "message"
+    :param url: the URL being called
+    :return: True to compress
+    """
+    configured = getattr(settings, "OAS_COMPRESS_REQUESTS", {})
+
+    return bool(configured.get(endpoint)) and url not in _uncompressed_urls
+
+
+def encode_payload(payload):
+    """
+    Encode a payload for sending
+    :param payload: a payload dict or a StreamedPayload
+    :return: the JSON as bytes, or a generator of bytes when streamed
+    """
+    if isinstance(payload, streaming.StreamedPayload):
+        return payload.chunks()
+
+    return json.dumps(payload).encode("utf-8")
+
+
+def encode_request_body(endpoint, url, body):
+    """
+    Compress a request body if the endpoint accepts it
+    :param endpoint: the endpoint name, e.g. "message"
+    :param url: the URL being called
+    :param body: the encoded JSON body, as bytes or a generator of bytes
+    :return: the body to send and the headers that describe it
+    """
+    headers = {"Content-Type": "application/json"}
+
+    if not isinstance(body, bytes):
+        # a streamed body is sent with chunked transfer encoding
+        if compresses_requests(endpoint, url):
+            headers["Content-Encoding"] = "gzip"
+            return streaming.gzip_chunks(body), headers
+        return body, headers
+
+    if len(body) >= MIN_COMPRESSED_BYTES and compresses_requests(
+        endpoint, url
+    ):
+        headers["Content-Encoding"] = "gzip"
+        return gzip.compress(body, compresslevel=6), headers
+
+    return body, headers
+
+
+def refuses_compression(r, url, headers):
+    """
+    Check whether a compressed request was refused because it was
+    compressed, so that it can be sent again without compression
+    :param r: the requests (or httpx) response
+    :param url: the URL that was called
+    :param headers: the headers the request was sent with
+    :return: True if the request should be sent again
+    """
+    if r.status_code != 415 or "Content-Encoding" not in headers:
+        return False
+
+    logger.warning(f"{url} does not accept compressed requests")
+    _uncompressed_urls.add(url)
+
+    return True
+
+
+def get_max_response_bytes():
+    """
+    Get the largest response body that will be read and stored
+    """
+    return getattr(
+        settings, "OAS_MAX_RESPONSE_BYTES", DEFAULT_MAX_RESPONSE_BYTES
     )
 
+
+def read_capped_content(chunks):
+    """
+    Read a streamed response body, stopping once the size cap is reached
+    :param chunks: an iterable of byte chunks
+    :return: the body, truncated to the cap
+    """
+    max_bytes = get_max_response_bytes()
+    content = bytearray()
+
+    for chunk in chunks:
+        content.extend(chunk)
+        if len(content) >= max_bytes:
+            break
+
+    return bytes(content[:max_bytes])
+
+
+def read_message_response(content):
+    """
+    Parse the response to a sent message
+    :param content: the (possibly truncated) response body
+    :return: the parsed JSON and whether the message was accepted
+    """
     try:
-        json_output = r.json()
-    except Exception:
-        json_output = {"message": r.content}
+        json_output = json.loads(content)
+    except ValueError:
+        json_output = None
+
+    if not isinstance(json_output, dict):
+        json_output = {
+            "message": content.decode("utf-8", errors="replace"),
+        }
+    elif any(field in json_output for field in RESPONSE_FIELDS):
+        # keep only what is needed to report on the send
+        json_output = {
+            field: json_output[field]
+            for field in RESPONSE_FIELDS
+            if field in json_output
+        }
 
     is_errored = json_output.get("error", False)
 
@@ -137,26 +1514,22 @@ def build_header():
     """
     Build the header for the OA Switchboard
     """
-    return {
-        "type": "p1",
-        "version": "v2",
-        "to": {
-            "address": "https://ror.org/broadcast",
-        },
-        "persistent": True,
-        "pio": True,
-    }
+    return copy.deepcopy(HEADER)
 
 
-def build_credit(article, author):
+def build_credit(article, author, credits=None):
     """
     Build the CRediT block if it exists
     :param article: the article
     :param author: the author
+    :param credits: CRediT records by author, if already fetched
     :return:
     """
-    if hasattr(article, "authors_and_credits"):
-        credit_queryset = article.authors_and_credits().get(author, [])
+    if credits is None and hasattr(article, "authors_and_credits"):
+        credits = article.authors_and_credits()
+
+    if credits is not None:
+        credit_queryset = credits.get(author, [])
         return [str(record) for record in credit_queryset]
     else:
         return []
@@ -173,6 +1546,13 @@ def build_institutions(author):
         "name": str(affil.organization.name) if affil.organization else "",
         "ror": affil.organization.uri if affil.organization else "",
     }
+
+    # fall back to the offline ROR index for free-text affiliations
+    if not institution["ror"]:
+        match = ror_index.lookup(institution["sourceAffiliation"])
+        if match:
+            institution["ror"], institution["name"] = match
+
     return [institution]
 
 
@@ -181,23 +1561,54 @@ def build_authors(article):
     Build the authors for the OA Switchboard
     :param article: the article to build the authors for
     """
-    authors = []
-    author_list = article.frozen_authors()
-    for author in author_list:
-        authors.append(
-            {
+    return list(iter_authors(article))
+
+
+def iter_authors(article):
+    """
+    Build the authors for the OA Switchboard one at a time, reading authors
+    and their CRediT records a chunk at a time
+    :param article: the article to build the authors for
+    :return: a generator of author dicts
+    """
+    authors = article.frozen_authors().iterator(chunk_size=AUTHOR_CHUNK_SIZE)
+
+    while chunk := list(itertools.islice(authors, AUTHOR_CHUNK_SIZE)):
+        credits = fetch_credits(article, chunk)
+
+        for author in chunk:
+            yield {
                 "listingorder": author.order + 1,
                 "lastName": author.last_name,
                 "firstName": author.first_name,
                 "ORCID": author.frozen_orcid,
-                "creditroles": build_credit(article, author),
+                "creditroles": build_credit(article, author, credits=credits),
                 "isCorrespondingAuthor": author.is_correspondence_author,
                 "institutions": build_institutions(author),
                 "affiliation": author.primary_affiliation(as_object=False),
             }
-        )
 
-    return authors
+
+def fetch_credits(article, authors):
+    """
+    Fetch the CRediT records of a chunk of authors in one query
+    :param article: the article the authors belong to
+    :param authors: a list of FrozenAuthors
+    :return: a dict of records by author, or None if this version of
+    Janeway has no CRediT support
+    """
+    if not hasattr(article, "authors_and_credits"):
+        return None
+
+    credits = {author: [] for author in authors}
+    authors_by_pk = {author.pk: author for author in authors}
+
+    for record in submission_models.CreditRecord.objects.filter(
+        frozen_author__in=authors,
+    ):
+        credits[authors_by_pk[record.frozen_author_id]].append(record)
+
+    return credits
 
 
 def build_funders(article):
@@ -207,15 +1618,28 @@ def build_funders(article):
     """
     funders = []
     for funder in article.funders:
-        funders.append(
-            {
-                "name": funder.name,
-                "ror": funder.ror if hasattr(funder, "ror") else "",
-                "fundref": funder.fundref_id
-                if hasattr(funder, "fundref_id")
-                else "",
-            }
-        )
+        funder_block = {
+            "name": funder.name,
+            "ror": funder.ror if hasattr(funder, "ror") else "",
+            "fundref": funder.fundref_id
+            if hasattr(funder, "fundref_id")
+            else "",
+        }
+
+        # fill in missing identifiers from the offline funder crosswalk
+        if not funder_block["ror"] or not funder_block["fundref"]:
+            match = funder_index.lookup(
+                fundref=funder_block["fundref"],
+                ror=funder_block["ror"],
+                name=funder.name,
+            )
+            if match:
+                funder_block["ror"] = funder_block["ror"] or match.ror
+                funder_block["fundref"] = (
+                    funder_block["fundref"] or match.fundref
+                )
+
+        funders.append(funder_block)
 
     return funders
 
@@ -239,32 +1663,28 @@ def build_license(article):
     Build the license for the OA Switchboard
     :param article: the article to build the license for
     """
-    allowed_licenses = [
-        "CC BY",
-        "CC BY-ND",
-        "CC BY-NC",
-        "CC BY-NC-SA",
-        "CC BY-NC-ND",
-        "CC BY-IGO",
-        "CC BY-not specified",
-        "CC BY-other",
-        "CC0",
-        "non-CC",
-        "not specified",
-    ]
+    return payload_cache.memoise(
+        payload_cache.LICENCE,
+        article.license_id,
+        lambda: license_category(article.license.short_name),
+    )
+
+
+@functools.cache
+def license_category(short_name):
+    """
+    Map a licence short name to an OA Switchboard licence category
+    :param short_name: the licence short name, e.g. "CC BY-NC 4.0"
+    """
+    if short_name in LICENSE_CATEGORIES:
+        return LICENSE_CATEGORIES[short_name]
 
     license_to_use = "not specified"
 
-    for license_string in allowed_licenses:
-        if article.license.short_name.startswith(license_string):
+    for license_string in ALLOWED_LICENSES:
+        if short_name.startswith(license_string):
             license_to_use = license_string
 
-    license_to_use = (
-        "non-CC"
-        if article.license.short_name == "Copyright"
-        else license_to_use
-    )
-
     return license_to_use
 
 
@@ -312,22 +1732,27 @@ def build_journal(article):
     Build the journal for the OA Switchboard
     :param article: the article to build the journal for
     """
-    return {
-        "name": article.journal.name,
-        "issn": article.journal.print_issn,
-        "eissn": article.journal.issn,
-        "id": article.journal.code,
-    }
+    return payload_cache.memoise(
+        payload_cache.JOURNAL,
+        article.journal_id,
+        lambda: {
+            "name": article.journal.name,
+            "issn": article.journal.print_issn,
+            "eissn": article.journal.issn,
+            "id": article.journal.code,
+        },
+    )
 
 
-def build_data(article):
+def build_data(article, authors=None):
     """
     Build the data for the OA Switchboard
     :param article: the article to build the data for
+    :param authors: the value for the author list, if not built here
     """
     return {
         "timing": "VoR",
-        "authors": build_authors(article),
+        "authors": build_authors(article) if authors is None else authors,
         "article": build_article(article),
         "journal": build_journal(article),
     }
@@ -344,23 +1769,69 @@ def build_payload(article):
     }
 
 
-def authorize(oas_email, oas_password, url_to_use):
+def build_streamed_payload(article):
+    """
+    Build the payload for the OA Switchboard with an author list that is
+    encoded as it is sent, for papers with very many authors
+    :param article: the article to build the payload for
+    :return: a StreamedPayload
+    """
+    return streaming.StreamedPayload(
+        {
+            "header": build_header(),
+            "data": build_data(
+                article,
+                authors=streaming.AUTHORS_PLACEHOLDER,
+            ),
+        },
+        lambda: iter_authors(article),
+    )
+
+
+def build_payload_for_sending(article):
+    """
+    Build the payload in the form best suited to its size
+    :param article: the article to build the payload for
+    :return: a payload dict, or a StreamedPayload for long author lists
+    """
+    threshold = getattr(settings, "OAS_STREAM_AUTHORS", DEFAULT_STREAM_AUTHORS)
+
+    if threshold and article.frozen_authors().count() > threshold:
+        return build_streamed_payload(article)
+
+    return build_payload(article)
+
+
+def authorize(oas_email, oas_password, url_to_use, bulk=False):
     """
     Obtain a bearer token from the OA Switchboard
     :param oas_email: the email to use
     :param oas_password: the password to use
     :param url_to_use: the base URL to use
+    :param bulk: whether this is bulk traffic that may yield to publications
     :return:
     """
     auth_url = f"{url_to_use}authorize"
     authorization_json = build_authorization_json(oas_email, oas_password)
 
-    r = requests.post(
-        f"{url_to_use}authorize",
+    ratelimit.acquire("authorize", auth_url, bulk=bulk)
+
+    r = get_session().post(
+        auth_url,
         data=json.dumps(authorization_json),
-        timeout=30,
+        timeout=REQUEST_TIMEOUT,
     )
 
+    return read_authorization_response(r, auth_url)
+
+
+def read_authorization_response(r, auth_url):
+    """
+    Extract the bearer token from an authorization response
+    :param r: the requests (or httpx) response
+    :param auth_url: the URL that was called, for logging
+    :return: the token and whether authorization succeeded
+    """
     if r.status_code != 200:
         logger.error(
             f"Failed to authorize with OA Switchboard {auth_url}: "
@@ -414,22 +1885,26 @@ def get_plugin_settings(request):
     Get the plugin settings for the OA Switchboard plugin
     :param request: the request object
     """
-    oas_enabled = request.journal.get_setting(
+    return get_journal_plugin_settings(request.journal)
+
+
+def get_journal_plugin_settings(journal):
+    """
+    Get the plugin settings for the OA Switchboard plugin for a journal
+    :param journal: the journal whose settings to read
+    """
+    oas_enabled = journal.get_setting(
         "plugin:oaswitchboard_plugin", "oas_send"
     )
-    oas_email = request.journal.get_setting(
-        "plugin:oaswitchboard_plugin", "oas_email"
-    )
-    oas_sandbox = request.journal.get_setting(
+    oas_email = journal.get_setting("plugin:oaswitchboard_plugin", "oas_email")
+    oas_sandbox = journal.get_setting(
         "plugin:oaswitchboard_plugin", "oas_sandbox"
     )
-    oas_password = request.journal.get_setting(
+    oas_password = journal.get_setting(
         "plugin:oaswitchboard_plugin", "oas_password"
     )
-    oas_url = request.journal.get_setting(
-        "plugin:oaswitchboard_plugin", "oas_url"
-    )
-    oas_sandbox_url = request.journal.get_setting(
+    oas_url = journal.get_setting("plugin:oaswitchboard_plugin", "oas_url")
+    oas_sandbox_url = journal.get_setting(
         "plugin:oaswitchboard_plugin", "oas_sandbox_url"
     )
 
@@ -0,0 +1,171 @@
+"""
+Archive and remove old OA Switchboard messages.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import datetime
+import gzip
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from plugins.oas import logic, models
+
+
+class Command(BaseCommand):
+    """
+    Writes messages older than the retention period to compressed NDJSON
+    files and deletes them, keeping the latest successful and latest failed
+    message for each article and a daily summary per journal.
+    """
+
+    help = "Archives and removes old OA Switchboard messages."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Archive messages older than this many days.",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default=getattr(settings, "OAS_ARCHIVE_DIR", None),
+            help="Where to write the archive files. Defaults to "
+            "OAS_ARCHIVE_DIR.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="The number of messages in each archive file.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="The number of messages deleted in each transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be archived without changing anything.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["output_dir"]:
+            raise CommandError(
+                "Set OAS_ARCHIVE_DIR or pass --output-dir for the archive."
+            )
+
+        os.makedirs(options["output_dir"], exist_ok=True)
+
+        # archive whole days so that each day is summarised before any of
+        # its messages are removed
+        cutoff = timezone.localdate() - datetime.timedelta(
+            days=options["days"]
+        )
+        archivable = self.archivable_messages(cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"Would archive {archivable.count()} messages sent before "
+                f"{cutoff}."
+            )
+            return
+
+        summaries = logic.summarise_messages(cutoff)
+        self.stdout.write(f"Recorded {summaries} daily summaries.")
+
+        stamp = timezone.now().strftime("%Y%m%d%H%M%S")
+        archived = 0
+        chunk_number = 0
+        last_pk = 0
+
+        while True:
+            chunk = list(
+                archivable.filter(pk__gt=last_pk).order_by("pk")[
+                    : options["chunk_size"]
+                ]
+            )
+
+            if not chunk:
+                break
+
+            chunk_number += 1
+            path = os.path.join(
+                options["output_dir"],
+                f"oas-messages-{stamp}-{chunk_number:05d}.ndjson.gz",
+            )
+            self.write_chunk(path, chunk)
+            self.delete_chunk(chunk, options["batch_size"])
+
+            archived += len(chunk)
+            last_pk = chunk[-1].pk
+
+        self.stdout.write(
+            f"Archived {archived} messages in {chunk_number} files."
+        )
+
+    @staticmethod
+    def archivable_messages(cutoff):
+        """
+        Messages sent before the cutoff that are not the latest successful
+        or latest failed message for their article. A send that is still
+        in flight neither counts as the latest message nor is archived.
+        """
+        newer_with_same_outcome = models.SwitchboardMessage.objects.filter(
+            article=OuterRef("article"),
+            success=OuterRef("success"),
+            pending=False,
+            pk__gt=OuterRef("pk"),
+        )
+
+        return models.SwitchboardMessage.objects.filter(
+            message_date_time__date__lt=cutoff,
+            pending=False,
+        ).filter(Exists(newer_with_same_outcome))
+
+    @staticmethod
+    def write_chunk(path, chunk):
+        temporary_path = f"{path}.tmp"
+
+        with gzip.open(temporary_path, "wt", encoding="utf-8") as handle:
+            for message in chunk:
+                record = {
+                    "id": message.pk,
+                    "article": message.article_id,
+                    "journal": message.journal_id,
+                    "message_type": message.message_type,
+                    "broadcast": message.broadcast,
+                    "authorized": message.authorized,
+                    "success": message.success,
+                    "message_date_time": message.message_date_time,
+                    "fingerprint": message.fingerprint,
+                    "failure_class": message.failure_class,
+                    "latency_ms": message.latency_ms,
+                    "message": message.message,
+                    "response": message.response,
+                }
+                handle.write(json.dumps(record, default=str) + "\n")
+
+        # only a complete file is given its final name
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def delete_chunk(chunk, batch_size):
+        pks = [message.pk for message in chunk]
+
+        for start in range(0, len(pks), batch_size):
+            with transaction.atomic():
+                models.SwitchboardMessage.objects.filter(
+                    pk__in=pks[start : start + batch_size],
+                ).delete()
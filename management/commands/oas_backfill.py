@@ -0,0 +1,109 @@
+"""
+Queue published articles to be sent to the OA Switchboard.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+from django.core.management.base import BaseCommand
+from journal import models as journal_models
+from plugins.oas import async_delivery, health, logic, profiling
+from submission import models as submission_models
+
+
+class Command(BaseCommand):
+    """
+    Queues published articles in the bulk lane for the drain worker.
+    """
+
+    help = "Queues published articles to be sent to the OA Switchboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--journal",
+            action="append",
+            default=[],
+            help="The code of a journal to backfill. Defaults to all.",
+        )
+        parser.add_argument(
+            "--resend",
+            action="store_true",
+            help="Also queue articles that have already been sent.",
+        )
+        parser.add_argument(
+            "--send",
+            action="store_true",
+            help="Send the queued articles now instead of leaving them to "
+            "the drain worker.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=async_delivery.DEFAULT_CONCURRENCY,
+            help="The number of sends in flight when using --send.",
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="With --send, send one at a time and save a profile of "
+            "each send, viewable in the Django admin.",
+        )
+
+    def handle(self, *args, **options):
+        journals = journal_models.Journal.objects.all()
+        if options["journal"]:
+            journals = journals.filter(code__in=options["journal"])
+
+        for journal in journals:
+            articles = submission_models.Article.objects.filter(
+                journal=journal,
+                stage=submission_models.STAGE_PUBLISHED,
+            )
+            if not options["resend"]:
+                articles = articles.exclude(switchboardmessage__success=True)
+
+            job = logic.queue_articles(journal, articles.distinct())
+            self.stdout.write(
+                f"Queued {job.items.count()} articles from {journal.code}."
+            )
+
+            if options["send"] and options["profile"]:
+                processed = self.profile_sends(job)
+                self.stdout.write(f"Sent and profiled {processed} articles.")
+            elif options["send"]:
+                processed = async_delivery.drain_queue(
+                    concurrency=options["concurrency"],
+                    job_id=job.pk,
+                )
+                self.stdout.write(f"Sent {processed} articles.")
+
+    @staticmethod
+    def profile_sends(job):
+        """
+        Send a job's articles one at a time, profiling each send
+        """
+        processed = 0
+        deferred = set()
+
+        while True:
+            item = logic.claim_queue_item(job_id=job.pk, exclude=deferred)
+            if item is None:
+                return processed
+
+            if not health.is_healthy(
+                logic.get_credentials(
+                    logic.get_journal_plugin_settings(item.journal),
+                )[2]
+            ):
+                logic.defer_queue_item(item)
+                deferred.add(item.pk)
+                continue
+
+            profiling.profile_send(
+                item.article,
+                logic.process_queue_item,
+                item,
+            )
+            processed += 1
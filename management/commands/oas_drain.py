@@ -0,0 +1,72 @@
+"""
+Send the articles waiting in the OA Switchboard queue.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from plugins.oas import async_delivery, logic
+
+
+class Command(BaseCommand):
+    """
+    Drains the OA Switchboard queue. Safe to run from cron on several nodes.
+    """
+
+    help = "Sends the articles waiting in the OA Switchboard queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="The maximum number of articles to send.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue instead of exiting when empty.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Send this many articles at once with the async engine.",
+        )
+        parser.add_argument(
+            "--stale-minutes",
+            type=int,
+            default=15,
+            help="Requeue sends that have been in progress this long.",
+        )
+
+    def handle(self, *args, **options):
+        stale = datetime.timedelta(minutes=options["stale_minutes"])
+
+        while True:
+            released = logic.release_stale_queue_items(stale)
+            if released:
+                self.stdout.write(f"Requeued {released} stale sends.")
+
+            logic.clear_stale_sends()
+
+            if options["concurrency"] > 1:
+                processed = async_delivery.drain_queue(
+                    concurrency=options["concurrency"],
+                    limit=options["limit"],
+                )
+            else:
+                processed = logic.drain_queue(limit=options["limit"])
+            self.stdout.write(f"Processed {processed} queued articles.")
+
+            if not options["loop"]:
+                break
+
+            if not processed:
+                time.sleep(5)
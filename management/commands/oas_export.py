@@ -0,0 +1,86 @@
+"""
+Export the OA Switchboard message log.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from journal import models as journal_models
+from plugins.oas import export, logic
+
+
+class Command(BaseCommand):
+    """
+    Writes the message log as CSV or NDJSON, a row at a time.
+    """
+
+    help = "Exports the OA Switchboard message log."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--journal",
+            help="The code of the journal to export. Defaults to all.",
+        )
+        parser.add_argument(
+            "--start",
+            type=datetime.date.fromisoformat,
+            help="Only export messages sent on or after this date.",
+        )
+        parser.add_argument(
+            "--end",
+            type=datetime.date.fromisoformat,
+            help="Only export messages sent on or before this date.",
+        )
+        parser.add_argument(
+            "--status",
+            choices=list(logic.MESSAGE_STATUSES),
+            help="Only export messages with this outcome.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=list(export.FORMATS),
+            default=export.CSV,
+        )
+        parser.add_argument(
+            "--bodies",
+            action="store_true",
+            help="Include the message and response bodies.",
+        )
+        parser.add_argument(
+            "--output",
+            help="The file to write to. Defaults to standard output.",
+        )
+
+    def handle(self, *args, **options):
+        journal = None
+        if options["journal"]:
+            journal = journal_models.Journal.objects.filter(
+                code=options["journal"],
+            ).first()
+            if journal is None:
+                raise CommandError(
+                    f"No journal with code {options['journal']}"
+                )
+
+        lines = export.export_lines(
+            export.filter_messages(
+                journal=journal,
+                start=options["start"],
+                end=options["end"],
+                status=options["status"],
+            ),
+            export_format=options["format"],
+            bodies=options["bodies"],
+        )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,83 @@
+"""
+Build the offline funder crosswalk, or benchmark lookups against it.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+from plugins.oas import funder_index
+
+
+class Command(BaseCommand):
+    """
+    Builds the crosswalk between Funder Registry IDs, RORs and funder names.
+    """
+
+    help = (
+        "Builds the offline funder crosswalk from a ROR data dump and/or "
+        "the Crossref Funder Registry RDF, or benchmarks lookups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ror-dump",
+            default=None,
+            help="A ROR data dump (.zip or .json) to take ROR links from.",
+        )
+        parser.add_argument(
+            "--registry",
+            default=None,
+            help="The Funder Registry registry.rdf to take names from.",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Where to write the crosswalk. Defaults to "
+            "OAS_FUNDER_INDEX_PATH.",
+        )
+        parser.add_argument(
+            "--benchmark",
+            type=int,
+            default=0,
+            metavar="LOOKUPS",
+            help="Time this many random lookups against the crosswalk.",
+        )
+
+    def handle(self, *args, **options):
+        index_path = options["output"] or funder_index.get_index_path()
+
+        if not index_path:
+            raise CommandError(
+                "Set OAS_FUNDER_INDEX_PATH or pass --output for the index."
+            )
+
+        sources = []
+        if options["ror_dump"]:
+            sources.append(funder_index.read_ror_dump(options["ror_dump"]))
+        if options["registry"]:
+            sources.append(funder_index.read_registry(options["registry"]))
+
+        if sources:
+            count = funder_index.build_index(sources, index_path)
+            self.stdout.write(f"Indexed {count} funders.")
+
+        if options["benchmark"]:
+            self.benchmark(index_path, options["benchmark"])
+
+    def benchmark(self, index_path, lookups):
+        timings = funder_index.benchmark(index_path, lookups)
+
+        if not timings:
+            raise CommandError("The crosswalk is empty.")
+
+        self.stdout.write(
+            f"{lookups} lookups: "
+            f"mean {statistics.mean(timings):.1f}us, "
+            f"p50 {timings[len(timings) // 2]:.1f}us, "
+            f"p99 {timings[int(len(timings) * 0.99)]:.1f}us"
+        )
@@ -0,0 +1,43 @@
+"""
+Probe the health of the OA Switchboard endpoints.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+from django.core.management.base import BaseCommand
+from journal import models as journal_models
+from plugins.oas import health, logic
+
+
+class Command(BaseCommand):
+    """
+    Times an authorization against every live and sandbox endpoint that a
+    journal sends to, and shares the results with every sender.
+    """
+
+    help = "Probes the health of the OA Switchboard endpoints."
+
+    def handle(self, *args, **options):
+        endpoints = logic.get_configured_endpoints(
+            journal_models.Journal.objects.all(),
+        )
+
+        for url, authorization_json in endpoints.items():
+            latency_ms, status_code, error = health.probe(
+                url,
+                authorization_json,
+            )
+            endpoint_health = health.record(
+                url,
+                latency_ms,
+                status_code,
+                error,
+            )
+
+            if endpoint_health.healthy:
+                self.stdout.write(f"{url}: up ({latency_ms} ms)")
+            else:
+                self.stdout.write(f"{url}: down ({error})")
@@ -0,0 +1,67 @@
+"""
+Fetch new messages from the OA Switchboard.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import requests
+from django.core.management.base import BaseCommand
+from journal import models as journal_models
+from plugins.oas import inbox, logic
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Fetches the messages received by each enabled journal since the last
+    run and stores them against their articles.
+    """
+
+    help = "Fetches new messages from the OA Switchboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--journal",
+            action="append",
+            default=[],
+            help="The code of a journal to poll. Defaults to all.",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=inbox.DEFAULT_PAGE_SIZE,
+            help="The number of messages to request at a time.",
+        )
+
+    def handle(self, *args, **options):
+        journals = journal_models.Journal.objects.all()
+        if options["journal"]:
+            journals = journals.filter(code__in=options["journal"])
+
+        for journal in journals:
+            plugin_settings = logic.get_journal_plugin_settings(journal)
+
+            # only journals that send to the switchboard have an inbox
+            if not plugin_settings[0]:
+                continue
+
+            # one journal's unreachable endpoint does not stop the others;
+            # its cursor has kept the pages already stored
+            try:
+                stored = inbox.poll_inbox(
+                    journal,
+                    plugin_settings=plugin_settings,
+                    page_size=options["page_size"],
+                )
+            except (requests.RequestException, TimeoutError):
+                logger.exception(f"Failed to poll the inbox of {journal.code}")
+                self.stderr.write(f"{journal.code}: failed to poll the inbox.")
+                continue
+
+            if stored:
+                self.stdout.write(f"{journal.code}: {stored} new messages.")
@@ -0,0 +1,206 @@
+"""
+Replay stored OA Switchboard messages against a stand-in or the sandbox.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import datetime
+import itertools
+
+from django.core.management.base import BaseCommand, CommandError
+from journal import models as journal_models
+from plugins.oas import export, logic, replay
+
+
+class Command(BaseCommand):
+    """
+    Sends stored messages again, exactly as they were stored, and reports
+    throughput, latency percentiles and any responses that differ from
+    the stored ones.
+    """
+
+    help = "Replays stored OA Switchboard messages for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--journal",
+            help="The code of the journal whose messages to replay.",
+        )
+        parser.add_argument(
+            "--start",
+            type=datetime.date.fromisoformat,
+            help="Only replay messages sent on or after this date.",
+        )
+        parser.add_argument(
+            "--end",
+            type=datetime.date.fromisoformat,
+            help="Only replay messages sent on or before this date.",
+        )
+        parser.add_argument(
+            "--input",
+            help="Replay an NDJSON file from oas_export --bodies or "
+            "oas_archive instead of the message log.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help="The most messages to replay.",
+        )
+        parser.add_argument(
+            "--url",
+            help="The base URL of a stand-in server to replay against.",
+        )
+        parser.add_argument(
+            "--token",
+            default="replay",
+            help="The bearer token to send to the stand-in server.",
+        )
+        parser.add_argument(
+            "--sandbox",
+            action="store_true",
+            help="Replay against the journal's sandbox, with its credentials.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            help="The most messages to send per second. Defaults to no limit.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="The number of messages in flight at once.",
+        )
+        parser.add_argument(
+            "--show-diffs",
+            action="store_true",
+            help="Print each response that differs from the stored one.",
+        )
+
+    def handle(self, *args, **options):
+        journal = None
+        if options["journal"]:
+            journal = journal_models.Journal.objects.filter(
+                code=options["journal"],
+            ).first()
+            if journal is None:
+                raise CommandError(
+                    f"No journal with code {options['journal']}"
+                )
+
+        url_to_use, token = self.target(journal, options)
+
+        if options["input"]:
+            records = replay.file_records(options["input"])
+        else:
+            records = replay.stored_records(
+                export.filter_messages(
+                    journal=journal,
+                    start=options["start"],
+                    end=options["end"],
+                )
+            )
+
+        if options["limit"]:
+            records = itertools.islice(records, options["limit"])
+
+        report = replay.replay(
+            records,
+            url_to_use,
+            token,
+            rate=options["rate"],
+            concurrency=max(options["concurrency"], 1),
+            rate_limited=options["sandbox"],
+        )
+        self.write_report(report, options["show_diffs"])
+
+    def target(self, journal, options):
+        """
+        Pick the URL and token to replay with, refusing any live endpoint
+        """
+        if options["sandbox"]:
+            if journal is None:
+                raise CommandError("--sandbox needs --journal.")
+
+            (
+                _,
+                oas_email,
+                _,
+                oas_password,
+                _,
+                oas_sandbox_url,
+            ) = logic.get_journal_plugin_settings(journal)
+
+            if not oas_sandbox_url:
+                raise CommandError(f"{journal.code} has no sandbox URL.")
+
+            url_to_use = oas_sandbox_url
+            if not url_to_use.endswith("/"):
+                url_to_use += "/"
+
+            token, success = logic.authorize(
+                oas_email, oas_password, url_to_use
+            )
+            if not success:
+                raise CommandError("Could not authorize with the sandbox.")
+
+        elif options["url"]:
+            url_to_use = options["url"]
+            if not url_to_use.endswith("/"):
+                url_to_use += "/"
+            token = options["token"]
+
+        else:
+            raise CommandError("Pass --url or --sandbox to replay against.")
+
+        if url_to_use in self.live_urls():
+            raise CommandError(
+                f"{url_to_use} is a live OA Switchboard URL; replay against "
+                f"a stand-in or the sandbox."
+            )
+
+        return url_to_use, token
+
+    @staticmethod
+    def live_urls():
+        urls = set()
+
+        for journal in journal_models.Journal.objects.all():
+            oas_url = journal.get_setting(
+                "plugin:oaswitchboard_plugin", "oas_url"
+            )
+            if oas_url:
+                urls.add(oas_url if oas_url.endswith("/") else oas_url + "/")
+
+        return urls
+
+    def write_report(self, report, show_diffs):
+        def milliseconds(seconds):
+            if seconds is None:
+                return "-"
+            return f"{seconds * 1000:.0f}ms"
+
+        self.stdout.write(
+            f"Replayed {report['sent']} messages in "
+            f"{report['elapsed']:.1f}s ({report['throughput']:.1f}/s); "
+            f"{report['succeeded']} accepted."
+        )
+        self.stdout.write(
+            f"Latency p50 {milliseconds(report['latency_p50'])}, "
+            f"p95 {milliseconds(report['latency_p95'])}, "
+            f"p99 {milliseconds(report['latency_p99'])}."
+        )
+        self.stdout.write(
+            f"{len(report['diffs'])} responses differed from those stored; "
+            f"{len(report['errors'])} sends failed."
+        )
+
+        if show_diffs:
+            for diff in report["diffs"]:
+                self.stdout.write(
+                    f"{diff['id']}: stored {diff['stored']} "
+                    f"replayed {diff['replayed']}"
+                )
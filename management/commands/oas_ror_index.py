@@ -0,0 +1,42 @@
+"""
+Build or refresh the offline ROR index from a ROR data dump.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+from django.core.management.base import BaseCommand, CommandError
+from plugins.oas import ror_index
+
+
+class Command(BaseCommand):
+    """
+    Builds the ROR index used to fill in missing institution RORs.
+    """
+
+    help = "Builds or refreshes the offline ROR index from a ROR data dump."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "dump",
+            help="The ROR data dump (.zip or .json) from "
+            "https://zenodo.org/communities/ror-data",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Where to write the index. Defaults to OAS_ROR_INDEX_PATH.",
+        )
+
+    def handle(self, *args, **options):
+        index_path = options["output"] or ror_index.get_index_path()
+
+        if not index_path:
+            raise CommandError(
+                "Set OAS_ROR_INDEX_PATH or pass --output to build the index."
+            )
+
+        count = ror_index.build_index(options["dump"], index_path)
+        self.stdout.write(f"Indexed {count} organisation names.")
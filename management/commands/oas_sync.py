@@ -0,0 +1,46 @@
+"""
+Queue resends for published articles whose metadata has changed.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+from django.core.management.base import BaseCommand
+from journal import models as journal_models
+from plugins.oas import logic
+
+
+class Command(BaseCommand):
+    """
+    Compares the payload of each article changed since the last run with
+    the payload last sent, and queues a resend when they differ.
+    """
+
+    help = "Queues resends for articles whose metadata has changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--journal",
+            action="append",
+            default=[],
+            help="The code of a journal to check. Defaults to all.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Check every sent article, not only those changed since "
+            "the last run.",
+        )
+
+    def handle(self, *args, **options):
+        journals = journal_models.Journal.objects.all()
+        if options["journal"]:
+            journals = journals.filter(code__in=options["journal"])
+
+        for journal in journals:
+            job = logic.sync_journal(journal, full=options["full"])
+            self.stdout.write(
+                f"{journal.code}: queued {job.items.count()} resends."
+            )
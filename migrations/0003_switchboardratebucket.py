@@ -0,0 +1,35 @@
+# Generated by Django 4.2.15 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0002_switchboardjob_switchboardqueueitem"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SwitchboardRateBucket",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("tokens", models.FloatField(default=0)),
+                ("updated", models.FloatField(default=0)),
+                (
+                    "acquisitions",
+                    models.PositiveBigIntegerField(default=0),
+                ),
+                ("waits", models.PositiveBigIntegerField(default=0)),
+                ("wait_seconds", models.FloatField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.15 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0003_switchboardratebucket"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="switchboardqueueitem",
+            name="oas_queue_status_created_idx",
+        ),
+        migrations.AddField(
+            model_name="switchboardqueueitem",
+            name="priority",
+            field=models.PositiveSmallIntegerField(
+                choices=[(0, "Interactive"), (1, "Bulk")],
+                default=1,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="switchboardqueueitem",
+            index=models.Index(
+                fields=["status", "priority", "created"],
+                name="oas_queue_priority_idx",
+            ),
+        ),
+    ]
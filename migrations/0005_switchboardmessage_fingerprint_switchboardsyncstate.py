@@ -0,0 +1,52 @@
+# Generated by Django 4.2.15 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0004_switchboardqueueitem_priority"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="switchboardmessage",
+            name="fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="A hash of the payload, used to detect metadata "
+                "changes.",
+                max_length=64,
+            ),
+        ),
+        migrations.CreateModel(
+            name="SwitchboardSyncState",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "high_water_mark",
+                    models.DateTimeField(
+                        help_text="Articles modified after this time are "
+                        "checked next run.",
+                    ),
+                ),
+                (
+                    "journal",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="journal.journal",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.15 on 2026-10-19 13:00
+
+import zlib
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def compress_bodies(apps, schema_editor):
+    SwitchboardMessage = apps.get_model("oas", "SwitchboardMessage")
+    batch = []
+
+    for message in SwitchboardMessage.objects.only(
+        "id", "message", "response"
+    ).iterator(chunk_size=BATCH_SIZE):
+        message.message_body = zlib.compress(message.message.encode("utf-8"))
+        message.response_body = zlib.compress(message.response.encode("utf-8"))
+        batch.append(message)
+
+        if len(batch) >= BATCH_SIZE:
+            SwitchboardMessage.objects.bulk_update(
+                batch, ["message_body", "response_body"]
+            )
+            batch = []
+
+    SwitchboardMessage.objects.bulk_update(
+        batch, ["message_body", "response_body"]
+    )
+
+
+def decompress_bodies(apps, schema_editor):
+    SwitchboardMessage = apps.get_model("oas", "SwitchboardMessage")
+    batch = []
+
+    for message in SwitchboardMessage.objects.only(
+        "id", "message_body", "response_body"
+    ).iterator(chunk_size=BATCH_SIZE):
+        for field in ("message", "response"):
+            body = getattr(message, f"{field}_body")
+            setattr(
+                message,
+                field,
+                zlib.decompress(bytes(body)).decode("utf-8") if body else "",
+            )
+        batch.append(message)
+
+        if len(batch) >= BATCH_SIZE:
+            SwitchboardMessage.objects.bulk_update(
+                batch, ["message", "response"]
+            )
+            batch = []
+
+    SwitchboardMessage.objects.bulk_update(batch, ["message", "response"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0005_switchboardmessage_fingerprint_switchboardsyncstate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="switchboardmessage",
+            name="message_body",
+            field=models.BinaryField(default=b"", editable=False),
+        ),
+        migrations.AddField(
+            model_name="switchboardmessage",
+            name="response_body",
+            field=models.BinaryField(default=b"", editable=False),
+        ),
+        migrations.RunPython(compress_bodies, decompress_bodies),
+        migrations.RemoveField(
+            model_name="switchboardmessage",
+            name="message",
+        ),
+        migrations.RemoveField(
+            model_name="switchboardmessage",
+            name="response",
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.15 on 2026-10-19 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0006_compress_message_bodies"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SwitchboardDailySummary",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("sent", models.PositiveIntegerField(default=0)),
+                ("failed", models.PositiveIntegerField(default=0)),
+                ("unauthorized", models.PositiveIntegerField(default=0)),
+                (
+                    "journal",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="journal.journal",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "switchboard daily summaries",
+                "unique_together": {("journal", "date")},
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.15 on 2026-10-19 15:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_journals(apps, schema_editor):
+    Article = apps.get_model("submission", "Article")
+    SwitchboardMessage = apps.get_model("oas", "SwitchboardMessage")
+
+    SwitchboardMessage.objects.update(
+        journal_id=Subquery(
+            Article.objects.filter(pk=OuterRef("article_id")).values(
+                "journal_id"
+            )[:1]
+        )
+    )
+
+
+def classify_failures(apps, schema_editor):
+    SwitchboardMessage = apps.get_model("oas", "SwitchboardMessage")
+
+    SwitchboardMessage.objects.filter(authorized=False).update(
+        failure_class="unauthorized"
+    )
+    SwitchboardMessage.objects.filter(authorized=True, success=False).update(
+        failure_class="rejected"
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0007_switchboarddailysummary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="switchboardmessage",
+            name="journal",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="journal.journal",
+            ),
+        ),
+        migrations.AddField(
+            model_name="switchboardmessage",
+            name="failure_class",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("unauthorized", "Unauthorized"),
+                    ("rejected", "Rejected by the switchboard"),
+                ],
+                default="",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="switchboardmessage",
+            name="latency_ms",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="How long the switchboard took to respond to the "
+                "message.",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(copy_journals, migrations.RunPython.noop),
+        migrations.RunPython(classify_failures, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="switchboardmessage",
+            index=models.Index(
+                fields=["message_date_time"],
+                name="oas_message_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="switchboardmessage",
+            index=models.Index(
+                fields=["journal", "message_date_time"],
+                name="oas_message_journal_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.15 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0008_switchboardmessage_reporting_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="switchboardmessage",
+            name="pending",
+            field=models.BooleanField(
+                default=False,
+                help_text="Whether the message is still being sent.",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="switchboardmessage",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("pending", True)),
+                fields=("article",),
+                name="oas_message_one_pending_send",
+            ),
+        ),
+    ]
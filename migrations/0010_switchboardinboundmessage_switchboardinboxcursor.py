@@ -0,0 +1,112 @@
+# Generated by Django 4.2.15 on 2026-10-19 16:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0009_switchboardmessage_pending"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SwitchboardInboundMessage",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "switchboard_id",
+                    models.BigIntegerField(
+                        help_text="The ID of the message at the OA "
+                        "Switchboard.",
+                    ),
+                ),
+                (
+                    "message_type",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "sender",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "doi",
+                    models.CharField(
+                        blank=True,
+                        db_index=True,
+                        default="",
+                        max_length=255,
+                        verbose_name="DOI",
+                    ),
+                ),
+                ("received", models.DateTimeField(auto_now_add=True)),
+                (
+                    "message_body",
+                    models.BinaryField(default=b"", editable=False),
+                ),
+                (
+                    "article",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="submission.article",
+                    ),
+                ),
+                (
+                    "journal",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="journal.journal",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("journal", "switchboard_id")},
+                "indexes": [
+                    models.Index(
+                        fields=["journal", "received"],
+                        name="oas_inbound_journal_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="SwitchboardInboxCursor",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_message_id",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Messages with a higher ID are fetched "
+                        "next run.",
+                    ),
+                ),
+                ("polled", models.DateTimeField(blank=True, null=True)),
+                (
+                    "journal",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="journal.journal",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.15 on 2026-10-19 18:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0010_switchboardinboundmessage_switchboardinboxcursor"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SwitchboardProfile",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("duration_ms", models.PositiveIntegerField(default=0)),
+                ("query_count", models.PositiveIntegerField(default=0)),
+                ("query_time_ms", models.PositiveIntegerField(default=0)),
+                (
+                    "stats_body",
+                    models.BinaryField(default=b"", editable=False),
+                ),
+                (
+                    "queries_body",
+                    models.BinaryField(default=b"", editable=False),
+                ),
+                (
+                    "message",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="profile",
+                        to="oas.switchboardmessage",
+                    ),
+                ),
+            ],
+        ),
+    ]
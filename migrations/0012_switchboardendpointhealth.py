@@ -0,0 +1,52 @@
+# Generated by Django 4.2.15 on 2026-10-19 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0011_switchboardprofile"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SwitchboardEndpointHealth",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "url",
+                    models.CharField(
+                        max_length=255,
+                        unique=True,
+                        verbose_name="URL",
+                    ),
+                ),
+                ("healthy", models.BooleanField(default=True)),
+                (
+                    "latency_ms",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                (
+                    "status_code",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                ("error", models.TextField(blank=True, default="")),
+                (
+                    "consecutive_failures",
+                    models.PositiveIntegerField(default=0),
+                ),
+                ("checked", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name_plural": "switchboard endpoint health",
+            },
+        ),
+    ]
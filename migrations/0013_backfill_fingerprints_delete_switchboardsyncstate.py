@@ -0,0 +1,72 @@
+# Generated by Django 4.2.15 on 2026-10-19 19:00
+
+import ast
+import hashlib
+import json
+import zlib
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def fingerprint_body(body):
+    """
+    Hash a stored message as logic.fingerprint_payload hashes a payload.
+    Messages stored before bodies were JSON are Python reprs.
+    """
+    text = zlib.decompress(bytes(body)).decode("utf-8")
+
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        try:
+            payload = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            return ""
+
+    canonical = json.dumps(
+        payload,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def backfill_fingerprints(apps, schema_editor):
+    SwitchboardMessage = apps.get_model("oas", "SwitchboardMessage")
+    batch = []
+
+    for message in (
+        SwitchboardMessage.objects.filter(fingerprint="")
+        .exclude(message_body=b"")
+        .only("id", "message_body")
+        .iterator(chunk_size=BATCH_SIZE)
+    ):
+        message.fingerprint = fingerprint_body(message.message_body)
+        if not message.fingerprint:
+            continue
+        batch.append(message)
+
+        if len(batch) >= BATCH_SIZE:
+            SwitchboardMessage.objects.bulk_update(batch, ["fingerprint"])
+            batch = []
+
+    SwitchboardMessage.objects.bulk_update(batch, ["fingerprint"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0012_switchboardendpointhealth"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_fingerprints,
+            migrations.RunPython.noop,
+        ),
+        migrations.DeleteModel(
+            name="SwitchboardSyncState",
+        ),
+    ]
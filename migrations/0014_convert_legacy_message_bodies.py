@@ -0,0 +1,78 @@
+# Generated by Django 4.2.15 on 2026-10-19 21:00
+
+import ast
+import json
+import zlib
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def convert_body(body):
+    """
+    Rewrite a body stored as a Python repr (str() of a dict or list, as
+    messages were saved before bodies were JSON) as JSON
+    :param body: the stored, compressed body
+    :return: the compressed JSON body, or None to leave the body as it is
+    """
+    if not body:
+        return None
+
+    text = zlib.decompress(bytes(body)).decode("utf-8")
+
+    try:
+        json.loads(text)
+        return None
+    except ValueError:
+        pass
+
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        # plain text, such as an error page, is left alone
+        return None
+
+    if not isinstance(value, (dict, list)):
+        return None
+
+    return zlib.compress(json.dumps(value, default=str).encode("utf-8"))
+
+
+def convert_bodies(apps, schema_editor):
+    SwitchboardMessage = apps.get_model("oas", "SwitchboardMessage")
+    batch = []
+
+    for message in SwitchboardMessage.objects.only(
+        "id", "message_body", "response_body"
+    ).iterator(chunk_size=BATCH_SIZE):
+        changed = False
+        for field in ("message_body", "response_body"):
+            converted = convert_body(getattr(message, field))
+            if converted is not None:
+                setattr(message, field, converted)
+                changed = True
+
+        if not changed:
+            continue
+        batch.append(message)
+
+        if len(batch) >= BATCH_SIZE:
+            SwitchboardMessage.objects.bulk_update(
+                batch, ["message_body", "response_body"]
+            )
+            batch = []
+
+    SwitchboardMessage.objects.bulk_update(
+        batch, ["message_body", "response_body"]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0013_backfill_fingerprints_delete_switchboardsyncstate"),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_bodies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.15 on 2026-10-19 22:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0014_convert_legacy_message_bodies"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="switchboardmessage",
+            name="failure_class",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("unauthorized", "Unauthorized"),
+                    ("rejected", "Rejected by the switchboard"),
+                    ("timeout", "Timed out"),
+                    ("error", "Could not be sent"),
+                ],
+                default="",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.15 on 2026-10-19 23:00
+
+from django.db import migrations, models
+
+
+def key_pending_sends(apps, schema_editor):
+    SwitchboardMessage = apps.get_model("oas", "SwitchboardMessage")
+    keyed = set()
+
+    # databases that ignored the partial constraint may hold more than one
+    # pending send for an article; only the newest is keyed, and the rest
+    # are cleared as stale
+    for message in (
+        SwitchboardMessage.objects.filter(pending=True)
+        .only("id", "article_id")
+        .order_by("-pk")
+    ):
+        if message.article_id in keyed:
+            continue
+        keyed.add(message.article_id)
+        message.in_flight_key = message.article_id
+        message.save(update_fields=["in_flight_key"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0015_alter_switchboardmessage_failure_class"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="switchboardmessage",
+            name="in_flight_key",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                null=True,
+                unique=True,
+            ),
+        ),
+        migrations.RunPython(key_pending_sends, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name="switchboardmessage",
+            name="oas_message_one_pending_send",
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.15 on 2026-10-19 23:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("oas", "0016_switchboardmessage_in_flight_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SwitchboardSyncState",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "synced",
+                    models.DateTimeField(
+                        help_text="Articles changed after this time are "
+                        "checked next run.",
+                    ),
+                ),
+                (
+                    "index_signature",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="The ROR and funder indexes the last run "
+                        "built with.",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "journal_version",
+                    models.BigIntegerField(
+                        blank=True,
+                        help_text="The version of the journal block the last "
+                        "run saw.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "journal",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="journal.journal",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SwitchboardArticleChange",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("changed", models.DateTimeField(db_index=True)),
+                (
+                    "article",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="submission.article",
+                    ),
+                ),
+            ],
+        ),
+    ]
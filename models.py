@@ -2,14 +2,59 @@
 Models for the OAS plugin.
 """
 
+import json
+import zlib
+from typing import ClassVar
+
+from django.conf import settings
 from django.db import models
 
+COMPRESSION_LEVEL = 6
+
+
+def compress_body(value):
+    """
+    Compress a message or response body for storage
+    :param value: a string, bytes, or a JSON-serialisable object
+    :return: the zlib-compressed UTF-8 text
+    """
+    if value is None:
+        value = ""
+    elif isinstance(value, bytes):
+        value = value.decode("utf-8", errors="replace")
+    elif not isinstance(value, str):
+        value = json.dumps(value, default=str)
+
+    return zlib.compress(value.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_body(value):
+    """
+    Decompress a stored message or response body
+    :param value: the stored bytes (or memoryview)
+    :return: the text
+    """
+    if not value:
+        return ""
+    return zlib.decompress(bytes(value)).decode("utf-8")
+
 
 class SwitchboardMessage(models.Model):
     """
     A message that has been sent to the switchboard.
     """
 
+    UNAUTHORIZED = "unauthorized"
+    REJECTED = "rejected"
+    TIMEOUT = "timeout"
+    ERROR = "error"
+    FAILURE_CLASSES = (
+        (UNAUTHORIZED, "Unauthorized"),
+        (REJECTED, "Rejected by the switchboard"),
+        (TIMEOUT, "Timed out"),
+        (ERROR, "Could not be sent"),
+    )
+
     broadcast = models.BooleanField(default=True)
     message_type = models.CharField(max_length=255, default="p1-pio")
     authorized = models.BooleanField(default=False)
@@ -18,9 +63,419 @@ class SwitchboardMessage(models.Model):
         "submission.Article",
         on_delete=models.CASCADE,
     )
+    # copied from the article so that reports need no join
+    journal = models.ForeignKey(
+        "journal.Journal",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+    )
 
-    message = models.TextField()
-    response = models.TextField()
+    # stored compressed; use the message and response properties
+    message_body = models.BinaryField(default=b"", editable=False)
+    response_body = models.BinaryField(default=b"", editable=False)
 
     message_date_time = models.DateTimeField(auto_now_add=True)
     success = models.BooleanField(default=False)
+    fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="A hash of the payload, used to detect metadata changes.",
+    )
+    failure_class = models.CharField(
+        max_length=20,
+        blank=True,
+        default="",
+        choices=FAILURE_CLASSES,
+    )
+    latency_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="How long the switchboard took to respond to the message.",
+    )
+    pending = models.BooleanField(
+        default=False,
+        help_text="Whether the message is still being sent.",
+    )
+    # the article ID while the message is being sent, and NULL afterwards.
+    # Being unique, it allows at most one send in flight per article across
+    # every process, on every database (MySQL ignores partial constraints).
+    in_flight_key = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+    )
+
+    class Meta:
+        indexes: ClassVar[list] = [
+            models.Index(
+                fields=["message_date_time"],
+                name="oas_message_date_idx",
+            ),
+            models.Index(
+                fields=["journal", "message_date_time"],
+                name="oas_message_journal_date_idx",
+            ),
+        ]
+
+    @property
+    def message(self):
+        """
+        The message that was sent, decompressed on access
+        """
+        return decompress_body(self.message_body)
+
+    @message.setter
+    def message(self, value):
+        self.message_body = compress_body(value)
+
+    @property
+    def response(self):
+        """
+        The response that was received, decompressed on access
+        """
+        return decompress_body(self.response_body)
+
+    @response.setter
+    def response(self, value):
+        self.response_body = compress_body(value)
+
+
+class SwitchboardJob(models.Model):
+    """
+    A bulk request to send several articles to the switchboard.
+    """
+
+    journal = models.ForeignKey(
+        "journal.Journal",
+        on_delete=models.CASCADE,
+    )
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+
+    created = models.DateTimeField(auto_now_add=True)
+    completed = models.DateTimeField(null=True, blank=True)
+
+    def progress(self):
+        """
+        Count the items of this job by status
+        :return: a dictionary suitable for a JSON progress response
+        """
+        counts = {status: 0 for status, _ in SwitchboardQueueItem.STATUSES}
+        for row in self.items.values("status").annotate(
+            count=models.Count("id")
+        ):
+            counts[row["status"]] = row["count"]
+
+        return {
+            "job": self.pk,
+            "total": sum(counts.values()),
+            "complete": self.completed is not None,
+            **counts,
+        }
+
+
+class SwitchboardQueueItem(models.Model):
+    """
+    An article waiting to be sent to the switchboard by a background worker.
+    """
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    )
+
+    INTERACTIVE = 0
+    BULK = 1
+    PRIORITIES = (
+        (INTERACTIVE, "Interactive"),
+        (BULK, "Bulk"),
+    )
+
+    job = models.ForeignKey(
+        SwitchboardJob,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="items",
+    )
+    journal = models.ForeignKey(
+        "journal.Journal",
+        on_delete=models.CASCADE,
+    )
+    article = models.ForeignKey(
+        "submission.Article",
+        on_delete=models.CASCADE,
+    )
+    message = models.ForeignKey(
+        SwitchboardMessage,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    priority = models.PositiveSmallIntegerField(
+        choices=PRIORITIES,
+        default=BULK,
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes: ClassVar[list] = [
+            models.Index(
+                fields=["status", "priority", "created"],
+                name="oas_queue_priority_idx",
+            ),
+        ]
+
+
+class SwitchboardRateBucket(models.Model):
+    """
+    The shared state of a token bucket limiting calls to one endpoint.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    tokens = models.FloatField(default=0)
+    updated = models.FloatField(default=0)
+
+    acquisitions = models.PositiveBigIntegerField(default=0)
+    waits = models.PositiveBigIntegerField(default=0)
+    wait_seconds = models.FloatField(default=0)
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def average_wait(self):
+        """
+        The mean time a caller waited for a token, in seconds
+        """
+        if not self.acquisitions:
+            return 0
+        return self.wait_seconds / self.acquisitions
+
+
+class SwitchboardDailySummary(models.Model):
+    """
+    Daily message counts for a journal, kept when old messages are archived.
+    """
+
+    journal = models.ForeignKey(
+        "journal.Journal",
+        on_delete=models.CASCADE,
+    )
+    date = models.DateField()
+
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    unauthorized = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("journal", "date")
+        verbose_name_plural = "switchboard daily summaries"
+
+    def __str__(self):
+        return f"{self.journal}: {self.date}"
+
+
+class SwitchboardInboundMessage(models.Model):
+    """
+    A message that the switchboard holds for the journal, such as a reply
+    from an institution.
+    """
+
+    journal = models.ForeignKey(
+        "journal.Journal",
+        on_delete=models.CASCADE,
+    )
+    switchboard_id = models.BigIntegerField(
+        help_text="The ID of the message at the OA Switchboard.",
+    )
+    message_type = models.CharField(max_length=255, blank=True, default="")
+    sender = models.CharField(max_length=255, blank=True, default="")
+    doi = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        db_index=True,
+        verbose_name="DOI",
+    )
+    article = models.ForeignKey(
+        "submission.Article",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    received = models.DateTimeField(auto_now_add=True)
+
+    # stored compressed; use the message property
+    message_body = models.BinaryField(default=b"", editable=False)
+
+    class Meta:
+        unique_together = ("journal", "switchboard_id")
+        indexes: ClassVar[list] = [
+            models.Index(
+                fields=["journal", "received"],
+                name="oas_inbound_journal_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.message_type} from {self.sender}"
+
+    @property
+    def message(self):
+        """
+        The message that was received, decompressed on access
+        """
+        return decompress_body(self.message_body)
+
+    @message.setter
+    def message(self, value):
+        self.message_body = compress_body(value)
+
+
+class SwitchboardInboxCursor(models.Model):
+    """
+    The last switchboard message fetched for a journal.
+    """
+
+    journal = models.OneToOneField(
+        "journal.Journal",
+        on_delete=models.CASCADE,
+    )
+    last_message_id = models.BigIntegerField(
+        default=0,
+        help_text="Messages with a higher ID are fetched next run.",
+    )
+    polled = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.journal}: {self.last_message_id}"
+
+
+class SwitchboardProfile(models.Model):
+    """
+    A profile of a single send, taken on request by a staff member.
+    """
+
+    message = models.OneToOneField(
+        SwitchboardMessage,
+        on_delete=models.CASCADE,
+        related_name="profile",
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    duration_ms = models.PositiveIntegerField(default=0)
+    query_count = models.PositiveIntegerField(default=0)
+    query_time_ms = models.PositiveIntegerField(default=0)
+
+    # stored compressed; use the stats and queries properties
+    stats_body = models.BinaryField(default=b"", editable=False)
+    queries_body = models.BinaryField(default=b"", editable=False)
+
+    def __str__(self):
+        return f"Profile of {self.message}"
+
+    @property
+    def stats(self):
+        """
+        The profiler statistics, in the marshal format read by pstats
+        """
+        return zlib.decompress(bytes(self.stats_body))
+
+    @stats.setter
+    def stats(self, value):
+        self.stats_body = zlib.compress(value, COMPRESSION_LEVEL)
+
+    @property
+    def queries(self):
+        """
+        The SQL queries run during the send, with their timings
+        """
+        return json.loads(decompress_body(self.queries_body) or "[]")
+
+    @queries.setter
+    def queries(self, value):
+        self.queries_body = compress_body(value)
+
+
+class SwitchboardEndpointHealth(models.Model):
+    """
+    The result of the latest health probe of a switchboard endpoint.
+    """
+
+    url = models.CharField(max_length=255, unique=True, verbose_name="URL")
+    healthy = models.BooleanField(default=True)
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    status_code = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    checked = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "switchboard endpoint health"
+
+    def __str__(self):
+        return f"{self.url}: {'up' if self.healthy else 'down'}"
+
+
+class SwitchboardSyncState(models.Model):
+    """
+    How far the change detection command has got through a journal.
+    """
+
+    journal = models.OneToOneField(
+        "journal.Journal",
+        on_delete=models.CASCADE,
+    )
+    synced = models.DateTimeField(
+        help_text="Articles changed after this time are checked next run.",
+    )
+    index_signature = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text="The ROR and funder indexes the last run built with.",
+    )
+    journal_version = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="The version of the journal block the last run saw.",
+    )
+
+    def __str__(self):
+        return f"{self.journal}: {self.synced}"
+
+
+class SwitchboardArticleChange(models.Model):
+    """
+    When a record that an article's payload is built from last changed.
+    """
+
+    article = models.OneToOneField(
+        "submission.Article",
+        on_delete=models.CASCADE,
+    )
+    changed = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.article}: {self.changed}"
@@ -0,0 +1,186 @@
+"""
+Memoisation of the payload blocks that are the same for every article in a
+journal, or for every article under a licence.
+
+Each block is cached in-process against a version number held in the
+Django cache. Saving a journal, one of the settings its block reads or a
+licence bumps the version, which invalidates the block in every process that
+shares the cache. The versions of every cached block are read together, at
+most once every VERSION_TTL seconds, rather than once per article.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import copy
+import random
+import threading
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+JOURNAL = "journal"
+LICENCE = "licence"
+
+# the journal settings the journal block is built from
+JOURNAL_SETTINGS = frozenset(("journal_name", "journal_issn", "print_issn"))
+
+# how long, in seconds, versions read from the cache are trusted
+VERSION_TTL = 5
+
+_lock = threading.Lock()
+_blocks = {}
+_versions = {}
+_versions_read = 0.0
+
+
+def _version_key(kind, object_id):
+    return f"oas:block-version:{kind}:{object_id}"
+
+
+def _new_version():
+    # a random start means an evicted key is never re-seeded with a version
+    # that a process has already cached a block against
+    return random.getrandbits(62)
+
+
+def _seed(key):
+    version = _new_version()
+    if not cache.add(key, version, None):
+        version = cache.get(key, version)
+    return version
+
+
+def get_versions(keys):
+    """
+    Read the versions behind several blocks in one cache round trip, seeding
+    any that have been evicted
+    :param keys: (kind, object_id) pairs
+    :return: a dict of version by (kind, object_id)
+    """
+    names = {_version_key(*key): key for key in keys}
+    found = cache.get_many(list(names))
+
+    return {
+        key: found[name] if name in found else _seed(name)
+        for name, key in names.items()
+    }
+
+
+def get_version(kind, object_id):
+    """
+    Get the current version of the record behind a block. The versions of
+    every cached block are refreshed together once VERSION_TTL has passed.
+    :param kind: JOURNAL or LICENCE
+    :param object_id: the primary key of the record
+    """
+    global _versions, _versions_read
+
+    key = (kind, object_id)
+    now = time.monotonic()
+
+    with _lock:
+        if now - _versions_read < VERSION_TTL and key in _versions:
+            return _versions[key]
+        keys = set(_blocks) | {key}
+
+    versions = get_versions(keys)
+
+    with _lock:
+        _versions = versions
+        _versions_read = now
+
+    return versions[key]
+
+
+def bump_version(kind, object_id):
+    """
+    Invalidate the blocks built from a record in every process
+    :param kind: JOURNAL or LICENCE
+    :param object_id: the primary key of the record
+    """
+    global _versions_read
+
+    key = _version_key(kind, object_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+    # this process sees its own edits straight away
+    with _lock:
+        _versions_read = 0.0
+
+
+def memoise(kind, object_id, build):
+    """
+    Return the cached block for a record, building it if it is missing or
+    the record has changed. Callers get a copy they are free to change.
+    :param kind: JOURNAL or LICENCE
+    :param object_id: the primary key of the record
+    :param build: a callable that builds the block
+    """
+    version = get_version(kind, object_id)
+
+    cached = _blocks.get((kind, object_id))
+    if cached is None or cached[0] != version:
+        cached = (version, build())
+        with _lock:
+            _blocks[(kind, object_id)] = cached
+
+    return copy.deepcopy(cached[1])
+
+
+def clear():
+    """
+    Drop every block and version cached in this process
+    """
+    global _versions_read
+
+    with _lock:
+        _blocks.clear()
+        _versions.clear()
+        _versions_read = 0.0
+
+
+def _journal_changed(sender, instance, **kwargs):
+    bump_version(JOURNAL, instance.pk)
+
+
+def _setting_changed(sender, instance, **kwargs):
+    # the journal name and ISSNs are held as journal settings; saves of any
+    # other setting leave the journal block alone
+    if not getattr(instance, "journal_id", None):
+        return
+
+    if instance.setting.name in JOURNAL_SETTINGS:
+        bump_version(JOURNAL, instance.journal_id)
+
+
+def _licence_changed(sender, instance, **kwargs):
+    bump_version(LICENCE, instance.pk)
+
+
+def connect_signals():
+    """
+    Invalidate cached blocks whenever their records are saved or deleted
+    """
+    for signal in (post_save, post_delete):
+        signal.connect(
+            _journal_changed,
+            sender="journal.Journal",
+            dispatch_uid=f"oas_journal_changed_{signal}",
+        )
+        signal.connect(
+            _setting_changed,
+            sender="core.SettingValue",
+            dispatch_uid=f"oas_setting_changed_{signal}",
+        )
+        signal.connect(
+            _licence_changed,
+            sender="submission.Licence",
+            dispatch_uid=f"oas_licence_changed_{signal}",
+        )
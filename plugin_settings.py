@@ -52,14 +52,29 @@ def hook_registry():
     }
 
 
+def publication_event_handler(**kwargs):
+    """
+    Send a published article to the OA Switchboard. The sending logic, and
+    the HTTP libraries it needs, are only imported the first time an
+    article is published, not in every process that loads the plugin.
+    :param kwargs: the keyword arguments that include request and article
+    """
+    from plugins.oas import logic
+
+    return logic.publication_event_handler(**kwargs)
+
+
 def register_for_events():
     """
     Register for events
     """
     # note that import must be here to avoid circular imports
-    from plugins.oas import logic
+    from plugins.oas import changes, payload_cache
+
+    payload_cache.connect_signals()
+    changes.connect_signals()
 
     events_logic.Events.register_for_event(
         events_logic.Events.ON_ARTICLE_PUBLISHED,
-        logic.publication_event_handler,
+        publication_event_handler,
     )
@@ -0,0 +1,115 @@
+"""
+On-demand profiling of individual sends.
+
+A profiled send runs under cProfile with every SQL query captured, and the
+results are saved as a SwitchboardProfile on the message it produced.
+Nothing here runs unless a staff member asks for a profile.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import cProfile
+import io
+import marshal
+import pstats
+import time
+
+from django.db import connection
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from plugins.oas.models import SwitchboardMessage, SwitchboardProfile
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def profile_send(article, send, *args, **kwargs):
+    """
+    Run a send under the profiler and save the profile against the message
+    it recorded for the article
+    :param article: the article being sent
+    :param send: the function that sends it
+    :return: the SwitchboardProfile, or None if the send recorded no
+    message of its own
+    """
+    # only a message newer than this was recorded by the profiled send
+    latest_pk = (
+        SwitchboardMessage.objects.filter(article=article).aggregate(
+            latest_pk=Max("pk"),
+        )["latest_pk"]
+        or 0
+    )
+    profiler = cProfile.Profile()
+
+    with CaptureQueriesContext(connection) as captured:
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            send(*args, **kwargs)
+        finally:
+            profiler.disable()
+        duration = time.perf_counter() - started
+
+    switchboard_message = (
+        SwitchboardMessage.objects.filter(article=article, pk__gt=latest_pk)
+        .order_by("-pk")
+        .first()
+    )
+
+    if switchboard_message is None:
+        # e.g. the article was already being sent, so the send waited for
+        # another request's message rather than recording one
+        logger.warning(
+            f"Dropped the profile of article {article.pk}'s send: it "
+            "recorded no new message to save the profile against"
+        )
+        return None
+
+    profiler.create_stats()
+    queries = [
+        {"sql": query["sql"], "time": float(query["time"])}
+        for query in captured.captured_queries
+    ]
+
+    profile = SwitchboardProfile(
+        message=switchboard_message,
+        duration_ms=int(duration * 1000),
+        query_count=len(queries),
+        query_time_ms=int(sum(query["time"] for query in queries) * 1000),
+    )
+    profile.stats = marshal.dumps(profiler.stats)
+    profile.queries = queries
+
+    SwitchboardProfile.objects.filter(message=switchboard_message).delete()
+    profile.save()
+
+    return profile
+
+
+def summarise_stats(profile, limit=30):
+    """
+    Format the slowest functions of a profile
+    :param profile: the SwitchboardProfile
+    :param limit: the number of functions to list
+    :return: the pstats report as text
+    """
+    output = io.StringIO()
+    stats = pstats.Stats(_StatsSource(profile.stats), stream=output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+
+    return output.getvalue()
+
+
+class _StatsSource:
+    """
+    Lets pstats read statistics from memory rather than a file
+    """
+
+    def __init__(self, stats):
+        self.stats = marshal.loads(stats)
+
+    def create_stats(self):
+        pass
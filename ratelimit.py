@@ -0,0 +1,175 @@
+"""
+A token bucket rate limiter for calls to the OA Switchboard, shared by every
+web worker, background worker and management command through the database.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from plugins.oas.models import SwitchboardRateBucket
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# requests per second, maximum burst and the tokens held back from bulk
+# traffic for each endpoint. Override with OAS_RATE_LIMITS in the Django
+# settings; a rate of None disables a bucket.
+DEFAULT_RATE_LIMITS = {
+    "authorize": {"rate": 1.0, "burst": 5, "reserve": 1},
+    "message": {"rate": 5.0, "burst": 10, "reserve": 2},
+    "inbox": {"rate": 1.0, "burst": 5},
+}
+
+# the longest, in seconds, a caller waits for a token before giving up.
+# Override with OAS_RATE_LIMIT_MAX_WAIT in the Django settings.
+DEFAULT_MAX_WAIT = 60
+
+
+def get_rate_limit(endpoint):
+    """
+    Get the rate limit configured for an endpoint
+    :param endpoint: the endpoint name, e.g. "authorize" or "message"
+    :return: a (rate, burst, reserve) tuple, or Nones if unlimited
+    """
+    limits = getattr(settings, "OAS_RATE_LIMITS", DEFAULT_RATE_LIMITS)
+    limit = limits.get(endpoint) or {}
+
+    rate = limit.get("rate")
+    if not rate:
+        return None, None, None
+
+    burst = float(limit.get("burst", 1))
+    reserve = min(float(limit.get("reserve", 0)), burst - 1)
+
+    return float(rate), burst, reserve
+
+
+def get_max_wait():
+    """
+    Get the longest a caller waits for a token
+    :return: the time in seconds
+    """
+    return getattr(settings, "OAS_RATE_LIMIT_MAX_WAIT", DEFAULT_MAX_WAIT)
+
+
+def acquire(endpoint, url, bulk=False):
+    """
+    Block until the bucket for an endpoint URL allows one more call. Bulk
+    callers leave the reserved tokens in the bucket, so a publication never
+    queues behind a backfill for longer than one refill.
+    :param endpoint: the endpoint name used to look up the limit
+    :param url: the URL being called, so live and sandbox are separate
+    :param bulk: whether the caller is sending bulk traffic
+    :return: the number of seconds spent waiting
+    :raises TimeoutError: if no token is free within the maximum wait
+    """
+    rate, burst, reserve = get_rate_limit(endpoint)
+    if rate is None:
+        return 0
+
+    needed = 1 + (reserve if bulk else 0)
+    waited = 0
+
+    while True:
+        delay = _take_token(url, rate, burst, needed, waited)
+
+        if delay is None:
+            break
+
+        check_wait(url, waited + delay)
+        time.sleep(delay)
+        waited += delay
+
+    if waited:
+        logger.debug(f"Waited {waited:.3f}s for the {url} rate limit")
+
+    return waited
+
+
+async def acquire_async(endpoint, url, bulk=False):
+    """
+    Wait without blocking the event loop until a call is allowed
+    :param endpoint: the endpoint name used to look up the limit
+    :param url: the URL being called, so live and sandbox are separate
+    :param bulk: whether the caller is sending bulk traffic
+    :return: the number of seconds spent waiting
+    :raises TimeoutError: if no token is free within the maximum wait
+    """
+    rate, burst, reserve = get_rate_limit(endpoint)
+    if rate is None:
+        return 0
+
+    needed = 1 + (reserve if bulk else 0)
+    waited = 0
+    take_token = sync_to_async(_take_token)
+
+    while True:
+        delay = await take_token(url, rate, burst, needed, waited)
+
+        if delay is None:
+            break
+
+        check_wait(url, waited + delay)
+        await asyncio.sleep(delay)
+        waited += delay
+
+    return waited
+
+
+def check_wait(url, waited):
+    """
+    Give up on a token once waiting for it would take too long, so that a
+    send's time is bounded
+    :param url: the URL being called
+    :param waited: the total seconds the caller would have waited
+    :raises TimeoutError: if that is longer than the maximum wait
+    """
+    if waited > get_max_wait():
+        raise TimeoutError(f"Gave up waiting for the {url} rate limit")
+
+
+def _take_token(name, rate, burst, needed, waited):
+    """
+    Try to take a token from a bucket, refilling it for the time elapsed
+    :param needed: the tokens that must be available to take one
+    :return: None if a token was taken, otherwise the seconds to wait
+    """
+    with transaction.atomic():
+        bucket, _ = (
+            SwitchboardRateBucket.objects.select_for_update().get_or_create(
+                name=name,
+                defaults={"tokens": burst, "updated": time.time()},
+            )
+        )
+
+        now = time.time()
+        tokens = min(
+            burst,
+            bucket.tokens + max(0, now - bucket.updated) * rate,
+        )
+
+        if tokens < needed:
+            SwitchboardRateBucket.objects.filter(pk=bucket.pk).update(
+                tokens=tokens,
+                updated=now,
+            )
+            return (needed - tokens) / rate
+
+        SwitchboardRateBucket.objects.filter(pk=bucket.pk).update(
+            tokens=tokens - 1,
+            updated=now,
+            acquisitions=F("acquisitions") + 1,
+            waits=F("waits") + (1 if waited else 0),
+            wait_seconds=F("wait_seconds") + waited,
+        )
+
+    return None
@@ -0,0 +1,234 @@
+"""
+Replay stored p1-pio messages against a stand-in server or the sandbox, to
+check how a change affects throughput, latency and responses under
+production-shaped traffic.
+
+Messages come from the message log or from a file written by oas_export
+(with --bodies) or oas_archive. Each is sent exactly as it was stored and
+the response is compared with the one stored at the time.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import concurrent.futures
+import gzip
+import json
+import threading
+import time
+
+import requests
+from plugins.oas import export, logic, ratelimit
+
+# response fields that differ on every send and are not compared
+VOLATILE_FIELDS = ("id",)
+
+
+def stored_records(messages):
+    """
+    Read the payloads and responses of stored messages
+    :param messages: a QuerySet of SwitchboardMessages
+    :return: a generator of dicts with id, message and response
+    """
+    for row in export.iter_rows(messages, bodies=True):
+        if row["message"]:
+            yield row
+
+
+def file_records(path):
+    """
+    Read the payloads and responses from an NDJSON export or archive
+    :param path: the file, optionally gzipped
+    :return: a generator of dicts with id, message and response
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+
+    with opener(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if row.get("message"):
+                yield row
+
+
+class Pacer:
+    """
+    Spaces out calls from several threads to a steady rate
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_call = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            call_at = max(self.next_call, now)
+            self.next_call = call_at + self.interval
+
+        time.sleep(max(0, call_at - now))
+
+
+def send_record(record, url_to_use, token, rate_limited=False):
+    """
+    Send a stored payload exactly as it was stored
+    :param record: a dict with the stored message and response
+    :param url_to_use: the base URL to send to
+    :param token: the bearer token to use
+    :param rate_limited: whether to take a token from the endpoint's shared
+    rate limit first, as bulk traffic
+    :return: the latency in seconds, the parsed response and success
+    """
+    message_url = f"{url_to_use}message"
+
+    if rate_limited:
+        ratelimit.acquire("message", message_url, bulk=True)
+
+    started = time.monotonic()
+
+    r = logic.get_session().post(
+        message_url,
+        headers={
+            "Authorization": "Bearer " + token,
+            "Content-Type": "application/json",
+        },
+        data=record["message"].encode("utf-8"),
+        timeout=logic.REQUEST_TIMEOUT,
+        stream=True,
+    )
+
+    with r:
+        content = logic.read_capped_content(r.iter_content(chunk_size=8192))
+
+    json_output, success = logic.read_message_response(content)
+
+    return time.monotonic() - started, json_output, success
+
+
+def compare_responses(stored, replayed):
+    """
+    Compare a stored response with a replayed one, ignoring fields that
+    change on every send
+    :param stored: the stored response text
+    :param replayed: the replayed response, parsed
+    :return: True if they match
+    """
+    stored_output, _ = logic.read_message_response(
+        (stored or "").encode("utf-8"),
+    )
+
+    def comparable(output):
+        return {
+            key: value
+            for key, value in output.items()
+            if key not in VOLATILE_FIELDS
+        }
+
+    return comparable(stored_output) == comparable(replayed)
+
+
+def replay(
+    records,
+    url_to_use,
+    token,
+    rate=None,
+    concurrency=1,
+    rate_limited=False,
+):
+    """
+    Replay stored messages and measure the results
+    :param records: an iterable of dicts with id, message and response
+    :param url_to_use: the base URL to send to
+    :param token: the bearer token to use
+    :param rate: the most messages to send per second, or None for no limit
+    :param concurrency: the number of messages in flight
+    :param rate_limited: whether to share the endpoint's rate limit with
+    real traffic, as for the sandbox
+    :return: a dict report
+    """
+    pacer = Pacer(rate)
+    latencies = []
+    diffs = []
+    errors = []
+    succeeded = 0
+
+    def send(record):
+        pacer.wait()
+        return record, send_record(record, url_to_use, token, rate_limited)
+
+    started = time.monotonic()
+
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        pending = set()
+
+        # keep a bounded number of records in memory
+        for record in records:
+            pending.add(executor.submit(send, record))
+            if len(pending) >= concurrency * 2:
+                done, pending = concurrent.futures.wait(
+                    pending,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    succeeded += _collect(future, latencies, diffs, errors)
+
+        for future in concurrent.futures.as_completed(pending):
+            succeeded += _collect(future, latencies, diffs, errors)
+
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    sent = len(latencies)
+
+    return {
+        "sent": sent,
+        "succeeded": succeeded,
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": sent / elapsed if elapsed else 0,
+        "latency_p50": percentile(latencies, 0.5),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_p99": percentile(latencies, 0.99),
+        "diffs": diffs,
+    }
+
+
+def _collect(future, latencies, diffs, errors):
+    try:
+        record, (latency, json_output, success) = future.result()
+    except (requests.RequestException, TimeoutError, ValueError) as error:
+        # the rate limiter raises TimeoutError when it gives up
+        errors.append(str(error))
+        return 0
+
+    latencies.append(latency)
+
+    if not compare_responses(record.get("response"), json_output):
+        diffs.append(
+            {
+                "id": record.get("id"),
+                "stored": record.get("response"),
+                "replayed": json.dumps(json_output),
+            }
+        )
+
+    return 1 if success else 0
+
+
+def percentile(ordered, fraction):
+    """
+    The nearest-rank percentile of sorted values
+    :param ordered: the values, sorted
+    :param fraction: the percentile wanted, as a fraction
+    :return: the value, or None if there are no values
+    """
+    if not ordered:
+        return None
+
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
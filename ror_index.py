@@ -0,0 +1,284 @@
+"""
+An optional offline index of ROR organisations, used to find a ROR for an
+affiliation that is not linked to an organisation record.
+
+The index is a small SQLite file built once from a ROR data dump (see
+https://ror.readme.io/docs/data-dump) with the oas_ror_index command. Set
+OAS_ROR_INDEX_PATH in the Django settings to enable it.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import functools
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+import zipfile
+
+from django.conf import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# the open index for each path, replaced when the file changes
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+# paths already reported missing, so that the warning is logged once
+_missing = set()
+
+# v2 name types worth matching on. Acronyms are left out: short tokens such
+# as "UK" would send a message to whichever institution uses them.
+V2_NAME_TYPES = ("ror_display", "label", "alias")
+
+# the fewest comma-separated parts that a partial match may cover, so that
+# a lone place name in an affiliation cannot match on its own
+MIN_FALLBACK_PARTS = 2
+
+LOOKUP_CACHE_SIZE = 8192
+
+
+def normalise(name):
+    """
+    Reduce an organisation name to a form that ignores case, accents,
+    punctuation and a leading "the"
+    :param name: the free-text name
+    :return: the normalised name
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    name = re.sub(r"[^\w\s]", " ", name.casefold())
+    name = " ".join(name.split())
+
+    return name.removeprefix("the ")
+
+
+def get_index_path():
+    """
+    Get the configured location of the ROR index
+    :return: the path, or None if the index is disabled
+    """
+    return getattr(settings, "OAS_ROR_INDEX_PATH", None)
+
+
+def file_signature(path):
+    """
+    Identify a version of an index file, which changes whenever the file is
+    replaced
+    :param path: the file, or None
+    :return: a string, or "" if there is no file
+    """
+    if not path:
+        return ""
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return ""
+
+    return f"{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def get_signature():
+    """
+    Identify the ROR index currently in use
+    :return: a string, or "" if the index is disabled or missing
+    """
+    return file_signature(get_index_path())
+
+
+class _Index:
+    """
+    An open index file and the lookups made against it
+    """
+
+    def __init__(self, path, signature):
+        self.signature = signature
+        self.connection = sqlite3.connect(
+            f"file:{path}?mode=ro&immutable=1",
+            uri=True,
+            check_same_thread=False,
+        )
+        self.lookup = functools.lru_cache(maxsize=LOOKUP_CACHE_SIZE)(
+            self._lookup
+        )
+
+    def _lookup(self, affiliation):
+        for candidate in _candidates(affiliation):
+            key = normalise(candidate)
+            if not key:
+                continue
+
+            row = self.connection.execute(
+                "SELECT ror, label FROM names WHERE name = ?",
+                (key,),
+            ).fetchone()
+
+            if row and row[0]:
+                return row[0], row[1]
+
+        return None
+
+
+def _get_index(path):
+    """
+    Get the open index for a path, reopening it if the file has been
+    replaced since, as oas_ror_index does from another process
+    :param path: the index file
+    :return: an _Index, or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        if path not in _missing:
+            logger.warning(f"The ROR index {path} does not exist")
+            _missing.add(path)
+        return None
+
+    _missing.discard(path)
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    index = _indexes.get(path)
+    if index is None or index.signature != signature:
+        with _indexes_lock:
+            index = _indexes.get(path)
+            if index is None or index.signature != signature:
+                # the old connection is left for the garbage collector, in
+                # case another thread is still reading from it
+                index = _indexes[path] = _Index(path, signature)
+
+    return index
+
+
+def lookup(affiliation):
+    """
+    Find the ROR for a free-text affiliation. The whole string is tried
+    first, then shorter runs of at least two of its comma-separated parts,
+    so "Dept of History, Birkbeck, University of London" matches on
+    "Birkbeck, University of London".
+    :param affiliation: the affiliation string
+    :return: a (ror, name) tuple, or None if there is no unambiguous match
+    """
+    path = get_index_path()
+
+    if not path or not affiliation:
+        return None
+
+    index = _get_index(path)
+    if index is None:
+        return None
+
+    return index.lookup(str(affiliation))
+
+
+def _candidates(affiliation):
+    parts = affiliation.split(",")
+    yield affiliation
+
+    for length in range(len(parts) - 1, MIN_FALLBACK_PARTS - 1, -1):
+        for start in range(len(parts) - length + 1):
+            yield ",".join(parts[start : start + length])
+
+
+def read_dump(dump_path):
+    """
+    Read the organisations from a ROR data dump in the v1 or v2 schema
+    :param dump_path: a .json file or the .zip published by ROR
+    :return: a list of organisation records
+    """
+    if zipfile.is_zipfile(dump_path):
+        with zipfile.ZipFile(dump_path) as archive:
+            names = [
+                name for name in archive.namelist() if name.endswith(".json")
+            ]
+            # prefer the v2 schema file when a dump contains both
+            names.sort(key=lambda name: "schema_v2" not in name)
+            with archive.open(names[0]) as handle:
+                return json.load(handle)
+
+    with open(dump_path, "rb") as handle:
+        return json.load(handle)
+
+
+def record_names(record):
+    """
+    Get the display name and every matchable name of a ROR record
+    :param record: a v1 or v2 ROR organisation record
+    :return: the display name and a set of names
+    """
+    if "names" in record:
+        display = next(
+            (
+                name["value"]
+                for name in record["names"]
+                if "ror_display" in name.get("types", [])
+            ),
+            record["names"][0]["value"] if record["names"] else "",
+        )
+        names = {
+            name["value"]
+            for name in record["names"]
+            if set(name.get("types", [])) & set(V2_NAME_TYPES)
+        }
+        return display, names
+
+    display = record.get("name", "")
+    names = {display}
+    names.update(record.get("aliases", []))
+    names.update(label["label"] for label in record.get("labels", []))
+    return display, names
+
+
+def build_index(dump_path, index_path):
+    """
+    Build the ROR index from a data dump, replacing any existing index
+    atomically so that running workers are not disturbed
+    :param dump_path: the ROR data dump
+    :param index_path: where to write the index
+    :return: the number of names indexed
+    """
+    names = {}
+
+    for record in read_dump(dump_path):
+        if record.get("status", "active") != "active":
+            continue
+
+        display, record_name_set = record_names(record)
+        for name in record_name_set:
+            key = normalise(name)
+            if not key:
+                continue
+            if key in names and names[key][0] != record["id"]:
+                # ambiguous names would misroute messages, so drop them
+                names[key] = (None, None)
+            else:
+                names[key] = (record["id"], display)
+
+    temporary_path = f"{index_path}.tmp"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+    connection = sqlite3.connect(temporary_path)
+    connection.execute(
+        "CREATE TABLE names ("
+        "name TEXT PRIMARY KEY, ror TEXT, label TEXT"
+        ") WITHOUT ROWID"
+    )
+    connection.executemany(
+        "INSERT INTO names VALUES (?, ?, ?)",
+        ((key, ror, label) for key, (ror, label) in names.items() if ror),
+    )
+    connection.commit()
+    connection.execute("VACUUM")
+    connection.close()
+
+    # workers notice the new file and reopen it on their next lookup
+    os.replace(temporary_path, index_path)
+
+    return sum(1 for ror, _ in names.values() if ror)
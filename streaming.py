@@ -0,0 +1,133 @@
+"""
+Incremental encoding of p1-pio payloads with very long author lists.
+
+A StreamedPayload holds the payload without its authors and a way to
+generate them. The JSON is produced a chunk at a time, so a paper with
+thousands of authors never holds every author, or the whole encoded
+message, in memory at once. The same pass hashes the canonical encoding and
+compresses the message for storage.
+"""
+
+__copyright__ = "Copyright 2024 Birkbeck, University of London"
+__author__ = "Martin Paul Eve"
+__license__ = "AGPL v3"
+__maintainer__ = "Birkbeck University of London"
+
+import hashlib
+import json
+import zlib
+
+from plugins.oas.models import COMPRESSION_LEVEL
+
+# stands in for the author list in the payload skeleton
+AUTHORS_PLACEHOLDER = "\x00oas-authors\x00"
+
+# encoded JSON is passed on in pieces of about this size
+CHUNK_BYTES = 64 * 1024
+
+
+def encode(value):
+    """
+    Encode a value as it is sent and stored
+    """
+    return json.dumps(value, default=str)
+
+
+def encode_canonical(value):
+    """
+    Encode a value as it is fingerprinted
+    """
+    return json.dumps(
+        value,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+class StreamedPayload:
+    """
+    A payload whose author list is encoded one author at a time
+    """
+
+    def __init__(self, skeleton, authors):
+        """
+        :param skeleton: the payload, with AUTHORS_PLACEHOLDER in place of
+        data.authors
+        :param authors: a callable that returns an iterable of author dicts
+        """
+        self.skeleton = skeleton
+        self.authors = authors
+        self.fingerprint = None
+        self.message_body = None
+
+    def chunks(self):
+        """
+        Encode the payload, a chunk at a time. Once every chunk has been
+        read, fingerprint and message_body are set.
+        :return: a generator of bytes
+        """
+        digest = hashlib.sha256()
+        compressor = zlib.compressobj(COMPRESSION_LEVEL)
+        stored = bytearray()
+
+        def pieces():
+            head, tail = _split(encode(self.skeleton))
+            canonical_head, canonical_tail = _split(
+                encode_canonical(self.skeleton),
+            )
+
+            yield head + "[", canonical_head + "["
+            for index, author in enumerate(self.authors()):
+                yield (
+                    (", " if index else "") + encode(author),
+                    ("," if index else "") + encode_canonical(author),
+                )
+            yield "]" + tail, "]" + canonical_tail
+
+        buffer = bytearray()
+        for piece, canonical_piece in pieces():
+            encoded = piece.encode("utf-8")
+            digest.update(canonical_piece.encode("utf-8"))
+            stored.extend(compressor.compress(encoded))
+
+            buffer.extend(encoded)
+            if len(buffer) >= CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+
+        if buffer:
+            yield bytes(buffer)
+
+        stored.extend(compressor.flush())
+        self.fingerprint = digest.hexdigest()
+        self.message_body = bytes(stored)
+
+    def finish(self):
+        """
+        Encode the payload if no send has read all of it, so that the
+        fingerprint and stored message are available
+        """
+        if self.fingerprint is None:
+            for _ in self.chunks():
+                pass
+
+
+def _split(encoded_skeleton):
+    return encoded_skeleton.split(encode(AUTHORS_PLACEHOLDER), 1)
+
+
+def gzip_chunks(chunks):
+    """
+    Compress a stream of bytes as gzip, a chunk at a time
+    :param chunks: an iterable of bytes
+    :return: a generator of gzip-compressed bytes
+    """
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
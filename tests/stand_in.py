@@ -0,0 +1,68 @@
+import collections
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+Request = collections.namedtuple(
+    "Request",
+    ["method", "path", "headers", "body"],
+)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Records each request and answers with the stand-in's responder
+    """
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def handle_request(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = Request(
+            self.command,
+            self.path,
+            self.headers,
+            self.rfile.read(length),
+        )
+        self.server.stand_in.requests.append(request)
+
+        status, response = self.server.stand_in.respond(request)
+
+        content = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    """
+    A local stand-in for the OA Switchboard, run in a thread for the length
+    of a test
+    """
+
+    def __init__(self, respond):
+        """
+        :param respond: called with each Request, returning the status code
+        and the JSON response
+        """
+        self.respond = respond
+        self.requests = []
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.stand_in = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
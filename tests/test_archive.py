@@ -0,0 +1,120 @@
+import datetime
+import gzip
+import io
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import django
+from django.core.management import call_command
+from django.utils import timezone
+from plugins.oas import logic
+from plugins.oas.management.commands.oas_archive import Command
+from plugins.oas.models import SwitchboardMessage
+from utils.testing import helpers
+
+
+class TestArchive(django.test.TestCase):
+    def setUp(self):
+        self.journal, _ = helpers.create_journals()
+        self.article = helpers.create_article(self.journal)
+        self.output = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output.cleanup)
+
+        # oldest first: two superseded successes, the latest success, a
+        # superseded failure and the latest failure
+        self.old_success = self.message(success=True)
+        self.older_success = self.message(success=True)
+        self.latest_success = self.message(success=True)
+        self.old_failure = self.message(success=False)
+        self.latest_failure = self.message(success=False)
+
+        SwitchboardMessage.objects.update(
+            message_date_time=timezone.now() - datetime.timedelta(days=365),
+        )
+
+    def message(self, success, pending=False):
+        message = logic.record_message(
+            self.article,
+            authorized=True,
+            payload={"title": "A"},
+            json_output={"id": 1},
+            success=success,
+        )
+        if pending:
+            SwitchboardMessage.objects.filter(pk=message.pk).update(
+                pending=True,
+            )
+        return message
+
+    def archive(self):
+        call_command(
+            "oas_archive",
+            output_dir=self.output.name,
+            stdout=io.StringIO(),
+        )
+
+    def archived_ids(self):
+        ids = []
+        for name in sorted(os.listdir(self.output.name)):
+            with gzip.open(os.path.join(self.output.name, name), "rt") as f:
+                ids.extend(json.loads(line)["id"] for line in f)
+        return ids
+
+    def test_latest_success_and_failure_are_kept(self):
+        self.archive()
+
+        self.assertEqual(
+            set(SwitchboardMessage.objects.values_list("pk", flat=True)),
+            {self.latest_success.pk, self.latest_failure.pk},
+        )
+        self.assertEqual(
+            self.archived_ids(),
+            [self.old_success.pk, self.older_success.pk, self.old_failure.pk],
+        )
+
+    def test_pending_send_does_not_supersede_a_failure(self):
+        in_flight = self.message(success=False, pending=True)
+        SwitchboardMessage.objects.filter(pk=in_flight.pk).update(
+            message_date_time=timezone.now() - datetime.timedelta(days=365),
+        )
+
+        self.archive()
+
+        self.assertEqual(
+            SwitchboardMessage.objects.filter(
+                pk__in=[self.latest_failure.pk, in_flight.pk],
+            ).count(),
+            2,
+        )
+        self.assertNotIn(in_flight.pk, self.archived_ids())
+
+    def test_recent_messages_are_kept(self):
+        SwitchboardMessage.objects.update(message_date_time=timezone.now())
+
+        self.archive()
+
+        self.assertEqual(SwitchboardMessage.objects.count(), 5)
+        self.assertEqual(self.archived_ids(), [])
+
+    def test_file_is_written_before_rows_are_deleted(self):
+        delete_chunk = Command.delete_chunk
+
+        def check_file_then_delete(chunk, batch_size):
+            self.assertEqual(
+                self.archived_ids(),
+                [message.pk for message in chunk],
+            )
+            self.assertEqual(SwitchboardMessage.objects.count(), 5)
+            delete_chunk(chunk, batch_size)
+
+        with patch.object(
+            Command,
+            "delete_chunk",
+            side_effect=check_file_then_delete,
+        ) as mock_delete_chunk:
+            self.archive()
+
+        mock_delete_chunk.assert_called_once()
+        self.assertEqual(SwitchboardMessage.objects.count(), 2)
@@ -0,0 +1,133 @@
+from unittest import skipIf
+from unittest.mock import patch
+
+import django
+from django.core.cache import cache
+from django.test import override_settings
+from plugins.oas import async_delivery, logic
+from plugins.oas.models import SwitchboardMessage, SwitchboardQueueItem
+from utils.testing import helpers
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+URL = "https://oas.example.org/"
+PLUGIN_SETTINGS = (True, "email", False, "password", URL, "")
+
+LOCAL_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "oas-async-tests",
+    },
+}
+
+
+def stand_in(request):
+    """
+    Answer authorizations with a token and messages with an ID
+    """
+    if request.url.path.endswith("/authorize"):
+        return httpx.Response(200, json={"token": "a token"})
+
+    return httpx.Response(200, json={"id": 1})
+
+
+class FlakyStandIn:
+    """
+    Refuses the first authorization, and the first token it grants once
+    that token has been used
+    """
+
+    def __init__(self):
+        self.authorizations = 0
+        self.refused = set()
+
+    def __call__(self, request):
+        if request.url.path.endswith("/authorize"):
+            self.authorizations += 1
+            if self.authorizations == 1:
+                return httpx.Response(503)
+            return httpx.Response(
+                200,
+                json={"token": f"token {self.authorizations}"},
+            )
+
+        token = request.headers["Authorization"]
+        if token.endswith("token 2") and token in self.refused:
+            return httpx.Response(401)
+        self.refused.add(token)
+
+        return httpx.Response(200, json={"id": 1})
+
+
+# the engine's database calls run in another thread, so the test data must
+# be committed for it to see
+@skipIf(httpx is None, "httpx is not installed")
+@override_settings(OAS_RATE_LIMITS={}, CACHES=LOCAL_CACHE)
+class TestAsyncDrain(django.test.TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.journal, _ = helpers.create_journals()
+        self.articles = [
+            helpers.create_article(self.journal) for _ in range(3)
+        ]
+
+    @patch("plugins.oas.logic.build_payload", return_value={"data": {}})
+    @patch(
+        "plugins.oas.logic.get_journal_plugin_settings",
+        return_value=PLUGIN_SETTINGS,
+    )
+    def test_queued_items_are_sent(self, mock_settings, mock_build_payload):
+        job = logic.queue_articles(self.journal, self.articles)
+
+        processed = async_delivery.drain_queue(
+            concurrency=2,
+            transport=httpx.MockTransport(stand_in),
+        )
+
+        self.assertEqual(processed, 3)
+        self.assertEqual(
+            set(job.items.values_list("status", flat=True)),
+            {SwitchboardQueueItem.SENT},
+        )
+        self.assertEqual(
+            SwitchboardMessage.objects.filter(
+                success=True,
+                pending=False,
+            ).count(),
+            3,
+        )
+
+    @patch("plugins.oas.logic.build_payload", return_value={"data": {}})
+    @patch(
+        "plugins.oas.logic.get_journal_plugin_settings",
+        return_value=PLUGIN_SETTINGS,
+    )
+    def test_refused_tokens_are_not_reused(
+        self,
+        mock_settings,
+        mock_build_payload,
+    ):
+        job = logic.queue_articles(self.journal, self.articles)
+        stand_in = FlakyStandIn()
+
+        async_delivery.drain_queue(
+            concurrency=1,
+            transport=httpx.MockTransport(stand_in),
+        )
+
+        # the failed authorization is not cached for the rest of the run,
+        # and the refused token is replaced
+        self.assertEqual(stand_in.authorizations, 3)
+        self.assertEqual(
+            sorted(job.items.values_list("status", flat=True)),
+            sorted(
+                [
+                    SwitchboardQueueItem.FAILED,
+                    SwitchboardQueueItem.SENT,
+                    SwitchboardQueueItem.SENT,
+                ]
+            ),
+        )
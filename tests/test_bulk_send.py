@@ -0,0 +1,121 @@
+import json
+from unittest.mock import patch
+
+import django
+from django.test import RequestFactory
+from plugins.oas import logic, views
+from plugins.oas.models import SwitchboardJob, SwitchboardQueueItem
+from submission import models as submission_models
+from utils.testing import helpers
+
+
+class TestBulkSend(django.test.TestCase):
+    def setUp(self):
+        self.journal, _ = helpers.create_journals()
+        self.articles = [
+            helpers.create_article(self.journal) for _ in range(3)
+        ]
+        self.user = helpers.create_user("editor@example.com")
+        self.user.is_active = True
+        self.user.is_staff = True
+        self.user.save()
+        self.factory = RequestFactory()
+
+    def post(self, data):
+        request = self.factory.post("/plugins/oas/send/bulk/", data)
+        request.journal = self.journal
+        request.user = self.user
+        return views.send_articles(request)
+
+    @patch("plugins.oas.logic.start_job")
+    def test_selected_articles_are_queued_as_one_job(self, mock_start_job):
+        self.post({"article_ids": [self.articles[0].pk, self.articles[1].pk]})
+
+        job = SwitchboardJob.objects.get()
+        self.assertEqual(
+            set(job.items.values_list("article_id", flat=True)),
+            {self.articles[0].pk, self.articles[1].pk},
+        )
+        self.assertEqual(job.owner, self.user)
+        mock_start_job.assert_called_once_with(job)
+
+    @patch("plugins.oas.logic.start_job")
+    def test_unsent_scope_queues_published_articles(self, mock_start_job):
+        submission_models.Article.objects.filter(
+            pk=self.articles[2].pk,
+        ).update(stage=submission_models.STAGE_PUBLISHED)
+
+        self.post({"scope": "unsent"})
+
+        job = SwitchboardJob.objects.get()
+        self.assertEqual(
+            list(job.items.values_list("article_id", flat=True)),
+            [self.articles[2].pk],
+        )
+
+    @patch("plugins.oas.logic.start_job")
+    def test_non_numeric_article_ids_are_refused(self, mock_start_job):
+        response = self.post({"article_ids": ["1", "one"]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SwitchboardJob.objects.exists())
+
+    def test_progress_is_reported_as_json(self):
+        job = logic.queue_articles(self.journal, self.articles)
+        item = job.items.first()
+        item.status = SwitchboardQueueItem.SENT
+        item.save()
+
+        request = self.factory.get(f"/plugins/oas/jobs/{job.pk}/")
+        request.journal = self.journal
+        request.user = self.user
+        response = views.job_progress(request, job.pk)
+
+        self.assertEqual(
+            json.loads(response.content),
+            {
+                "job": job.pk,
+                "total": 3,
+                "complete": False,
+                "pending": 2,
+                "sending": 0,
+                "sent": 1,
+                "failed": 0,
+            },
+        )
+
+    @patch("plugins.oas.logic.threading.Thread")
+    def test_job_runs_in_a_daemon_thread(self, mock_thread):
+        job = logic.queue_articles(self.journal, self.articles)
+
+        logic.start_job(job)
+
+        mock_thread.assert_called_once_with(
+            target=logic._process_job_in_thread,
+            args=(job.pk,),
+            daemon=True,
+        )
+        mock_thread.return_value.start.assert_called_once_with()
+
+    @patch("plugins.oas.logic.connection")
+    @patch("plugins.oas.logic.deliver_article")
+    @patch("plugins.oas.logic.get_journal_plugin_settings")
+    def test_background_runner_sends_the_job(
+        self,
+        mock_settings,
+        mock_deliver,
+        mock_connection,
+    ):
+        mock_settings.return_value = (True, "", False, "", "https://x/", "")
+        mock_deliver.side_effect = lambda article, *args, **kwargs: (
+            logic.record_message(article, authorized=True, success=True),
+            None,
+        )
+        job = logic.queue_articles(self.journal, self.articles)
+
+        logic._process_job_in_thread(job.pk)
+
+        job.refresh_from_db()
+        self.assertIsNotNone(job.completed)
+        self.assertEqual(job.progress()["sent"], 3)
+        mock_connection.close.assert_called_once_with()
@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+import django
+import requests
+from django.core.cache import cache
+from django.test import override_settings
+from plugins.oas import logic
+from plugins.oas.models import SwitchboardMessage
+from utils.testing import helpers
+
+PLUGIN_SETTINGS = (True, "email", False, "password", "https://x/", "")
+
+LOCAL_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "oas-dashboard-tests",
+    },
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class TestDeliveryStats(django.test.TestCase):
+    def setUp(self):
+        cache.clear()
+        self.journal_one, self.journal_two = helpers.create_journals()
+        self.article_one = helpers.create_article(self.journal_one)
+        self.article_two = helpers.create_article(self.journal_two)
+
+        logic.record_message(
+            self.article_one, authorized=True, success=True, latency_ms=100
+        )
+        logic.record_message(
+            self.article_one, authorized=True, success=False, latency_ms=300
+        )
+        logic.record_message(self.article_two, authorized=False)
+
+    def test_press_stats_cover_every_journal(self):
+        stats = logic.calculate_delivery_stats()
+
+        self.assertEqual(
+            stats["totals"],
+            {"sent": 1, "failed": 1, "unauthorized": 1},
+        )
+        self.assertEqual(
+            {row["journal_id"] for row in stats["by_journal"]},
+            {self.journal_one.pk, self.journal_two.pk},
+        )
+        self.assertEqual(
+            {row["failure_class"] for row in stats["failure_classes"]},
+            {SwitchboardMessage.REJECTED, SwitchboardMessage.UNAUTHORIZED},
+        )
+
+    def test_journal_stats_include_only_that_journal(self):
+        stats = logic.calculate_delivery_stats(journal=self.journal_one)
+
+        self.assertEqual(
+            stats["totals"],
+            {"sent": 1, "failed": 1, "unauthorized": 0},
+        )
+        self.assertEqual(stats["success_rate"], 50.0)
+        self.assertEqual(stats["latency_p95"], 300)
+
+    def test_stats_are_cached(self):
+        logic.delivery_stats(journal=self.journal_one)
+        logic.record_message(self.article_one, authorized=True, success=True)
+
+        stats = logic.delivery_stats(journal=self.journal_one)
+
+        self.assertEqual(stats["totals"]["sent"], 1)
+
+
+@patch("plugins.oas.logic.authorize", return_value=("a token", True))
+@patch("plugins.oas.logic.build_payload_for_sending", return_value={})
+class TestSendErrors(django.test.TestCase):
+    def setUp(self):
+        self.journal, _ = helpers.create_journals()
+        self.article = helpers.create_article(self.journal)
+
+    def deliver(self, error):
+        with patch("plugins.oas.logic.send_payload", side_effect=error):
+            switchboard_message, json_output = logic.deliver_article(
+                self.article,
+                PLUGIN_SETTINGS,
+            )
+
+        self.assertIsNone(json_output)
+        self.assertFalse(switchboard_message.pending)
+        self.assertFalse(switchboard_message.success)
+        return switchboard_message.failure_class
+
+    def test_timeouts_are_classified(self, mock_build, mock_authorize):
+        self.assertEqual(
+            self.deliver(requests.Timeout()),
+            SwitchboardMessage.TIMEOUT,
+        )
+
+    def test_connection_errors_are_classified(
+        self,
+        mock_build,
+        mock_authorize,
+    ):
+        self.assertEqual(
+            self.deliver(requests.ConnectionError()),
+            SwitchboardMessage.ERROR,
+        )
+
+    def test_other_errors_are_recorded_and_raised(
+        self,
+        mock_build,
+        mock_authorize,
+    ):
+        with self.assertRaises(KeyError):
+            self.deliver(KeyError("id"))
+
+        self.assertEqual(
+            SwitchboardMessage.objects.get().failure_class,
+            SwitchboardMessage.ERROR,
+        )
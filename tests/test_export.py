@@ -0,0 +1,53 @@
+import csv
+import json
+
+import django
+from plugins.oas import export, logic
+from utils.testing import helpers
+
+
+class TestExport(django.test.TestCase):
+    def setUp(self):
+        self.journal_one, self.journal_two = helpers.create_journals()
+        self.article_one = helpers.create_article(self.journal_one)
+        self.article_two = helpers.create_article(self.journal_two)
+
+        logic.record_message(
+            self.article_one,
+            authorized=True,
+            payload={"title": "One"},
+            json_output={"id": 1},
+            success=True,
+        )
+        logic.record_message(self.article_one, authorized=False)
+        logic.record_message(self.article_two, authorized=True, success=True)
+
+    def test_filters_by_journal_and_status(self):
+        messages = export.filter_messages(
+            journal=self.journal_one,
+            status="sent",
+        )
+
+        self.assertEqual(
+            [message.article for message in messages],
+            [self.article_one],
+        )
+
+    def test_csv_has_a_header_and_a_row_per_message(self):
+        lines = list(export.export_lines(export.filter_messages()))
+        rows = list(csv.DictReader(lines))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["journal"], self.journal_one.code)
+        self.assertNotIn("message", rows[0])
+
+    def test_ndjson_includes_bodies_on_request(self):
+        lines = export.export_lines(
+            export.filter_messages(status="sent", journal=self.journal_one),
+            export_format=export.NDJSON,
+            bodies=True,
+        )
+        row = json.loads(next(lines))
+
+        self.assertEqual(json.loads(row["message"]), {"title": "One"})
+        self.assertTrue(row["success"])
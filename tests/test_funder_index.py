@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+from plugins.oas import funder_index
+
+DUMP = [
+    {
+        "id": "https://ror.org/00k4n6c32",
+        "status": "active",
+        "names": [
+            {"value": "European Commission", "types": ["ror_display"]},
+        ],
+        "external_ids": [
+            {"type": "fundref", "all": ["501100000780"]},
+        ],
+    },
+    {
+        "id": "https://ror.org/0439y7842",
+        "status": "active",
+        "name": "Economic and Social Research Council",
+        "aliases": [],
+        "acronyms": ["ESRC"],
+        "labels": [],
+        "external_ids": {"FundRef": {"all": ["501100000269"]}},
+    },
+]
+
+
+class TestFunderIndex(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.directory, "funders.idx")
+        self.build(DUMP)
+
+    def build(self, dump):
+        dump_path = os.path.join(self.directory, "dump.json")
+
+        with open(dump_path, "w") as handle:
+            json.dump(dump, handle)
+
+        funder_index.build_index(
+            [funder_index.read_ror_dump(dump_path)],
+            self.index_path,
+        )
+
+    def test_lookup_by_name_fills_both_identifiers(self):
+        with override_settings(OAS_FUNDER_INDEX_PATH=self.index_path):
+            funder = funder_index.lookup(name="european commission")
+
+        self.assertEqual(
+            funder.fundref, "https://doi.org/10.13039/501100000780"
+        )
+        self.assertEqual(funder.ror, "https://ror.org/00k4n6c32")
+
+    def test_lookup_by_fundref_uri(self):
+        with override_settings(OAS_FUNDER_INDEX_PATH=self.index_path):
+            funder = funder_index.lookup(
+                fundref="http://dx.doi.org/10.13039/501100000269",
+            )
+
+        self.assertEqual(funder.ror, "https://ror.org/0439y7842")
+
+    def test_lookup_by_ror(self):
+        with override_settings(OAS_FUNDER_INDEX_PATH=self.index_path):
+            funder = funder_index.lookup(ror="https://ror.org/0439Y7842/")
+
+        self.assertEqual(funder.name, "Economic and Social Research Council")
+
+    def test_unknown_funder(self):
+        with override_settings(OAS_FUNDER_INDEX_PATH=self.index_path):
+            self.assertIsNone(funder_index.lookup(name="Nobody"))
+
+    def test_benchmark_times_each_lookup(self):
+        self.assertEqual(
+            len(funder_index.benchmark(self.index_path, 50)),
+            50,
+        )
+
+    def test_rebuilt_crosswalk_is_read_without_a_restart(self):
+        with override_settings(OAS_FUNDER_INDEX_PATH=self.index_path):
+            self.assertIsNone(funder_index.lookup(name="Wellcome Trust"))
+
+            self.build(
+                DUMP
+                + [
+                    {
+                        "id": "https://ror.org/029chgv08",
+                        "status": "active",
+                        "name": "Wellcome Trust",
+                        "external_ids": [
+                            {"type": "fundref", "all": ["100004440"]},
+                        ],
+                    },
+                ]
+            )
+
+            self.assertEqual(
+                funder_index.lookup(name="Wellcome Trust").ror,
+                "https://ror.org/029chgv08",
+            )
@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+import django
+from django.core.cache import cache
+from django.test import override_settings
+from plugins.oas import health, logic
+from plugins.oas.models import SwitchboardQueueItem
+from utils.testing import helpers
+
+LOCAL_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "oas-health-tests",
+    },
+}
+
+URL = "https://oas.example.org/"
+PLUGIN_SETTINGS = (True, "email", False, "password", URL, "")
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class TestEndpointHealth(django.test.TestCase):
+    def setUp(self):
+        cache.clear()
+        self.journal, _ = helpers.create_journals()
+        self.article = helpers.create_article(self.journal)
+
+    def test_unprobed_endpoint_is_healthy(self):
+        self.assertTrue(health.is_healthy(URL))
+
+    def test_endpoint_is_down_after_repeated_failures(self):
+        health.record(URL, None, None, "Connection refused")
+        self.assertTrue(health.is_healthy(URL))
+
+        health.record(URL, None, None, "Connection refused")
+        self.assertFalse(health.is_healthy(URL))
+
+        health.record(URL, 120, 200, "")
+        self.assertTrue(health.is_healthy(URL))
+
+    @patch("plugins.oas.logic.deliver_article")
+    @patch(
+        "plugins.oas.logic.get_journal_plugin_settings",
+        return_value=PLUGIN_SETTINGS,
+    )
+    def test_drain_defers_items_for_a_down_endpoint(
+        self, mock_settings, mock_deliver
+    ):
+        health.record(URL, None, 503, "HTTP 503")
+        health.record(URL, None, 503, "HTTP 503")
+        job = logic.queue_articles(self.journal, [self.article])
+
+        processed = logic.drain_queue()
+
+        self.assertEqual(processed, 0)
+        mock_deliver.assert_not_called()
+        self.assertEqual(
+            job.items.get().status,
+            SwitchboardQueueItem.PENDING,
+        )
@@ -0,0 +1,114 @@
+import os
+import time
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase
+from django.urls import set_script_prefix
+from django.utils import translation
+from plugins.oas import hooks
+
+# editor page renders to simulate
+ROUNDS = 1000
+
+# the most the hook may add to an editor page render, in seconds
+TIME_BUDGET = 0.00005
+
+# a stand-in for the journal manager's side menu, which the plugin's links
+# are added to
+EDITOR_MENU = Template(
+    "<ul>{% for item in items %}<li>{{ item }}</li>{% endfor %}"
+    "{{ plugin_menu }}</ul>"
+)
+
+
+class TestMenuHook(SimpleTestCase):
+    def setUp(self):
+        hooks._fragments.clear()
+
+    def tearDown(self):
+        set_script_prefix("/")
+
+    def test_cached_menu_matches_a_fresh_render(self):
+        hooks.menu_hook({})
+
+        self.assertEqual(
+            hooks.menu_hook({}),
+            render_to_string("oas/elements/menu_nav.html"),
+        )
+        self.assertEqual(len(hooks._fragments), 1)
+
+    def test_menu_is_cached_per_language_and_prefix(self):
+        hooks.menu_hook({})
+        with translation.override("de"):
+            hooks.menu_hook({})
+
+        set_script_prefix("/abc/")
+        menu = hooks.menu_hook({})
+
+        self.assertEqual(len(hooks._fragments), 3)
+        self.assertIn("/abc/", menu)
+
+    @patch("plugins.oas.hooks.render_to_string", return_value="<li></li>")
+    def test_template_is_rendered_once(self, mock_render_to_string):
+        for _ in range(ROUNDS):
+            menu = hooks.menu_hook({})
+
+        self.assertEqual(menu, "<li></li>")
+        mock_render_to_string.assert_called_once_with(
+            "oas/elements/menu_nav.html",
+        )
+
+    @patch("plugins.oas.hooks.render_to_string", return_value="<li></li>")
+    def test_debug_renders_every_time(self, mock_render_to_string):
+        with self.settings(DEBUG=True):
+            for _ in range(3):
+                hooks.menu_hook({})
+
+        self.assertEqual(mock_render_to_string.call_count, 3)
+
+
+# timings vary with the machine and its load, so the benchmark is only run
+# on request: OAS_BENCHMARK=1 python3 manage.py test plugins.oas
+@skipUnless(os.environ.get("OAS_BENCHMARK"), "set OAS_BENCHMARK to run")
+class BenchmarkMenuHook(SimpleTestCase):
+    def setUp(self):
+        hooks._fragments.clear()
+
+    def render_editor_menu(self, with_plugin):
+        """
+        Time rendering the editor menu, with or without the plugin's links
+        :param with_plugin: whether to call the plugin's hook
+        :return: the average time per render in seconds
+        """
+        items = [f"Item {number}" for number in range(20)]
+
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            plugin_menu = hooks.menu_hook({}) if with_plugin else ""
+            EDITOR_MENU.render(
+                Context({"items": items, "plugin_menu": plugin_menu}),
+            )
+        return (time.perf_counter() - started) / ROUNDS
+
+    def test_render_overhead(self):
+        hooks.menu_hook({})
+
+        without_plugin = self.render_editor_menu(with_plugin=False)
+        with_plugin = self.render_editor_menu(with_plugin=True)
+        overhead = with_plugin - without_plugin
+
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            render_to_string("oas/elements/menu_nav.html")
+        uncached = (time.perf_counter() - started) / ROUNDS
+
+        print(
+            f"\nEditor menu render: {without_plugin * 1e6:.1f} us without "
+            f"the plugin, {with_plugin * 1e6:.1f} us with it; an uncached "
+            f"menu render takes {uncached * 1e6:.1f} us"
+        )
+        self.assertLess(overhead, TIME_BUDGET)
+        self.assertLess(overhead, uncached)
@@ -0,0 +1,133 @@
+import io
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import django
+import requests
+from django.core.management import call_command
+from django.test import override_settings
+from identifiers import models as identifier_models
+from plugins.oas import inbox
+from plugins.oas.models import (
+    SwitchboardInboundMessage,
+    SwitchboardInboxCursor,
+)
+from plugins.oas.tests.stand_in import StandInServer
+from utils.testing import helpers
+
+
+def make_message(message_id, doi):
+    return {
+        "id": message_id,
+        "header": {"type": "e1", "from": {"name": "Birkbeck"}},
+        "data": {"article": {"doi": doi}},
+    }
+
+
+@override_settings(OAS_RATE_LIMITS={})
+class TestInbox(django.test.TestCase):
+    def setUp(self):
+        self.pages = []
+        self.messages = [
+            make_message(message_id, "https://doi.org/10.1234/ABC")
+            for message_id in range(1, 6)
+        ]
+        self.server = StandInServer(self.respond)
+        self.addCleanup(self.server.close)
+
+        url = self.server.url
+        self.plugin_settings = (True, "email", False, "password", url, url)
+
+        self.journal, self.other_journal = helpers.create_journals()
+        self.article = helpers.create_article(self.journal)
+        identifier_models.Identifier.objects.create(
+            id_type="doi",
+            identifier="10.1234/abc",
+            article=self.article,
+        )
+
+    def respond(self, request):
+        """
+        Answer authorization and serve the messages in pages
+        """
+        if request.method == "POST":
+            return 200, {"token": "token"}
+
+        query = parse_qs(urlparse(request.path).query)
+        after_id = int(query["afterId"][0])
+        page_size = int(query["pageSize"][0])
+
+        self.pages.append(after_id)
+        messages = [
+            message for message in self.messages if message["id"] > after_id
+        ]
+        return 200, {"data": messages[:page_size]}
+
+    def poll(self):
+        return inbox.poll_inbox(
+            self.journal,
+            plugin_settings=self.plugin_settings,
+            page_size=2,
+        )
+
+    def test_messages_are_fetched_in_pages_and_linked_by_doi(self):
+        stored = self.poll()
+
+        self.assertEqual(stored, 5)
+        self.assertEqual(self.pages, [0, 2, 4])
+        self.assertEqual(
+            SwitchboardInboundMessage.objects.filter(
+                article=self.article,
+            ).count(),
+            5,
+        )
+        self.assertEqual(
+            SwitchboardInboxCursor.objects.get(
+                journal=self.journal,
+            ).last_message_id,
+            5,
+        )
+
+    def test_later_polls_fetch_only_new_messages(self):
+        self.poll()
+        self.pages = []
+        self.messages.append(make_message(6, "10.9999/other"))
+
+        stored = self.poll()
+
+        self.assertEqual(stored, 1)
+        self.assertEqual(self.pages, [5])
+        self.assertIsNone(
+            SwitchboardInboundMessage.objects.get(switchboard_id=6).article
+        )
+
+    @patch("plugins.oas.ratelimit.acquire", return_value=0)
+    def test_polls_are_rate_limited_as_bulk_traffic(self, mock_acquire):
+        self.poll()
+
+        self.assertEqual(
+            {call.args[0] for call in mock_acquire.call_args_list},
+            {"authorize", "inbox"},
+        )
+        for call in mock_acquire.call_args_list:
+            self.assertTrue(call.kwargs["bulk"])
+
+    @patch("plugins.oas.inbox.poll_inbox")
+    def test_command_polls_past_an_unreachable_journal(self, mock_poll_inbox):
+        mock_poll_inbox.side_effect = [requests.ConnectionError(), 2]
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        with patch(
+            "plugins.oas.logic.get_journal_plugin_settings",
+            return_value=self.plugin_settings,
+        ):
+            call_command(
+                "oas_inbox",
+                journal=[self.journal.code, self.other_journal.code],
+                stdout=stdout,
+                stderr=stderr,
+            )
+
+        self.assertEqual(mock_poll_inbox.call_count, 2)
+        self.assertIn("failed to poll", stderr.getvalue())
+        self.assertIn("2 new messages", stdout.getvalue())
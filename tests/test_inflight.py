@@ -0,0 +1,93 @@
+import datetime
+from unittest.mock import patch
+
+import django
+from django.db import IntegrityError
+from django.test import override_settings
+from django.utils import timezone
+from plugins.oas import logic
+from plugins.oas.models import SwitchboardMessage
+from utils.testing import helpers
+
+
+class TestInFlightSends(django.test.TestCase):
+    def setUp(self):
+        self.journal, _ = helpers.create_journals()
+        self.article = helpers.create_article(self.journal)
+
+    def test_second_send_attaches_to_the_first(self):
+        first, first_created = logic.begin_send(self.article)
+        second, second_created = logic.begin_send(self.article)
+
+        self.assertTrue(first_created)
+        self.assertFalse(second_created)
+        self.assertEqual(first.pk, second.pk)
+
+    def test_other_integrity_errors_are_raised(self):
+        refuse_create = patch.object(
+            SwitchboardMessage.objects,
+            "create",
+            side_effect=IntegrityError("FOREIGN KEY constraint failed"),
+        )
+
+        with refuse_create as mock_create, self.assertRaises(IntegrityError):
+            logic.begin_send(self.article)
+
+        self.assertEqual(mock_create.call_count, logic.BEGIN_SEND_ATTEMPTS)
+
+    @override_settings(OAS_SEND_WAIT=0)
+    @patch("plugins.oas.logic.authorize")
+    def test_article_in_flight_is_not_sent_again(self, mock_authorize):
+        logic.begin_send(self.article)
+
+        switchboard_message, _ = logic.deliver_article(
+            self.article, plugin_settings=None
+        )
+
+        mock_authorize.assert_not_called()
+        self.assertTrue(switchboard_message.pending)
+        self.assertEqual(SwitchboardMessage.objects.count(), 1)
+
+    def test_finished_send_completes_the_pending_message(self):
+        pending, _ = logic.begin_send(self.article)
+        logic.record_message(
+            self.article,
+            authorized=True,
+            success=True,
+            switchboard_message=pending,
+        )
+
+        finished = logic.wait_for_send(pending, timeout=0)
+
+        self.assertFalse(finished.pending)
+        self.assertIsNone(finished.in_flight_key)
+        self.assertTrue(finished.success)
+        self.assertTrue(logic.begin_send(self.article)[1])
+
+    def test_stale_sends_are_cleared(self):
+        pending, _ = logic.begin_send(self.article)
+        SwitchboardMessage.objects.filter(pk=pending.pk).update(
+            message_date_time=timezone.now() - datetime.timedelta(hours=1),
+        )
+
+        _, created = logic.begin_send(self.article)
+
+        self.assertTrue(created)
+        self.assertFalse(
+            SwitchboardMessage.objects.filter(pk=pending.pk).exists()
+        )
+
+    @override_settings(OAS_RATE_LIMIT_MAX_WAIT=600)
+    def test_send_waiting_on_the_limiter_is_not_stale(self):
+        pending, _ = logic.begin_send(self.article)
+        SwitchboardMessage.objects.filter(pk=pending.pk).update(
+            message_date_time=timezone.now() - datetime.timedelta(minutes=20),
+        )
+
+        _, created = logic.begin_send(self.article)
+
+        self.assertFalse(created)
+        self.assertGreater(
+            logic.get_stale_send_age(),
+            2 * (600 + logic.REQUEST_TIMEOUT),
+        )
@@ -1,4 +1,7 @@
+import importlib
+import json
 import unittest
+import zlib
 import datetime
 from unittest.mock import patch, MagicMock, Mock
 
@@ -12,9 +15,14 @@ from utils import install
 from journal.models import Issue
 from submission.models import Licence
 from core import models as core_models
+from oas.models import SwitchboardMessage
 
 SETTINGS_PATH = "plugins/oas/install/settings.json"
 
+legacy_bodies = importlib.import_module(
+    "oas.migrations.0014_convert_legacy_message_bodies"
+)
+
 
 class MockResponse(Mock):
     def __init__(self, content=None, ok=True):
@@ -352,5 +360,91 @@ class TestPublicationEventHandler(django.test.TestCase):
             )
 
 
+class TestFingerprintPayload(unittest.TestCase):
+    def test_key_order_does_not_change_fingerprint(self):
+        self.assertEqual(
+            logic.fingerprint_payload({"a": 1, "b": [1, 2]}),
+            logic.fingerprint_payload({"b": [1, 2], "a": 1}),
+        )
+
+    def test_changed_metadata_changes_fingerprint(self):
+        self.assertNotEqual(
+            logic.fingerprint_payload({"ror": ""}),
+            logic.fingerprint_payload({"ror": "https://ror.org/02mb95055"}),
+        )
+
+
+class TestLicenseCategory(unittest.TestCase):
+    def test_versioned_licence_uses_longest_prefix(self):
+        self.assertEqual(
+            logic.license_category("CC BY-NC-SA 4.0"), "CC BY-NC-SA"
+        )
+
+    def test_copyright_is_non_cc(self):
+        self.assertEqual(logic.license_category("Copyright"), "non-CC")
+
+    def test_unknown_licence_is_not_specified(self):
+        self.assertEqual(
+            logic.license_category("All rights reserved"), "not specified"
+        )
+
+
+class TestResponseHandling(unittest.TestCase):
+    @django.test.override_settings(OAS_MAX_RESPONSE_BYTES=10)
+    def test_response_is_capped(self):
+        content = logic.read_capped_content([b"<html>", b"error page", b"!"])
+
+        self.assertEqual(content, b"<html>erro")
+
+    def test_non_json_response_is_kept_as_text(self):
+        json_output, success = logic.read_message_response(b"<html>")
+
+        self.assertEqual(json_output, {"message": "<html>"})
+        self.assertTrue(success)
+
+    def test_error_response_fails(self):
+        json_output, success = logic.read_message_response(
+            b'{"error": true, "errorMessage": ["Bad DOI"]}'
+        )
+
+        self.assertEqual(json_output["errorMessage"], ["Bad DOI"])
+        self.assertFalse(success)
+
+
+class TestMessageBodies(unittest.TestCase):
+    def test_bodies_round_trip_through_compression(self):
+        message = SwitchboardMessage(
+            message={"header": {"type": "p1"}},
+            response="accepted",
+        )
+
+        self.assertEqual(json.loads(message.message)["header"]["type"], "p1")
+        self.assertEqual(message.response, "accepted")
+
+    def test_bodies_are_stored_compressed(self):
+        message = SwitchboardMessage(message="x" * 1000)
+
+        self.assertLess(len(message.message_body), 100)
+
+
+class TestLegacyBodies(unittest.TestCase):
+    def test_python_repr_bodies_become_json(self):
+        body = {"header": {"persistent": True}, "data": None}
+        converted = legacy_bodies.convert_body(
+            zlib.compress(str(body).encode("utf-8"))
+        )
+
+        self.assertEqual(
+            json.loads(zlib.decompress(converted)),
+            body,
+        )
+
+    def test_json_and_plain_text_bodies_are_left_alone(self):
+        for text in ('{"id": 1}', "<html>error</html>", "'accepted'", ""):
+            self.assertIsNone(
+                legacy_bodies.convert_body(zlib.compress(text.encode()))
+            )
+
+
 if __name__ == "__main__":
     unittest.main()
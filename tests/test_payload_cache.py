@@ -0,0 +1,100 @@
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from plugins.oas import logic, payload_cache
+
+LOCAL_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "oas-payload-cache-tests",
+    },
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class TestPayloadCache(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        payload_cache.clear()
+
+    def test_block_is_built_once(self):
+        build = Mock(return_value={"name": "Journal One"})
+
+        for _ in range(3):
+            block = payload_cache.memoise(payload_cache.JOURNAL, 1, build)
+
+        self.assertEqual(block, {"name": "Journal One"})
+        build.assert_called_once()
+
+    def test_version_bump_rebuilds_block(self):
+        build = Mock(side_effect=[{"name": "Old"}, {"name": "New"}])
+
+        payload_cache.memoise(payload_cache.JOURNAL, 2, build)
+        payload_cache.bump_version(payload_cache.JOURNAL, 2)
+        block = payload_cache.memoise(payload_cache.JOURNAL, 2, build)
+
+        self.assertEqual(block, {"name": "New"})
+
+    def test_blocks_are_keyed_by_kind_and_id(self):
+        payload_cache.memoise(payload_cache.JOURNAL, 3, lambda: "journal")
+
+        self.assertEqual(
+            payload_cache.memoise(payload_cache.LICENCE, 3, lambda: "cc"),
+            "cc",
+        )
+
+    def test_callers_get_a_copy(self):
+        block = payload_cache.memoise(
+            payload_cache.JOURNAL,
+            4,
+            lambda: {"name": "Journal Four"},
+        )
+        block["name"] = "Changed"
+
+        self.assertEqual(
+            payload_cache.memoise(payload_cache.JOURNAL, 4, Mock()),
+            {"name": "Journal Four"},
+        )
+
+    def test_versions_are_read_once_for_every_block(self):
+        for object_id in range(5):
+            payload_cache.memoise(payload_cache.JOURNAL, object_id, dict)
+
+        expire_versions = patch.object(payload_cache, "_versions_read", 0.0)
+        watch_cache = patch.object(cache, "get_many", wraps=cache.get_many)
+
+        with expire_versions, watch_cache as mock_get_many:
+            for object_id in range(5):
+                payload_cache.memoise(payload_cache.JOURNAL, object_id, dict)
+
+        mock_get_many.assert_called_once()
+
+    def test_evicted_version_is_seeded_afresh(self):
+        build = Mock(side_effect=[{"name": "Old"}, {"name": "New"}])
+
+        payload_cache.memoise(payload_cache.JOURNAL, 5, build)
+        cache.clear()
+        payload_cache.bump_version(payload_cache.JOURNAL, 5)
+        block = payload_cache.memoise(payload_cache.JOURNAL, 5, build)
+
+        self.assertEqual(block, {"name": "New"})
+
+    def test_only_journal_block_settings_invalidate(self):
+        payload_cache.memoise(payload_cache.JOURNAL, 6, dict)
+        version = payload_cache.get_version(payload_cache.JOURNAL, 6)
+
+        for name in ("enable_editorial_display", "journal_name"):
+            setting_value = Mock(journal_id=6)
+            setting_value.setting.name = name
+            payload_cache._setting_changed(None, setting_value)
+
+        self.assertEqual(
+            payload_cache.get_version(payload_cache.JOURNAL, 6),
+            version + 1,
+        )
+
+    def test_header_is_a_copy(self):
+        logic.build_header()["to"]["address"] = "changed"
+
+        self.assertEqual(logic.build_header(), logic.HEADER)
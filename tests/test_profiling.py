@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+import django
+from plugins.oas import logic, profiling
+from plugins.oas.models import SwitchboardProfile
+from utils.testing import helpers
+
+PLUGIN_SETTINGS = (True, "email", False, "password", "http://oas/", "")
+
+
+class TestProfileSend(django.test.TestCase):
+    def setUp(self):
+        self.journal, _ = helpers.create_journals()
+        self.article = helpers.create_article(self.journal)
+
+    @patch("plugins.oas.logic.authorize", return_value=(None, False))
+    def test_profile_is_saved_on_the_message(self, mock_authorize):
+        profile = profiling.profile_send(
+            self.article,
+            logic.deliver_article,
+            self.article,
+            PLUGIN_SETTINGS,
+        )
+
+        self.assertEqual(profile.message.article, self.article)
+        self.assertGreater(profile.query_count, 0)
+        self.assertEqual(len(profile.queries), profile.query_count)
+        self.assertIn("deliver_article", profiling.summarise_stats(profile))
+
+    def test_nothing_is_saved_without_a_message(self):
+        profile = profiling.profile_send(self.article, lambda: None)
+
+        self.assertIsNone(profile)
+        self.assertFalse(SwitchboardProfile.objects.exists())
+
+    @patch("plugins.oas.logic.authorize")
+    def test_earlier_message_is_not_given_the_profile(self, mock_authorize):
+        logic.record_message(self.article, authorized=True, success=True)
+
+        with self.settings(OAS_SEND_WAIT=0):
+            logic.begin_send(self.article)
+            profile = profiling.profile_send(
+                self.article,
+                logic.deliver_article,
+                self.article,
+                PLUGIN_SETTINGS,
+            )
+
+        self.assertIsNone(profile)
+        self.assertFalse(SwitchboardProfile.objects.exists())
@@ -0,0 +1,211 @@
+from unittest.mock import MagicMock, patch
+
+import django
+from django.test import override_settings
+from plugins.oas import logic
+from plugins.oas.models import SwitchboardMessage, SwitchboardQueueItem
+from utils.testing import helpers
+
+
+class TestQueue(django.test.TestCase):
+    def setUp(self):
+        self.journal, _ = helpers.create_journals()
+        self.bulk_articles = [
+            helpers.create_article(self.journal) for _ in range(3)
+        ]
+        self.published_article = helpers.create_article(self.journal)
+
+    def test_queue_skips_articles_already_queued(self):
+        logic.queue_articles(self.journal, self.bulk_articles)
+        job = logic.queue_articles(self.journal, self.bulk_articles)
+
+        self.assertEqual(job.items.count(), 0)
+        self.assertIsNotNone(job.completed)
+
+    def test_interactive_items_are_claimed_first(self):
+        logic.queue_articles(self.journal, self.bulk_articles)
+        logic.queue_articles(
+            self.journal,
+            [self.published_article],
+            priority=SwitchboardQueueItem.INTERACTIVE,
+        )
+
+        item = logic.claim_queue_item()
+
+        self.assertEqual(item.article, self.published_article)
+        self.assertEqual(item.status, SwitchboardQueueItem.SENDING)
+
+    @override_settings(OAS_BULK_SHARE=0.5)
+    @patch("plugins.oas.logic.process_queue_item")
+    def test_bulk_lane_gets_its_share(self, mock_process):
+        logic.queue_articles(self.journal, self.bulk_articles)
+        logic.queue_articles(
+            self.journal,
+            [self.published_article],
+            priority=SwitchboardQueueItem.INTERACTIVE,
+        )
+
+        logic.drain_queue(limit=2)
+
+        claimed = [call.args[0].priority for call in mock_process.mock_calls]
+        self.assertEqual(
+            claimed,
+            [SwitchboardQueueItem.INTERACTIVE, SwitchboardQueueItem.BULK],
+        )
+
+
+class TestFairQueue(django.test.TestCase):
+    def setUp(self):
+        self.busy_journal, self.quiet_journal = helpers.create_journals()
+        logic.queue_articles(
+            self.busy_journal,
+            [helpers.create_article(self.busy_journal) for _ in range(6)],
+        )
+        logic.queue_articles(
+            self.quiet_journal,
+            [helpers.create_article(self.quiet_journal) for _ in range(2)],
+        )
+
+    @patch("plugins.oas.logic.process_queue_item")
+    def test_journals_take_turns(self, mock_process):
+        logic.drain_queue(limit=4)
+
+        claimed = [call.args[0].journal for call in mock_process.mock_calls]
+        self.assertEqual(
+            claimed,
+            [
+                self.busy_journal,
+                self.quiet_journal,
+                self.busy_journal,
+                self.quiet_journal,
+            ],
+        )
+
+    @patch("plugins.oas.logic.process_queue_item")
+    def test_weights_set_each_journal_share(self, mock_process):
+        weights = {self.busy_journal.code: 2, self.quiet_journal.code: 0.5}
+
+        with override_settings(OAS_JOURNAL_WEIGHTS=weights):
+            logic.drain_queue(limit=5)
+
+        claimed = [call.args[0].journal for call in mock_process.mock_calls]
+        self.assertEqual(
+            claimed,
+            [
+                self.busy_journal,
+                self.busy_journal,
+                self.busy_journal,
+                self.busy_journal,
+                self.quiet_journal,
+            ],
+        )
+
+    def test_queue_depths_are_counted_per_journal(self):
+        logic.claim_queue_item(journal_id=self.quiet_journal.pk)
+
+        depths = {
+            row["journal_id"]: (row["bulk"], row["sending"])
+            for row in logic.queue_depths()
+        }
+
+        self.assertEqual(
+            depths,
+            {self.busy_journal.pk: (6, 0), self.quiet_journal.pk: (1, 1)},
+        )
+
+
+@patch("plugins.oas.logic.messages")
+@patch("plugins.oas.logic.get_plugin_settings")
+class TestInteractiveLane(django.test.TestCase):
+    def setUp(self):
+        self.journal, _ = helpers.create_journals()
+        self.article = helpers.create_article(self.journal)
+        self.request = MagicMock()
+
+    def publish(self, mock_settings):
+        mock_settings.return_value = (True, "", False, "", "https://x/", "")
+        logic.publication_event_handler(
+            request=self.request,
+            article=self.article,
+        )
+
+    @patch("plugins.oas.logic.deliver_article")
+    def test_publication_is_sent_through_the_interactive_lane(
+        self,
+        mock_deliver,
+        mock_settings,
+        mock_messages,
+    ):
+        mock_deliver.side_effect = lambda article, *args, **kwargs: (
+            logic.record_message(article, authorized=True, success=True),
+            None,
+        )
+
+        self.publish(mock_settings)
+
+        item = SwitchboardQueueItem.objects.get(article=self.article)
+        self.assertEqual(item.priority, SwitchboardQueueItem.INTERACTIVE)
+        self.assertEqual(item.status, SwitchboardQueueItem.SENT)
+        self.assertTrue(item.message.success)
+
+    @patch("plugins.oas.logic.deliver_article")
+    def test_publication_promotes_a_queued_bulk_send(
+        self,
+        mock_deliver,
+        mock_settings,
+        mock_messages,
+    ):
+        mock_deliver.return_value = (
+            logic.record_message(self.article, authorized=True, success=True),
+            None,
+        )
+        bulk_job = logic.queue_articles(self.journal, [self.article])
+
+        self.publish(mock_settings)
+
+        item = bulk_job.items.get()
+        self.assertEqual(item.priority, SwitchboardQueueItem.INTERACTIVE)
+        self.assertEqual(item.status, SwitchboardQueueItem.SENT)
+        self.assertEqual(
+            SwitchboardQueueItem.objects.filter(article=self.article).count(),
+            1,
+        )
+
+    @patch("plugins.oas.logic.health.is_healthy", return_value=False)
+    @patch("plugins.oas.logic.deliver_article")
+    def test_publication_waits_in_the_queue_while_endpoint_is_down(
+        self,
+        mock_deliver,
+        mock_is_healthy,
+        mock_settings,
+        mock_messages,
+    ):
+        self.publish(mock_settings)
+
+        item = SwitchboardQueueItem.objects.get(article=self.article)
+        self.assertEqual(item.priority, SwitchboardQueueItem.INTERACTIVE)
+        self.assertEqual(item.status, SwitchboardQueueItem.PENDING)
+        mock_deliver.assert_not_called()
+
+    @patch(
+        "plugins.oas.logic.ratelimit.acquire",
+        side_effect=TimeoutError("Gave up waiting for the rate limit"),
+    )
+    def test_rate_limit_timeout_fails_the_send_without_raising(
+        self,
+        mock_acquire,
+        mock_settings,
+        mock_messages,
+    ):
+        self.publish(mock_settings)
+
+        item = SwitchboardQueueItem.objects.get(article=self.article)
+        self.assertEqual(item.status, SwitchboardQueueItem.FAILED)
+        self.assertEqual(
+            item.message.failure_class,
+            SwitchboardMessage.TIMEOUT,
+        )
+        self.assertEqual(
+            mock_messages.add_message.call_args[0][1],
+            mock_messages.ERROR,
+        )
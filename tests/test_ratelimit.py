@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+import django
+from django.test import override_settings
+from plugins.oas import ratelimit
+from plugins.oas.models import SwitchboardRateBucket
+
+LIMITS = {"message": {"rate": 2.0, "burst": 3}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@override_settings(OAS_RATE_LIMITS=LIMITS)
+class TestRateLimit(django.test.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch("plugins.oas.ratelimit.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_does_not_wait(self):
+        for _ in range(3):
+            self.assertEqual(ratelimit.acquire("message", "https://x/"), 0)
+
+    def test_waits_once_burst_is_used(self):
+        for _ in range(3):
+            ratelimit.acquire("message", "https://x/")
+
+        waited = ratelimit.acquire("message", "https://x/")
+
+        self.assertAlmostEqual(waited, 0.5)
+        bucket = SwitchboardRateBucket.objects.get(name="https://x/")
+        self.assertEqual(bucket.acquisitions, 4)
+        self.assertEqual(bucket.waits, 1)
+        self.assertAlmostEqual(bucket.wait_seconds, 0.5)
+
+    def test_urls_have_separate_buckets(self):
+        for _ in range(3):
+            ratelimit.acquire("message", "https://x/")
+
+        self.assertEqual(ratelimit.acquire("message", "https://y/"), 0)
+
+    def test_unconfigured_endpoint_is_unlimited(self):
+        for _ in range(10):
+            self.assertEqual(ratelimit.acquire("authorize", "https://x/"), 0)
+
+        self.assertFalse(SwitchboardRateBucket.objects.exists())
+
+    def test_bulk_leaves_reserve_for_interactive(self):
+        limits = {"message": {"rate": 2.0, "burst": 3, "reserve": 1}}
+
+        with override_settings(OAS_RATE_LIMITS=limits):
+            for _ in range(2):
+                ratelimit.acquire("message", "https://x/", bulk=True)
+
+            waited_bulk = ratelimit.acquire("message", "https://x/", bulk=True)
+            waited = ratelimit.acquire("message", "https://x/")
+
+        self.assertAlmostEqual(waited_bulk, 0.5)
+        self.assertEqual(waited, 0)
+
+    @override_settings(OAS_RATE_LIMIT_MAX_WAIT=0.1)
+    def test_gives_up_after_the_maximum_wait(self):
+        for _ in range(3):
+            ratelimit.acquire("message", "https://x/")
+
+        with self.assertRaises(TimeoutError):
+            ratelimit.acquire("message", "https://x/")
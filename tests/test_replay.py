@@ -0,0 +1,111 @@
+import gzip
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from plugins.oas import replay
+from plugins.oas.tests.stand_in import StandInServer
+
+
+@override_settings(OAS_RATE_LIMITS={})
+class TestReplay(SimpleTestCase):
+    def setUp(self):
+        self.bodies = []
+        self.server = StandInServer(self.respond)
+        self.addCleanup(self.server.close)
+
+        self.url = self.server.url
+        self.records = [
+            {
+                "id": 1,
+                "message": json.dumps({"title": "One"}),
+                "response": json.dumps({"id": 900}),
+            },
+            {
+                "id": 2,
+                "message": json.dumps({"title": ""}),
+                "response": json.dumps({"id": 901}),
+            },
+            {
+                "id": 3,
+                "message": json.dumps({"title": "Three"}),
+                "response": json.dumps({"id": 902}),
+            },
+        ]
+
+    def respond(self, request):
+        """
+        Record each body and reject any message with an empty title
+        """
+        body = json.loads(request.body)
+        self.bodies.append(body)
+
+        if body.get("title"):
+            return 200, {"id": len(self.bodies)}
+        return 200, {"error": True, "errorMessage": "title is required"}
+
+    def test_stored_payloads_are_sent_unchanged(self):
+        replay.replay(self.records, self.url, "token", concurrency=2)
+
+        self.assertCountEqual(
+            self.bodies,
+            [json.loads(record["message"]) for record in self.records],
+        )
+
+    def test_report_counts_and_diffs(self):
+        report = replay.replay(self.records, self.url, "token", concurrency=3)
+
+        self.assertEqual(report["sent"], 3)
+        self.assertEqual(report["succeeded"], 2)
+        self.assertEqual(report["errors"], [])
+        self.assertIsNotNone(report["latency_p99"])
+
+        # message IDs change on every send and are not a difference
+        self.assertEqual([diff["id"] for diff in report["diffs"]], [2])
+
+    def test_rate_spaces_out_sends(self):
+        report = replay.replay(self.records, self.url, "token", rate=20)
+
+        self.assertGreaterEqual(report["elapsed"], 0.1)
+
+    @patch("plugins.oas.replay.ratelimit.acquire")
+    def test_sandbox_replays_share_the_rate_limit(self, mock_acquire):
+        replay.replay(self.records, self.url, "token", rate_limited=True)
+
+        self.assertEqual(mock_acquire.call_count, 3)
+        mock_acquire.assert_called_with(
+            "message",
+            f"{self.url}message",
+            bulk=True,
+        )
+
+    def test_connection_errors_are_reported(self):
+        # nothing is listening once the stand-in is closed
+        self.server.close()
+
+        report = replay.replay(self.records[:1], self.url, "token")
+
+        self.assertEqual(report["sent"], 0)
+        self.assertEqual(len(report["errors"]), 1)
+
+    def test_records_are_read_from_an_archive(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "messages.ndjson.gz")
+            with gzip.open(path, "wt", encoding="utf-8") as handle:
+                for record in self.records + [{"id": 4, "message": ""}]:
+                    handle.write(json.dumps(record) + "\n")
+
+            records = list(replay.file_records(path))
+
+        self.assertEqual([record["id"] for record in records], [1, 2, 3])
+
+
+class TestPercentile(SimpleTestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(replay.percentile(values, 0.5), 51)
+        self.assertEqual(replay.percentile(values, 0.99), 100)
+        self.assertIsNone(replay.percentile([], 0.5))
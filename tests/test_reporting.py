@@ -0,0 +1,32 @@
+from django.contrib import admin
+from django.db import DEFAULT_DB_ALIAS
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from plugins.oas import export, logic
+from plugins.oas.admin import SwitchboardMessageAdmin
+from plugins.oas.models import SwitchboardMessage
+
+
+class TestReportingDatabase(SimpleTestCase):
+    def test_reports_use_the_primary_by_default(self):
+        self.assertEqual(
+            logic.reporting_queryset(SwitchboardMessage).db,
+            DEFAULT_DB_ALIAS,
+        )
+
+    @override_settings(OAS_REPORTING_DB="replica")
+    def test_reports_use_the_configured_replica(self):
+        self.assertEqual(export.filter_messages().db, "replica")
+
+    @override_settings(OAS_REPORTING_DB="replica")
+    def test_writes_stay_on_the_primary(self):
+        self.assertEqual(SwitchboardMessage.objects.all().db, DEFAULT_DB_ALIAS)
+
+    @override_settings(OAS_REPORTING_DB="replica")
+    def test_message_admin_reads_from_the_primary(self):
+        message_admin = SwitchboardMessageAdmin(SwitchboardMessage, admin.site)
+        request = RequestFactory().get("/admin/oas/switchboardmessage/")
+
+        self.assertEqual(
+            message_admin.get_queryset(request).db,
+            DEFAULT_DB_ALIAS,
+        )
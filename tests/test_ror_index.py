@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+from plugins.oas import ror_index
+
+DUMP = [
+    {
+        "id": "https://ror.org/02mb95055",
+        "status": "active",
+        "names": [
+            {
+                "value": "Birkbeck, University of London",
+                "types": ["ror_display", "label"],
+            },
+            {"value": "BBK", "types": ["acronym"]},
+        ],
+    },
+    {
+        "id": "https://ror.org/000000000",
+        "status": "active",
+        "name": "Université de Test",
+        "aliases": ["Test University"],
+        "acronyms": ["BBK"],
+        "labels": [],
+    },
+    {
+        "id": "https://ror.org/02k3smh20",
+        "status": "active",
+        "name": "University of Kentucky",
+        "aliases": ["Shared Institute"],
+        "acronyms": ["UK"],
+        "labels": [],
+    },
+    {
+        "id": "https://ror.org/041kmwe10",
+        "status": "active",
+        "name": "Imperial College London",
+        "aliases": ["London", "Shared Institute"],
+        "acronyms": [],
+        "labels": [],
+    },
+]
+
+
+class TestRorIndex(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.directory, "ror.sqlite")
+        self.build(DUMP)
+
+    def build(self, dump, index_path=None):
+        dump_path = os.path.join(self.directory, "dump.json")
+
+        with open(dump_path, "w") as handle:
+            json.dump(dump, handle)
+
+        ror_index.build_index(dump_path, index_path or self.index_path)
+
+    def test_matches_organisation_part_of_affiliation(self):
+        with override_settings(OAS_ROR_INDEX_PATH=self.index_path):
+            match = ror_index.lookup(
+                "Department of History, Birkbeck, University of London"
+            )
+
+        self.assertEqual(
+            match,
+            ("https://ror.org/02mb95055", "Birkbeck, University of London"),
+        )
+
+    def test_matches_aliases_ignoring_case_and_accents(self):
+        with override_settings(OAS_ROR_INDEX_PATH=self.index_path):
+            self.assertEqual(
+                ror_index.lookup("UNIVERSITE DE TEST")[0],
+                "https://ror.org/000000000",
+            )
+            self.assertEqual(
+                ror_index.lookup("test university")[0],
+                "https://ror.org/000000000",
+            )
+
+    def test_ambiguous_names_do_not_match(self):
+        with override_settings(OAS_ROR_INDEX_PATH=self.index_path):
+            self.assertIsNone(ror_index.lookup("Shared Institute"))
+
+    def test_acronyms_do_not_match(self):
+        with override_settings(OAS_ROR_INDEX_PATH=self.index_path):
+            self.assertIsNone(ror_index.lookup("UK"))
+            self.assertIsNone(ror_index.lookup("Department of Physics, UK"))
+
+    def test_single_parts_do_not_match(self):
+        with override_settings(OAS_ROR_INDEX_PATH=self.index_path):
+            self.assertIsNone(
+                ror_index.lookup("Department of History, Test University")
+            )
+            self.assertIsNone(
+                ror_index.lookup("Department of Physics, London")
+            )
+
+    def test_refreshed_index_is_read_without_a_restart(self):
+        with override_settings(OAS_ROR_INDEX_PATH=self.index_path):
+            self.assertIsNone(ror_index.lookup("New University"))
+
+            dump = DUMP + [
+                {
+                    "id": "https://ror.org/111111111",
+                    "status": "active",
+                    "name": "New University",
+                },
+            ]
+            self.build(dump)
+
+            self.assertEqual(
+                ror_index.lookup("New University")[0],
+                "https://ror.org/111111111",
+            )
+
+    def test_index_created_after_a_lookup_is_used(self):
+        missing_path = os.path.join(self.directory, "missing.sqlite")
+
+        with override_settings(OAS_ROR_INDEX_PATH=missing_path):
+            self.assertIsNone(ror_index.lookup("Test University"))
+            self.build(DUMP, missing_path)
+            self.assertIsNotNone(ror_index.lookup("Test University"))
+
+    def test_disabled_without_setting(self):
+        with override_settings(OAS_ROR_INDEX_PATH=None):
+            self.assertIsNone(ror_index.lookup("Test University"))
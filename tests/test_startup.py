@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.test import SimpleTestCase
+
+# modules that only sending needs, and that loading the plugin must not load
+HEAVY_MODULES = (
+    "plugins.oas.async_delivery",
+    "plugins.oas.funder_index",
+    "plugins.oas.logic",
+    "plugins.oas.profiling",
+    "plugins.oas.ratelimit",
+    "plugins.oas.ror_index",
+    "plugins.oas.streaming",
+)
+
+# the most modules and seconds that registering the plugin may add
+MODULE_BUDGET = 10
+TIME_BUDGET = 0.5
+
+MEASURE = """
+import json, sys, time
+import django
+
+django.setup()
+
+before = set(sys.modules)
+started = time.perf_counter()
+
+from plugins.oas import plugin_settings
+
+plugin_settings.register_for_events()
+
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "added": sorted(set(sys.modules) - before),
+    "loaded": sorted(sys.modules),
+}))
+"""
+
+
+class TestStartupCost(SimpleTestCase):
+    """
+    Measures, in a fresh interpreter, what setting up Django and
+    registering the plugin's events loads
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        result = subprocess.run(
+            [sys.executable, "-c", MEASURE],
+            capture_output=True,
+            check=True,
+            env=os.environ.copy(),
+            text=True,
+        )
+        cls.measurement = json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_sending_modules_are_not_loaded(self):
+        loaded = set(self.measurement["loaded"]) & set(HEAVY_MODULES)
+
+        self.assertEqual(loaded, set())
+
+    def test_registration_stays_within_budget(self):
+        added = self.measurement["added"]
+
+        self.assertLessEqual(len(added), MODULE_BUDGET, added)
+        self.assertLess(self.measurement["seconds"], TIME_BUDGET)
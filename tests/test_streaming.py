@@ -0,0 +1,105 @@
+import gzip
+import json
+import tracemalloc
+import zlib
+
+import django
+from django.test import SimpleTestCase
+from plugins.oas import logic, streaming
+from submission import models as submission_models
+from utils.testing import helpers
+
+# enough authors for the author list to dominate the payload
+AUTHOR_COUNT = 5000
+
+
+def make_authors(count):
+    for order in range(count):
+        yield {
+            "listingorder": order + 1,
+            "lastName": f"Author {order}",
+            "firstName": "Zoë",
+            "ORCID": None,
+            "creditroles": ["Writing – original draft"],
+            "isCorrespondingAuthor": order == 0,
+            "institutions": [{"name": "Birkbeck", "ror": ""}],
+            "affiliation": "Birkbeck, University of London",
+        }
+
+
+def make_skeleton(authors):
+    return {
+        "header": logic.HEADER,
+        "data": {
+            "timing": "VoR",
+            "authors": authors,
+            "article": {"title": "A consortium paper"},
+        },
+    }
+
+
+class TestStreamedPayload(SimpleTestCase):
+    def setUp(self):
+        self.payload = streaming.StreamedPayload(
+            make_skeleton(streaming.AUTHORS_PLACEHOLDER),
+            lambda: make_authors(3000),
+        )
+        self.expected = make_skeleton(list(make_authors(3000)))
+
+    def test_encoding_matches_the_whole_payload(self):
+        body = b"".join(self.payload.chunks())
+
+        self.assertEqual(body, json.dumps(self.expected).encode("utf-8"))
+        self.assertEqual(zlib.decompress(self.payload.message_body), body)
+        self.assertEqual(
+            self.payload.fingerprint,
+            logic.fingerprint_payload(self.expected),
+        )
+
+    def test_compressed_body_decompresses_to_the_payload(self):
+        body = b"".join(streaming.gzip_chunks(self.payload.chunks()))
+
+        self.assertEqual(json.loads(gzip.decompress(body)), self.expected)
+
+
+class TestStreamedBuilder(django.test.TestCase):
+    def setUp(self):
+        journal, _ = helpers.create_journals()
+        self.article = helpers.create_article(journal)
+        submission_models.FrozenAuthor.objects.bulk_create(
+            submission_models.FrozenAuthor(
+                article=self.article,
+                first_name="Zoë",
+                last_name=f"Author {order}",
+                order=order,
+            )
+            for order in range(AUTHOR_COUNT)
+        )
+
+    def test_streamed_body_matches_the_built_payload(self):
+        payload = logic.build_streamed_payload(self.article)
+        body = b"".join(payload.chunks())
+
+        self.assertEqual(
+            json.loads(body),
+            json.loads(streaming.encode(logic.build_payload(self.article))),
+        )
+
+    def test_peak_memory_is_bounded(self):
+        """
+        Build and encode a consortium paper with the real builders, once
+        streamed and once eagerly
+        """
+        tracemalloc.start()
+        for _ in logic.build_streamed_payload(self.article).chunks():
+            pass
+        streamed_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        eager = logic.build_payload(self.article)
+        zlib.compress(json.dumps(eager).encode("utf-8"))
+        eager_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.assertLess(streamed_peak * 3, eager_peak)
@@ -0,0 +1,188 @@
+import datetime
+import importlib
+import io
+import zlib
+from unittest.mock import patch
+
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from plugins.oas import changes, logic
+from plugins.oas.models import (
+    SwitchboardArticleChange,
+    SwitchboardMessage,
+    SwitchboardQueueItem,
+)
+from submission import models as submission_models
+from utils.testing import helpers
+
+backfill = importlib.import_module(
+    "plugins.oas.migrations."
+    "0013_backfill_fingerprints_delete_switchboardsyncstate"
+)
+
+LOCAL_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "oas-sync-tests",
+    },
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class TestFindChangedArticles(django.test.TestCase):
+    def setUp(self):
+        cache.clear()
+        changes.connect_signals()
+        self.journal, _ = helpers.create_journals()
+        self.unchanged = self.sent_article({"title": "Unchanged"})
+        self.changed = self.sent_article({"title": "Before"})
+        self.legacy = self.sent_article({"title": "Legacy"})
+        SwitchboardMessage.objects.filter(article=self.legacy).update(
+            fingerprint="",
+        )
+
+        # corrections to related records leave last_modified alone
+        submission_models.Article.objects.filter(
+            pk__in=[self.unchanged.pk, self.changed.pk, self.legacy.pk],
+        ).update(last_modified=timezone.now() - datetime.timedelta(days=365))
+        SwitchboardArticleChange.objects.update(
+            changed=timezone.now() - datetime.timedelta(days=365),
+        )
+
+        self.payloads = {
+            self.unchanged.pk: {"title": "Unchanged"},
+            self.changed.pk: {"title": "After"},
+            self.legacy.pk: {"title": "Legacy, corrected"},
+        }
+
+    def sent_article(self, payload):
+        article = helpers.create_article(self.journal)
+        submission_models.Article.objects.filter(pk=article.pk).update(
+            stage=submission_models.STAGE_PUBLISHED,
+        )
+        logic.record_message(
+            article,
+            authorized=True,
+            payload=payload,
+            json_output={"id": 1},
+            success=True,
+        )
+        return article
+
+    def build_payload(self, article):
+        return self.payloads[article.pk]
+
+    def test_only_articles_whose_payload_differs_are_found(self):
+        with patch(
+            "plugins.oas.logic.build_payload",
+            side_effect=self.build_payload,
+        ):
+            changed = logic.find_changed_articles(self.journal)
+
+        self.assertEqual(changed, [self.changed])
+
+    def test_unsent_articles_are_not_checked(self):
+        helpers.create_article(self.journal)
+
+        with patch(
+            "plugins.oas.logic.build_payload",
+            side_effect=self.build_payload,
+        ) as mock_build_payload:
+            logic.find_changed_articles(self.journal)
+
+        self.assertEqual(mock_build_payload.call_count, 2)
+
+    def sync(self, **options):
+        with patch(
+            "plugins.oas.logic.build_payload",
+            side_effect=self.build_payload,
+        ) as mock_build_payload:
+            call_command(
+                "oas_sync",
+                journal=[self.journal.code],
+                stdout=io.StringIO(),
+                **options,
+            )
+        return mock_build_payload.call_count
+
+    def test_only_articles_changed_since_are_rebuilt(self):
+        changes.mark_changed([self.changed.pk])
+
+        with patch(
+            "plugins.oas.logic.build_payload",
+            side_effect=self.build_payload,
+        ) as mock_build_payload:
+            changed = logic.find_changed_articles(
+                self.journal,
+                since=timezone.now() - datetime.timedelta(days=1),
+            )
+
+        self.assertEqual(changed, [self.changed])
+        self.assertEqual(mock_build_payload.call_count, 1)
+
+    def test_author_corrections_mark_the_article_changed(self):
+        submission_models.FrozenAuthor.objects.create(
+            article=self.changed,
+            first_name="Ada",
+            last_name="Lovelace",
+        )
+
+        self.assertEqual(
+            list(
+                SwitchboardArticleChange.objects.filter(
+                    changed__gte=timezone.now() - datetime.timedelta(days=1),
+                ).values_list("article_id", flat=True)
+            ),
+            [self.changed.pk],
+        )
+
+    def test_later_runs_only_rebuild_changed_articles(self):
+        self.assertEqual(self.sync(), 2)
+        self.assertEqual(self.sync(), 0)
+
+        changes.mark_changed([self.unchanged.pk])
+
+        self.assertEqual(self.sync(), 1)
+
+    def test_index_rebuilds_and_full_runs_rebuild_every_article(self):
+        self.sync()
+
+        with patch(
+            "plugins.oas.logic.ror_index.get_signature",
+            return_value="rebuilt",
+        ):
+            self.assertEqual(self.sync(), 2)
+
+        self.assertEqual(self.sync(full=True), 2)
+
+    def test_command_queues_resends(self):
+        self.sync()
+
+        self.assertEqual(
+            list(
+                SwitchboardQueueItem.objects.values_list(
+                    "article_id",
+                    flat=True,
+                )
+            ),
+            [self.changed.pk],
+        )
+
+
+class TestFingerprintBackfill(SimpleTestCase):
+    def test_json_and_legacy_bodies_match_the_payload_fingerprint(self):
+        payload = {"title": "A", "authors": [{"name": "B"}]}
+
+        for text in (logic.streaming.encode(payload), str(payload)):
+            self.assertEqual(
+                backfill.fingerprint_body(zlib.compress(text.encode())),
+                logic.fingerprint_payload(payload),
+            )
+
+    def test_unreadable_bodies_are_left_unknown(self):
+        body = zlib.compress(b"{'date': datetime.date(2024, 1, 1)}")
+
+        self.assertEqual(backfill.fingerprint_body(body), "")
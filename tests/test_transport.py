@@ -0,0 +1,64 @@
+import gzip
+import json
+
+from django.test import SimpleTestCase, override_settings
+from plugins.oas import logic
+from plugins.oas.tests.stand_in import StandInServer
+
+
+@override_settings(OAS_RATE_LIMITS={}, OAS_COMPRESS_REQUESTS={"message": True})
+class TestSendPayload(SimpleTestCase):
+    def setUp(self):
+        self.accepts_gzip = True
+        self.server = StandInServer(self.respond)
+        self.addCleanup(self.server.close)
+
+        self.url = self.server.url
+        self.payload = {"authors": [{"name": "A" * 20}] * 200}
+        logic._uncompressed_urls.clear()
+
+    def respond(self, request):
+        encoding = request.headers.get("Content-Encoding")
+        if encoding == "gzip" and not self.accepts_gzip:
+            return 415, {"error": True}
+        return 200, {"id": 42, "state": "SENT", "data": "x" * 500}
+
+    def sent(self):
+        return [
+            (request.headers.get("Content-Encoding"), request.body)
+            for request in self.server.requests
+        ]
+
+    def test_large_bodies_are_sent_compressed(self):
+        _json_output, success = logic.send_payload(
+            self.payload, "token", self.url
+        )
+
+        encoding, body = self.sent()[0]
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(json.loads(gzip.decompress(body)), self.payload)
+        self.assertLess(len(body), len(json.dumps(self.payload)))
+        self.assertTrue(success)
+
+    def test_only_needed_response_fields_are_kept(self):
+        json_output, _ = logic.send_payload(self.payload, "token", self.url)
+
+        self.assertEqual(json_output, {"id": 42})
+
+    def test_refused_compression_falls_back_to_plain_bodies(self):
+        self.accepts_gzip = False
+
+        _, success = logic.send_payload(self.payload, "token", self.url)
+        logic.send_payload(self.payload, "token", self.url)
+
+        encodings = [encoding for encoding, _ in self.sent()]
+        self.assertEqual(encodings, ["gzip", None, None])
+        self.assertTrue(success)
+
+    @override_settings(OAS_COMPRESS_REQUESTS={})
+    def test_compression_is_off_unless_configured(self):
+        logic.send_payload(self.payload, "token", self.url)
+
+        encoding, body = self.sent()[0]
+        self.assertIsNone(encoding)
+        self.assertEqual(json.loads(body), self.payload)
@@ -8,5 +8,13 @@ from plugins.oas import views
 urlpatterns = [
     re_path(r"^manager/$", views.manager, name="oas_manager"),
     re_path(r"^logs/$", views.list_articles, name="oas_logs"),
+    re_path(r"^dashboard/$", views.dashboard, name="oas_dashboard"),
+    re_path(r"^export/$", views.export_messages, name="oas_export"),
     re_path(r"^send/$", views.send_article, name="oas_send"),
+    re_path(r"^send/bulk/$", views.send_articles, name="oas_send_bulk"),
+    re_path(
+        r"^jobs/(?P<job_id>\d+)/$",
+        views.job_progress,
+        name="oas_job_progress",
+    ),
 ]
@@ -7,10 +7,18 @@ __author__ = "Martin Paul Eve"
 __license__ = "AGPL v3"
 __maintainer__ = "Birkbeck University of London"
 
+from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied
+from django.http import (
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, render, reverse, redirect
 from django.views.decorators.http import require_POST
-from plugins.oas import forms, logic
+from journal import models as journal_models
+from plugins.oas import export, forms, logic, models, profiling
 from security import decorators
 from submission import models as submission_models
 
@@ -84,9 +92,17 @@ def list_articles(request):
         journal=request.journal
     ).order_by("-date_published")
 
+    job = None
+    if request.GET.get("job"):
+        job = models.SwitchboardJob.objects.filter(
+            pk=request.GET.get("job"),
+            journal=request.journal,
+        ).first()
+
     template = "oas/listing.html"
     context = {
         "articles": articles,
+        "job": job,
     }
 
     return render(request, template, context)
@@ -108,10 +124,158 @@ def send_article(request):
 
     kwargs = {"article": article, "request": request}
 
-    logic.publication_event_handler(**kwargs)
+    if request.GET.get("profile") and request.user.is_staff:
+        profiling.profile_send(
+            article,
+            logic.publication_event_handler,
+            **kwargs,
+        )
+    else:
+        logic.publication_event_handler(**kwargs)
 
     return redirect(
         reverse("admin:oas_switchboardmessage_changelist")
         + "?article__id__exact="
         + article_id
     )
+
+
+@require_POST
+@decorators.editor_user_required
+def send_articles(request):
+    """
+    Queue several articles to be sent to the OA Switchboard in the background.
+    :param request: the request object
+    """
+    articles = submission_models.Article.objects.filter(
+        journal=request.journal
+    )
+
+    if request.POST.get("scope") == "unsent":
+        articles = articles.filter(
+            stage=submission_models.STAGE_PUBLISHED,
+        ).exclude(
+            switchboardmessage__success=True,
+        )
+    else:
+        try:
+            article_ids = [
+                int(article_id)
+                for article_id in request.POST.getlist("article_ids")
+            ]
+        except ValueError:
+            return HttpResponseBadRequest("Article IDs must be numbers.")
+
+        articles = articles.filter(pk__in=article_ids)
+
+    job = logic.queue_articles(
+        request.journal,
+        articles.distinct(),
+        owner=request.user,
+    )
+
+    if job.completed:
+        messages.add_message(
+            request,
+            messages.INFO,
+            "No articles needed sending to OA Switchboard.",
+        )
+        return redirect(reverse("oas_logs"))
+
+    logic.start_job(job)
+
+    return redirect(reverse("oas_logs") + f"?job={job.pk}")
+
+
+@decorators.editor_user_required
+def job_progress(request, job_id):
+    """
+    Report the progress of a bulk send as JSON.
+    :param request: the request object
+    :param job_id: the ID of the SwitchboardJob
+    """
+    job = get_object_or_404(
+        models.SwitchboardJob,
+        pk=job_id,
+        journal=request.journal,
+    )
+
+    return JsonResponse(job.progress())
+
+
+@decorators.editor_user_required
+def dashboard(request):
+    """
+    Show delivery statistics for the journal, or for every journal when a
+    staff member views the dashboard outside of a journal.
+    :param request: the request object
+    """
+    journal = request.journal
+
+    if journal is None and not request.user.is_staff:
+        raise PermissionDenied
+
+    stats = logic.delivery_stats(journal=journal)
+    queue = logic.queue_depths(journal=journal)
+    journals = journal_models.Journal.objects.in_bulk(
+        [row["journal_id"] for row in stats["by_journal"] + queue],
+    )
+    by_journal = [
+        dict(row, journal=journals.get(row["journal_id"]))
+        for row in stats["by_journal"]
+    ]
+    queue_by_journal = [
+        dict(row, journal=journals.get(row["journal_id"])) for row in queue
+    ]
+
+    endpoints = models.SwitchboardEndpointHealth.objects.order_by("url")
+    if journal is not None:
+        endpoints = endpoints.filter(
+            url__in=logic.get_configured_endpoints([journal]),
+        )
+
+    template = "oas/dashboard.html"
+    context = {
+        "stats": stats,
+        "by_journal": by_journal,
+        "queue_by_journal": queue_by_journal,
+        "endpoints": endpoints,
+    }
+
+    return render(request, template, context)
+
+
+@staff_member_required
+def export_messages(request):
+    """
+    Stream the message log as CSV or NDJSON.
+    :param request: the request object
+    """
+    form = forms.ExportForm(request.GET)
+
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+
+    journal = form.cleaned_data["journal"] or request.journal
+    export_format = form.cleaned_data["format"] or export.CSV
+    messages_to_export = export.filter_messages(
+        journal=journal,
+        start=form.cleaned_data["start"],
+        end=form.cleaned_data["end"],
+        status=form.cleaned_data["status"],
+    )
+
+    response = StreamingHttpResponse(
+        export.export_lines(
+            messages_to_export,
+            export_format=export_format,
+            bodies=form.cleaned_data["bodies"],
+        ),
+        content_type=export.FORMATS[export_format],
+    )
+    filename = f"oas-messages-{journal.code if journal else 'press'}"
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+
+    return response